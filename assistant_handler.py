@@ -84,13 +84,16 @@ class AssistantHandler:
                 print(f"   ✗ {symbol:10s} → Token not found")
         
         # Save to file for tick fetcher (format: token:symbol)
+        # Written to a temp file and swapped in: a running monitor hot-reloads this file
         tokens_file = Path("watchlist_tokens.txt")
-        with open(tokens_file, 'w') as f:
+        tmp_file = tokens_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
             f.write("# Generated Watchlist - Futures Tokens\n")
             f.write(f"# Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             for item in tokens:
                 # Format: token:symbol (as expected by live_tick_monitor.py)
                 f.write(f"{item['token']}:{item['symbol']}\n")
+        tmp_file.replace(tokens_file)
         
         print(f"\n✅ Tokens saved: {tokens_file}")
         print("\n📌 Watchlist Ready for Live Monitoring:")
@@ -0,0 +1,229 @@
+"""
+Incremental Minute-Bar Aggregator
+Builds per-symbol OHLCV / VWAP / OI / spread bars from live ticks
+- O(1) update per tick, no tick history kept
+- Volume per bar from the delta of cumulative volume_traded
+- Configurable bar interval (default 1 minute, aligned to local time)
+- Bars are keyed on exchange time and close on the symbol's first tick of
+  the next interval, or on flush() once the exchange clock (latest
+  exchange timestamp seen on any symbol) is grace_seconds past the end
+- A tick for a bar that has already closed is counted (late_ticks) and
+  dropped, so a symbol never emits two bars for one interval; its volume
+  goes to the next bar
+"""
+
+import threading
+from datetime import datetime
+from tick_buffer import TICK_FIELDS, LOCAL_TZ, ns_to_local
+
+BAR_COLUMNS = [
+    'Symbol', 'bar_start', 'interval', 'open', 'high', 'low', 'close',
+    'volume', 'vwap', 'open_interest', 'oi_change', 'avg_spread', 'last_spread', 'ticks',
+]
+
+_TS = TICK_FIELDS.index('exchange_timestamp')
+_PRICE = TICK_FIELDS.index('last_price')
+_VOLUME = TICK_FIELDS.index('volume_traded')
+_OI = TICK_FIELDS.index('open_interest')
+_BID = TICK_FIELDS.index('bid_price_1')
+_ASK = TICK_FIELDS.index('ask_price_1')
+
+
+class _BarState:
+    """Running bar for one symbol"""
+
+    __slots__ = ('start_ns', 'open', 'high', 'low', 'close', 'volume', 'notional',
+                 'oi_open', 'oi', 'spread_sum', 'spread_count', 'last_spread', 'ticks')
+
+    def __init__(self, start_ns, price, oi):
+        self.start_ns = start_ns
+        self.open = self.high = self.low = self.close = price
+        self.volume = 0
+        self.notional = 0.0
+        self.oi_open = self.oi = oi
+        self.spread_sum = 0.0
+        self.spread_count = 0
+        self.last_spread = 0.0
+        self.ticks = 0
+
+
+class BarAggregator:
+
+    def __init__(self, interval_seconds=60, grace_seconds=2):
+        """
+        Initialize aggregator
+
+        Args:
+            interval_seconds: Bar length in seconds
+            grace_seconds: Exchange-time seconds a bar stays open past its
+                           interval for late ticks of quiet symbols
+        """
+        self.interval_seconds = interval_seconds
+        self._interval_ns = int(interval_seconds * 1e9)
+        self._grace_ns = int(grace_seconds * 1e9)
+        self._offset_ns = int(datetime.now(LOCAL_TZ).utcoffset().total_seconds() * 1e9)
+        self._bars = {}           # symbol -> _BarState
+        self._last_volume = {}    # symbol -> last cumulative volume_traded
+        self._closed_start = {}   # symbol -> bar_start of its last closed bar
+        self._watermark_ns = 0    # latest exchange timestamp seen
+        self._closed = []
+        self.late_ticks = 0
+        self._lock = threading.Lock()   # on_ticks thread vs main loop flush
+
+    def __getstate__(self):
+        # Pickled for session checkpoints (session_checkpoint.py); the lock is not state
+        with self._lock:
+            state = dict(self.__dict__, _bars=dict(self._bars), _last_volume=dict(self._last_volume),
+                         _closed_start=dict(self._closed_start), _closed=list(self._closed))
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_grace_ns', 0)
+        self.__dict__.setdefault('_closed_start', {})
+        self.__dict__.setdefault('_watermark_ns', 0)
+        self.__dict__.setdefault('late_ticks', 0)
+        self._lock = threading.Lock()
+
+    def _bar_start(self, ts_ns):
+        local = ts_ns + self._offset_ns
+        return local - local % self._interval_ns - self._offset_ns
+
+    def update(self, symbol, row):
+        """
+        Fold one normalized tick into the symbol's running bar
+
+        Args:
+            symbol: Symbol name
+            row: Tuple in TICK_FIELDS order
+        """
+        price = row[_PRICE]
+        if price <= 0:
+            return
+        with self._lock:
+            self._update(symbol, price, row)
+
+    def _update(self, symbol, price, row):
+        ts_ns = row[_TS]
+        oi = row[_OI]
+        start_ns = self._bar_start(ts_ns)
+        bar = self._bars.get(symbol)
+        if bar is not None:
+            late = start_ns < bar.start_ns
+        else:
+            closed_start = self._closed_start.get(symbol)
+            late = closed_start is not None and start_ns <= closed_start
+        if late:
+            self.late_ticks += 1      # its bar is already out: never emit it twice
+            return
+        if ts_ns > self._watermark_ns:
+            self._watermark_ns = ts_ns
+
+        cumulative = row[_VOLUME]
+        previous = self._last_volume.get(symbol)
+        volume = cumulative - previous if previous is not None and cumulative >= previous else 0
+        self._last_volume[symbol] = cumulative
+
+        if bar is None or start_ns > bar.start_ns:
+            if bar is not None:
+                self._close(symbol, bar)
+            bar = self._bars[symbol] = _BarState(start_ns, price, oi)
+
+        if price > bar.high:
+            bar.high = price
+        if price < bar.low:
+            bar.low = price
+        bar.close = price
+        bar.volume += volume
+        bar.notional += price * volume
+        bar.oi = oi
+        bar.ticks += 1
+
+        bid, ask = row[_BID], row[_ASK]
+        if bid > 0 and ask > 0:
+            spread = ask - bid
+            bar.spread_sum += spread
+            bar.spread_count += 1
+            bar.last_spread = spread
+
+    def _close(self, symbol, bar):
+        self._closed.append(self._finish(symbol, bar))
+        self._closed_start[symbol] = bar.start_ns
+
+    def flush(self, now_ns=None):
+        """
+        Close bars of quiet symbols whose interval has ended
+
+        Args:
+            now_ns: Exchange time to close by (None = latest exchange
+                    timestamp seen minus grace_seconds)
+        """
+        with self._lock:
+            if now_ns is None:
+                if not self._watermark_ns:
+                    return
+                now_ns = self._watermark_ns - self._grace_ns
+            current_start = self._bar_start(now_ns)
+            for symbol, bar in list(self._bars.items()):
+                if bar.start_ns < current_start:
+                    self._close(symbol, bar)
+                    del self._bars[symbol]
+
+    def close_all(self):
+        """Close every running bar (end of session)"""
+        with self._lock:
+            for symbol, bar in self._bars.items():
+                self._close(symbol, bar)
+            self._bars = {}
+
+    def remove_symbol(self, symbol):
+        """Close a symbol's running bar and forget it (symbol left the watchlist)"""
+        with self._lock:
+            bar = self._bars.pop(symbol, None)
+            if bar:
+                self._close(symbol, bar)
+            self._last_volume.pop(symbol, None)
+            self._closed_start.pop(symbol, None)
+
+    def drain_closed(self):
+        """
+        Closed bars since the last call
+
+        Returns:
+            list: Bar dicts in BAR_COLUMNS layout (bar_start as epoch ns)
+        """
+        with self._lock:
+            closed, self._closed = self._closed, []
+        return closed
+
+    def current(self, symbol):
+        """Running (not yet closed) bar for a symbol, or None"""
+        bar = self._bars.get(symbol)
+        return self._finish(symbol, bar) if bar else None
+
+    def _finish(self, symbol, bar):
+        return {
+            'Symbol': symbol,
+            'bar_start': bar.start_ns,
+            'interval': self.interval_seconds,
+            'open': bar.open,
+            'high': bar.high,
+            'low': bar.low,
+            'close': bar.close,
+            'volume': bar.volume,
+            'vwap': round(bar.notional / bar.volume, 4) if bar.volume else bar.close,
+            'open_interest': bar.oi,
+            'oi_change': bar.oi - bar.oi_open,
+            'avg_spread': round(bar.spread_sum / bar.spread_count, 4) if bar.spread_count else 0.0,
+            'last_spread': round(bar.last_spread, 4),
+            'ticks': bar.ticks,
+        }
+
+
+def bars_for_json(bars):
+    """Bar dicts with bar_start converted to local datetimes"""
+    if not bars:
+        return []
+    starts = ns_to_local([bar['bar_start'] for bar in bars])
+    return [dict(bar, bar_start=start) for bar, start in zip(bars, starts)]
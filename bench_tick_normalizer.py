@@ -0,0 +1,85 @@
+"""
+Tick Normalization Microbenchmark
+Per-field build_tick_row() vs batch normalize_batch() in ticks/sec
+
+Usage:
+    python bench_tick_normalizer.py            # 5k ticks, a few seconds
+    python bench_tick_normalizer.py --full     # 200k ticks (steadier numbers, minutes)
+"""
+
+import argparse
+import random
+import time
+from tick_normalizer import build_tick_row, normalize_batch
+
+BATCH_SIZES = [1, 4, 8, 16, 64, 256, 1024]
+TOTAL_TICKS = 5_000
+FULL_TICKS = 200_000
+
+
+def make_ticks(n, seed=7):
+    """Synthetic Breeze depth ticks (a few with missing/blank fields)"""
+    rng = random.Random(seed)
+    ticks = []
+    for i in range(n):
+        price = round(1500 + rng.uniform(-20, 20), 1)
+        tick = {
+            'symbol': f"4.1!{49000 + i % 200}",
+            'last': price,
+            'ttq': 3_000_000 + i * 25,
+            'ltq': rng.choice([25, 50, 250, 500]),
+            'OI': 100_700_000,
+            'CHNGOI': rng.randint(-5000, 5000),
+            'bPrice': [round(price - 0.1 * (k + 1), 2) for k in range(5)],
+            'bQty': [rng.randint(1, 40) * 25 for _ in range(5)],
+            'sPrice': [round(price + 0.1 * (k + 1), 2) for k in range(5)],
+            'sQty': [rng.randint(1, 40) * 25 for _ in range(5)],
+            'totalBuyQt': 348_500,
+            'totalSellQ': 867_500,
+            'ltt': f"Mon Nov 17 12:{i // 3600 % 60:02d}:{i // 60 % 60:02d} 2025",
+        }
+        if i % 97 == 0:
+            tick['CHNGOI'] = ''
+        if i % 89 == 0:
+            del tick['ltt']
+        ticks.append(tick)
+    return ticks
+
+
+def bench(fn, batches, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for batch in batches:
+            fn(batch)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-field vs batch tick normalization")
+    parser.add_argument('--ticks', type=int, default=TOTAL_TICKS, help="Ticks per batch size")
+    parser.add_argument('--full', action='store_true', help=f"Use {FULL_TICKS:,} ticks")
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+    total = FULL_TICKS if args.full else args.ticks
+    repeats = args.repeats
+    ticks = make_ticks(total)
+    ts_ns = time.time_ns()
+
+    print(f"\n{'='*64}")
+    print(f"⏱️  TICK NORMALIZATION BENCHMARK ({total:,} ticks, best of {repeats})")
+    print(f"{'='*64}")
+    print(f"{'batch':>6} | {'per-field ticks/s':>18} | {'batch ticks/s':>14} | {'speedup':>7}")
+    print("-" * 64)
+    for size in BATCH_SIZES:
+        batches = [ticks[i:i + size] for i in range(0, total, size)]
+        per_field = bench(lambda b: [build_tick_row(t, ts_ns) for t in b], batches, repeats)
+        batched = bench(lambda b: normalize_batch(b, ts_ns).tolist(), batches, repeats)
+        print(f"{size:>6} | {total / per_field:>18,.0f} | {total / batched:>14,.0f} | "
+              f"{per_field / batched:>6.2f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Non-Blocking Git Publisher
+Publishes snapshot files from a background thread
+- Snapshot paths are queued by the monitor (never waits on git)
+- Everything pending is coalesced into one commit per publish cycle
+- Pushes retry with exponential backoff; unpushed commits are retried
+  on the next cycle instead of being lost
+- Reports publish lag (age of the oldest unpublished snapshot)
+"""
+
+import os
+import queue
+import subprocess
+import threading
+import time
+
+
+def _first_line(text):
+    lines = [line for line in text.splitlines() if line.strip()]
+    return lines[0][:200] if lines else ""
+
+
+class GitPublisher:
+
+    def __init__(self, repo_dir=".", min_interval=300, max_retries=4,
+                 backoff_base=2.0, backoff_max=60.0, command_timeout=120):
+        """
+        Initialize publisher
+
+        Args:
+            repo_dir: Git working tree
+            min_interval: Minimum seconds between publish cycles
+            max_retries: Push attempts per cycle
+            backoff_base: First retry delay in seconds (doubles each retry)
+            backoff_max: Cap on retry delay
+            command_timeout: Seconds before a git command is abandoned
+        """
+        self.repo_dir = repo_dir
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.command_timeout = command_timeout
+
+        self._queue = queue.Queue()
+        self._pending = {}              # path -> first submit time
+        self._unpushed_since = None     # submit time of oldest committed-but-unpushed file
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+        self._last_cycle = 0.0
+
+        # Counters
+        self.submitted = 0
+        self.commits = 0
+        self.pushes = 0
+        self.push_failures = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_error = None
+        self.last_published_at = None
+
+    # ==================== MONITOR SIDE ====================
+
+    def submit(self, path):
+        """Queue a file for publishing (returns immediately)"""
+        self._queue.put((path, time.time()))
+        self.submitted += 1
+
+    def publish_lag(self):
+        """Seconds since the oldest snapshot still waiting to reach the remote"""
+        oldest = [t for t in (self._oldest_pending(), self._unpushed_since) if t is not None]
+        return time.time() - min(oldest) if oldest else 0.0
+
+    def _oldest_pending(self):
+        pending = list(self._pending.values())
+        try:
+            pending.append(self._queue.queue[0][1])
+        except IndexError:
+            pass
+        return min(pending) if pending else None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="git-publisher", daemon=True)
+        self._thread.start()
+        print(f"✓ Git publisher started (every {self.min_interval}s)")
+
+    def stop(self, timeout=60):
+        """Run a final publish cycle for everything queued, then stop"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print(f"   ⚠️ Git publisher still busy after {timeout}s - giving up")
+
+    # ==================== WORKER ====================
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            wait = self.min_interval - (time.monotonic() - self._last_cycle)
+            if wait > 0:
+                self._wake_event.wait(wait)
+                self._wake_event.clear()
+                continue
+            self._cycle()
+        self._cycle()
+
+    def _drain_queue(self):
+        while True:
+            try:
+                path, submitted_at = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._pending.setdefault(path, submitted_at)
+
+    def _git(self, *args):
+        return subprocess.run(["git", *args], cwd=self.repo_dir, capture_output=True,
+                              text=True, timeout=self.command_timeout)
+
+    def _cycle(self):
+        self._last_cycle = time.monotonic()
+        self._drain_queue()
+
+        if self._pending:
+            paths = sorted(self._pending)
+            oldest = min(self._pending.values())
+            try:
+                self._commit(paths)
+                self._pending = {}
+                if self._unpushed_since is None:
+                    self._unpushed_since = oldest
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"   ⚠️ Git commit error: {_first_line(str(e))}")
+                return
+
+        if self._unpushed_since is not None:
+            self._push()
+
+    def _commit(self, paths):
+        existing = [p for p in paths if os.path.exists(p)]
+        if not existing:
+            return
+        result = self._git("add", "--", *existing)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "git add failed")
+        names = [os.path.basename(p) for p in existing]
+        message = (f"Auto-snapshot {names[0]}" if len(names) == 1
+                   else f"Auto-snapshot {len(names)} files ({names[0]} .. {names[-1]})")
+        result = self._git("commit", "-m", message, "--", *existing)
+        if result.returncode != 0:
+            if "nothing to commit" in (result.stdout + result.stderr):
+                return
+            raise RuntimeError(result.stderr.strip() or result.stdout.strip() or "git commit failed")
+        self.commits += 1
+
+    def _push(self):
+        delay = self.backoff_base
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                result = self._git("push")
+                ok = result.returncode == 0
+                error = result.stderr.strip()
+            except subprocess.TimeoutExpired:
+                ok, error = False, f"git push timed out after {self.command_timeout}s"
+
+            if ok:
+                lag = time.time() - self._unpushed_since
+                self.pushes += 1
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                self.last_published_at = time.time()
+                self._unpushed_since = None
+                print(f"✓ Snapshots published on git (lag {lag:.0f}s)")
+                return
+
+            self.push_failures += 1
+            self.last_error = error
+            print(f"   ⚠️ Git push failed (attempt {attempt}/{self.max_retries}): {_first_line(error)}")
+            if attempt < self.max_retries:
+                self._stop_event.wait(delay)   # cut short on shutdown
+                delay = min(delay * 2, self.backoff_max)
+
+    def stats(self):
+        """Publisher counters as a dict"""
+        return {
+            'submitted': self.submitted,
+            'pending': len(self._pending) + self._queue.qsize(),
+            'commits': self.commits,
+            'pushes': self.pushes,
+            'push_failures': self.push_failures,
+            'publish_lag_s': round(self.publish_lag(), 1),
+            'last_lag_s': round(self.last_lag, 1),
+            'max_lag_s': round(self.max_lag, 1),
+            'last_error': self.last_error,
+        }
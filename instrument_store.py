@@ -0,0 +1,291 @@
+"""
+NFO Instrument Store
+Columnar copy of every contract in the token master (FUTIDX, FUTSTK, OPTIDX, OPTSTK)
+- One NumPy array per field; symbol, expiry, instrument and option type
+  stored as small integer codes
+- Rows sorted by (symbol, expiry, option type, strike), so each
+  (symbol, expiry, option type) is one contiguous slice with sorted strikes
+- option_chain(): CE/PE contracts within ±N listed strikes of a price
+  (dict hit + bisect on the strike slice)
+- select(): multi-key filter (symbol, expiry, instrument, option type,
+  strike range) over the columns
+- Built by token_parser from the same read of the master and kept in its
+  compiled index, so a warm start gets it without parsing
+
+Strike prices and tick sizes are in rupees (the master lists them in paise).
+"""
+
+import bisect
+from datetime import date
+import numpy as np
+import pandas as pd
+
+INSTRUMENT_TYPES = ('FUTIDX', 'FUTSTK', 'OPTIDX', 'OPTSTK')
+OPTION_TYPES = ('XX', 'CE', 'PE')     # XX = future
+FUTURE = 'XX'
+PAISE_PER_RUPEE = 100          # the master's TickSize / StrikePrice / BasePrice are in paise
+
+
+class InstrumentStore:
+
+    @classmethod
+    def from_frame(cls, df, parse_expiry):
+        """
+        Build from the raw master (str columns as read by token_parser)
+
+        Args:
+            df: DataFrame with Token, InstrumentName, ShortName, ExpiryDate,
+                StrikePrice, OptionType, LotSize, TickSize (ExchangeCode optional)
+            parse_expiry: Callable expiry code -> datetime or None
+
+        Returns:
+            InstrumentStore
+        """
+        df = df[df['InstrumentName'].isin(INSTRUMENT_TYPES)]
+        symbols = df['ShortName'].str.strip()
+        expiries = df['ExpiryDate'].str.strip()
+        tokens = pd.to_numeric(df['Token'], errors='coerce')
+        valid = (symbols.notna() & (symbols != '') & expiries.notna() & (expiries != '')
+                 & tokens.notna())
+        df, symbols, expiries, tokens = df[valid], symbols[valid], expiries[valid], tokens[valid]
+
+        symbol_codes, symbol_names = pd.factorize(symbols, sort=True)
+        # Expiry codes in date order (unparseable codes last), so sorting by code sorts by date
+        expiry_names = sorted(expiries.unique(), key=lambda code: (parse_expiry(code) is None,
+                                                                  parse_expiry(code) or 0, code))
+        expiry_codes = pd.Categorical(expiries, categories=expiry_names).codes
+        instrument_codes = pd.Categorical(df['InstrumentName'], categories=INSTRUMENT_TYPES).codes
+        option_codes = (df['OptionType'].str.strip().str.upper()
+                        .map({name: code for code, name in enumerate(OPTION_TYPES)}).fillna(0))
+        exchange_codes = (df['ExchangeCode'].str.strip().fillna('') if 'ExchangeCode' in df
+                          else pd.Series('', index=df.index))
+
+        columns = {
+            'token': tokens.to_numpy(dtype=np.int64),
+            'symbol': symbol_codes.astype(np.int32),
+            'expiry': expiry_codes.astype(np.int16),
+            'instrument': instrument_codes.astype(np.int8),
+            'option_type': option_codes.to_numpy(dtype=np.int8),
+            'strike': (pd.to_numeric(df['StrikePrice'], errors='coerce').fillna(0)
+                       / PAISE_PER_RUPEE).to_numpy(dtype=np.float64),
+            'lot_size': pd.to_numeric(df['LotSize'], errors='coerce').fillna(1).to_numpy(dtype=np.int32),
+            'tick_size': (pd.to_numeric(df['TickSize'], errors='coerce') / PAISE_PER_RUPEE
+                          ).fillna(0.05).to_numpy(dtype=np.float64),
+        }
+        order = np.lexsort((columns['strike'], columns['option_type'], columns['expiry'], columns['symbol']))
+        columns = {name: values[order] for name, values in columns.items()}
+        exchange_code_of = dict(zip(symbols.tolist(), exchange_codes.tolist()))
+        return cls(columns, list(symbol_names), expiry_names,
+                   [parse_expiry(code) for code in expiry_names],
+                   [exchange_code_of[symbol] for symbol in symbol_names])
+
+    def __init__(self, columns, symbol_names, expiry_names, expiry_datetimes, exchange_codes):
+        """
+        Wrap sorted columns (use from_frame)
+
+        Args:
+            columns: {field: NumPy array}, rows sorted by (symbol, expiry, option_type, strike)
+            symbol_names: Symbol code -> short name
+            expiry_names: Expiry code -> expiry string (date order)
+            expiry_datetimes: Expiry code -> datetime or None
+            exchange_codes: Symbol code -> NSE trading symbol ('' if unknown)
+        """
+        self.columns = columns
+        self.symbol_names = symbol_names
+        self.expiry_names = expiry_names
+        self.expiry_days = [expiry.date() if expiry else None for expiry in expiry_datetimes]
+        self.exchange_codes = exchange_codes
+        self._symbol_code = {symbol: code for code, symbol in enumerate(symbol_names)}
+        self._expiry_code = {expiry: code for code, expiry in enumerate(expiry_names)}
+
+        # (symbol, expiry) -> {option type: (start, stop)}; symbol -> expiries in date order
+        self._ranges = {}
+        self._symbol_expiries = {}
+        symbol_codes, expiry_codes, option_codes = columns['symbol'], columns['expiry'], columns['option_type']
+        count = len(symbol_codes)
+        if count:
+            key = (symbol_codes.astype(np.int64) << 24) | (expiry_codes.astype(np.int64) << 8) | option_codes
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(key)) + 1))
+            stops = np.concatenate((starts[1:], [count]))
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                symbol = symbol_names[symbol_codes[start]]
+                expiry = expiry_names[expiry_codes[start]]
+                option_type = OPTION_TYPES[option_codes[start]]
+                ranges = self._ranges.get((symbol, expiry))
+                if ranges is None:
+                    ranges = self._ranges[(symbol, expiry)] = {}
+                    self._symbol_expiries.setdefault(symbol, []).append(expiry)
+                ranges[option_type] = (start, stop)
+        self._token_order = np.argsort(columns['token'], kind='stable')
+        self._sorted_tokens = columns['token'][self._token_order]
+
+    def __len__(self):
+        return len(self.columns['token'])
+
+    # ==================== ROWS ====================
+
+    def row(self, i):
+        """Contract at row i as a dict"""
+        return self.rows([i])[0]
+
+    def rows(self, indexes):
+        """Contracts at row indexes as dicts (columns gathered once)"""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        columns = {name: values[indexes].tolist() for name, values in self.columns.items()}
+        symbol_names, expiry_names, exchange_codes = self.symbol_names, self.expiry_names, self.exchange_codes
+        return [
+            {
+                'token': str(token),
+                'instrument': INSTRUMENT_TYPES[instrument],
+                'symbol': symbol_names[symbol_code],
+                'exchange_code': exchange_codes[symbol_code],
+                'expiry_date': expiry_names[expiry_code],
+                'strike': strike,
+                'option_type': OPTION_TYPES[option_type],
+                'lot_size': lot_size,
+                'tick_size': tick_size,
+            }
+            for token, symbol_code, expiry_code, instrument, option_type, strike, lot_size, tick_size in zip(
+                columns['token'], columns['symbol'], columns['expiry'], columns['instrument'],
+                columns['option_type'], columns['strike'], columns['lot_size'], columns['tick_size'])
+        ]
+
+    def get(self, token):
+        """
+        Contract for a Breeze token ("4.1!49078" or "49078")
+
+        Returns:
+            dict: Contract or None
+        """
+        try:
+            value = int(str(token).rpartition('!')[2])
+        except ValueError:
+            return None
+        position = int(np.searchsorted(self._sorted_tokens, value))
+        if position < len(self._sorted_tokens) and self._sorted_tokens[position] == value:
+            return self.row(int(self._token_order[position]))
+        return None
+
+    # ==================== QUERIES ====================
+
+    def symbols(self):
+        return list(self.symbol_names)
+
+    def expiries(self, symbol, option_type=None):
+        """
+        Expiries listed for a symbol (date order)
+
+        Args:
+            option_type: 'XX' futures only, 'CE'/'PE' that option side only, None = any
+        """
+        expiries = self._symbol_expiries.get(symbol, [])
+        if option_type is None:
+            return list(expiries)
+        return [expiry for expiry in expiries if option_type in self._ranges[(symbol, expiry)]]
+
+    def next_expiry(self, symbol, on_date=None, option_type='CE'):
+        """
+        First expiry on or after on_date (options trade on their expiry day)
+
+        Returns:
+            str: Expiry code or None
+        """
+        on_date = on_date or date.today()
+        expiries = [expiry for expiry in self.expiries(symbol, option_type)
+                    if self.expiry_days[self._expiry_code[expiry]] is not None]
+        days = [self.expiry_days[self._expiry_code[expiry]] for expiry in expiries]
+        position = bisect.bisect_left(days, on_date)
+        return expiries[position] if position < len(expiries) else None
+
+    def _range(self, symbol, expiry, option_type):
+        return self._ranges.get((symbol, expiry), {}).get(option_type)
+
+    def strikes(self, symbol, expiry, option_type='CE'):
+        """Sorted strike array (view) for one option side of one expiry"""
+        span = self._range(symbol, expiry, option_type)
+        return self.columns['strike'][span[0]:span[1]] if span else np.empty(0)
+
+    def futures(self, symbol):
+        """Future contracts of a symbol, nearest expiry first"""
+        spans = [self._range(symbol, expiry, FUTURE) for expiry in self.expiries(symbol, FUTURE)]
+        return [self.row(i) for start, stop in spans for i in range(start, stop)]
+
+    def option_chain(self, symbol, expiry, price, steps=5, option_types=('CE', 'PE')):
+        """
+        Options within ±steps listed strikes of the strike nearest to price
+
+        Args:
+            symbol: Short name (e.g., "NIFTY", "RELIND")
+            expiry: Expiry code
+            price: Underlying price (rupees)
+            steps: Strikes on each side of the ATM strike
+            option_types: Sides to include
+
+        Returns:
+            list: Contract dicts ordered by strike, then CE before PE
+        """
+        indexes = []
+        strike_column = self.columns['strike']
+        for option_type in option_types:
+            span = self._range(symbol, expiry, option_type)
+            if not span:
+                continue
+            start, stop = span
+            strikes = strike_column[start:stop]
+            position = int(np.searchsorted(strikes, price))
+            if position == len(strikes) or (position > 0 and price - strikes[position - 1] <= strikes[position] - price):
+                position -= 1                     # nearest strike (ties go to the lower one)
+            low, high = max(0, position - steps), min(len(strikes), position + steps + 1)
+            indexes.extend(range(start + low, start + high))
+        contracts = self.rows(indexes)
+        contracts.sort(key=lambda contract: (contract['strike'], contract['option_type']))
+        return contracts
+
+    def select(self, symbol=None, expiry=None, instrument=None, option_type=None,
+               strike_min=None, strike_max=None):
+        """
+        Contracts matching every given key (None = any; strikes in rupees)
+
+        Returns:
+            np.ndarray: Row indexes (see rows())
+        """
+        columns = self.columns
+        if symbol is not None and expiry is not None and option_type is not None:
+            span = self._range(symbol, expiry, option_type)
+            if not span:
+                return np.empty(0, dtype=np.int64)
+            indexes = np.arange(span[0], span[1])
+            if strike_min is not None or strike_max is not None:
+                strikes = columns['strike'][span[0]:span[1]]
+                low = np.searchsorted(strikes, strike_min, 'left') if strike_min is not None else 0
+                high = np.searchsorted(strikes, strike_max, 'right') if strike_max is not None else len(strikes)
+                indexes = indexes[low:high]
+            if instrument is not None:
+                indexes = indexes[columns['instrument'][indexes] == INSTRUMENT_TYPES.index(instrument)]
+            return indexes
+
+        mask = np.ones(len(self), dtype=bool)
+        for name, value, codes in (('symbol', symbol, self._symbol_code), ('expiry', expiry, self._expiry_code)):
+            if value is not None:
+                if value not in codes:
+                    return np.empty(0, dtype=np.int64)
+                mask &= columns[name] == codes[value]
+        if instrument is not None:
+            mask &= columns['instrument'] == INSTRUMENT_TYPES.index(instrument)
+        if option_type is not None:
+            mask &= columns['option_type'] == OPTION_TYPES.index(option_type)
+        if strike_min is not None:
+            mask &= columns['strike'] >= strike_min
+        if strike_max is not None:
+            mask &= columns['strike'] <= strike_max
+        return np.flatnonzero(mask)
+
+    def stats(self):
+        counts = np.bincount(self.columns['instrument'], minlength=len(INSTRUMENT_TYPES))
+        return {
+            'contracts': len(self),
+            'symbols': len(self.symbol_names),
+            'expiries': len(self.expiry_names),
+            'bytes': sum(values.nbytes for values in self.columns.values()),
+            **{name: int(count) for name, count in zip(INSTRUMENT_TYPES, counts.tolist())},
+        }
@@ -0,0 +1,102 @@
+"""
+Latency Histograms
+Fixed-bucket (log-spaced) histograms for feed and processing latency
+- O(log buckets) record, constant memory per histogram
+- p50 / p99 / max without keeping samples
+- LatencyTracker: per-symbol feed lag (receive time - exchange time)
+  plus callback processing time for the live monitor
+
+Note: Breeze 'ltt' has one-second resolution, so feed lag carries up to
+1s of quantization; use the distribution (and its changes) rather than
+single values.
+"""
+
+from bisect import bisect_left
+
+# Bucket upper bounds in milliseconds: 0.01ms .. ~10 min, ~12% apart
+_BOUNDS_MS = []
+_bound = 0.01
+while _bound < 600_000:
+    _BOUNDS_MS.append(_bound)
+    _bound *= 1.12
+_BOUNDS_MS.append(float('inf'))
+
+
+class LatencyHistogram:
+
+    __slots__ = ('counts', 'count', 'total', 'max', 'min')
+
+    def __init__(self):
+        self.counts = [0] * len(_BOUNDS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.min = float('inf')
+
+    def record(self, value_ms):
+        if value_ms < 0:
+            value_ms = 0.0
+        self.counts[bisect_left(_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+
+    def percentile(self, pct):
+        """Approximate percentile (bucket upper bound, capped at max)"""
+        if self.count == 0:
+            return 0.0
+        target = self.count * pct / 100.0
+        running = 0
+        for bound, bucket_count in zip(_BOUNDS_MS, self.counts):
+            running += bucket_count
+            if running >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'p50_ms': round(self.percentile(50), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+        }
+
+
+class LatencyTracker:
+    """Feed lag per symbol + callback processing time"""
+
+    def __init__(self):
+        self.feed_lag = {}                      # symbol -> LatencyHistogram
+        self.feed_lag_all = LatencyHistogram()
+        self.callback = LatencyHistogram()
+
+    def record_tick(self, symbol, exchange_ns, recv_ns):
+        lag_ms = (recv_ns - exchange_ns) / 1e6
+        histogram = self.feed_lag.get(symbol)
+        if histogram is None:
+            histogram = self.feed_lag[symbol] = LatencyHistogram()
+        histogram.record(lag_ms)
+        self.feed_lag_all.record(lag_ms)
+
+    def remove_symbol(self, symbol):
+        self.feed_lag.pop(symbol, None)
+
+    def record_callback(self, elapsed_ms):
+        self.callback.record(elapsed_ms)
+
+    def status_line(self):
+        feed = self.feed_lag_all
+        cb = self.callback
+        return (f"Lag p50/p99/max: {feed.percentile(50):.0f}/{feed.percentile(99):.0f}/{feed.max:.0f}ms | "
+                f"Callback p99: {cb.percentile(99):.2f}ms")
+
+    def summary(self):
+        return {
+            'feed_lag': self.feed_lag_all.summary(),
+            'callback': self.callback.summary(),
+            'feed_lag_by_symbol': {symbol: h.summary() for symbol, h in sorted(self.feed_lag.items())},
+        }
@@ -1,35 +1,191 @@
 """
 MODULAR LIVE MULTI-STOCK TICK MONITOR
 - Config + watchlist-driven
-- Efficient batch CSV writing
-- Minute-wise snapshot JSON in "snapshots/" folder
-- Auto git publish of snapshot every 5 min
+- Per-field or batched/vectorized tick normalization (tick_normalizer.py)
+- Preallocated per-symbol columnar ring buffer (tick_buffer.py)
+- Batch tick writing on a background thread (tick_writer.py)
+- Date/symbol-partitioned Parquet tick store (tick_store.py), CSV fallback
+- Optional memory-mapped binary tick journal (tick_journal.py)
+- Incremental per-symbol minute bars (bar_aggregator.py)
+- Per-symbol order book with spread / mid / microprice / depth imbalance /
+  buy-sell pressure and rolling means (order_book.py), in snapshots
+- Feed-to-handler latency (receive time - exchange 'ltt') per symbol and
+  callback processing time as p50/p99/max histograms (latency_stats.py),
+  shown in the status line
+- Health metrics (ticks per symbol, ticks/sec, buffer, write/journal/
+  snapshot latency, git lag, websocket connect attempts, RSS) on a local
+  Prometheus endpoint and in metrics/monitor_metrics.json (monitor_metrics.py)
+- Minute-wise snapshots in "snapshots/" folder: compact NDJSON latest-state
+  deltas with periodic keyframes (tick_snapshot.py) or full JSON dumps
+- Rate-limited concurrent subscription with first-tick confirmation and
+  retries (subscription_manager.py)
+- Optional local pub/sub fan-out of ticks and bars to other processes
+  (tick_pubsub.py) with per-subscriber filters and conflation
+- Optional shared-memory latest-quote table for other local processes
+  (quote_table.py, seqlocked rows, NumPy reader)
+- Optional conflation (tick_conflator.py): order books, pub/sub and the
+  quote table get at most one update per symbol per CONFLATE_INTERVAL_MS
+  while buffer, bars, journal and tick store keep every tick
+- Hot reload of the watchlist file (watchlist_watcher.py): added tokens
+  are subscribed, removed ones unsubscribed, unchanged symbols keep their
+  buffers, bars, books and subscriptions
+- Contract details from the token master (token_parser.py): pub/sub ticks
+  carry lot_size, tick_size and expiry_date looked up by token at start
+- Session checkpoints (session_checkpoint.py): buffers, running bars,
+  order books and counters saved every CHECKPOINT_INTERVAL; a restart
+  restores the day's checkpoint and replays only the journal ticks
+  written after it
+- Optional sharded ingestion: SHARD_COUNT worker processes with their
+  own connections, merged here by tick_shards.ShardCoordinator (fixed
+  watchlist: no hot reload)
+- Auto git publish of snapshots every 5 min on a background thread
+  (git_publisher.py), coalesced into one commit with push retries
+- TickMonitor: one session's config (MonitorConfig), feed, buffers and
+  sinks with explicit start()/run()/stop(); feed and tick/bar sinks are
+  injectable
+- No work at import time: main() goes live, tick_replay.py drives a
+  TickMonitor from recorded data
+
+Embedding:
+    from live_tick_monitor import TickMonitor, MonitorConfig
+    monitor = TickMonitor(MonitorConfig(git_publish=False, metrics_http=False),
+                          feed=my_feed, watchlist=[('4.1!2885', 'RELIND')])
+    monitor.start()
+    ...
+    monitor.stop()
 """
 
-from breeze_connect import BreezeConnect
-import pandas as pd
 from datetime import datetime, time
 import time as time_module
 import os
+import pickle
+import sys
+import threading
 import json
-import subprocess
 import trading_config as config
+from tick_buffer import TickRingBuffer, TICK_FIELDS, RECV_INDEX
+from tick_writer import BackgroundTickWriter, CSVTickSink, CSVBarSink, NullTickSink
+from bar_aggregator import BarAggregator, bars_for_json
+from order_book import OrderBookSet
+from tick_conflator import TickConflator
+from tick_snapshot import DeltaSnapshotter, KEYFRAME_EVERY
+from git_publisher import GitPublisher
+from latency_stats import LatencyTracker
+from monitor_metrics import MetricSet, MetricsServer, write_json_atomic, process_rss_bytes, METRICS_PORT
+from subscription_manager import SubscriptionManager
+from tick_pubsub import TickPublisher
+import tick_pubsub
+from quote_table import QuoteTable, QUOTE_TABLE_NAME, QUOTE_TABLE_CAPACITY
+from tick_normalizer import build_tick_row, normalize_batch, BATCH_NORMALIZE_MIN
+import tick_store
+from tick_journal import TickJournal, JournalReader, journal_path, records_to_rows
+from session_checkpoint import CheckpointWriter, checkpoint_path, load_checkpoint
+import session_checkpoint
+from watchlist_watcher import WatchlistWatcher, diff_watchlist
+from token_parser import FuturesTokenParser
 
 # ===========================
 # FILE/PATH SETUP
 # ===========================
+TICK_STORE = 'parquet'         # 'parquet' (tick_store/), 'csv' (CSV_FILE) or 'none'
+TICK_STORE_DIR = tick_store.TICK_STORE_DIR
 CSV_FILE = 'all_ticks_FUTURES.csv'
+BAR_CSV_FILE = 'bars_FUTURES.csv'
 SNAPSHOT_DIR = "snapshots"
 WATCHLIST_FILE = config.WATCHLIST_FILE
-MAX_BUFFER_SIZE = 600
+WATCHLIST_RELOAD = True        # apply rewrites of WATCHLIST_FILE while running (SHARD_COUNT = 1 only)
+WATCHLIST_POLL_INTERVAL = 2    # seconds between watchlist file checks
+TOKEN_FILE = "future_tokens.txt"
+CONTRACT_ENRICH = True         # look up lot/tick size of watchlist tokens in TOKEN_FILE
+MAX_BUFFER_SIZE = 600          # ticks kept in memory per symbol
 BATCH_WRITE_SIZE = 60
+WRITE_QUEUE_SIZE = 20000       # ticks held for the writer thread
+WRITE_POLICY = 'drop_oldest'   # when the queue is full: 'block', 'drop_oldest' or 'spill'
+WRITE_FLUSH_INTERVAL = 1.0     # seconds
+SPILL_FILE = None              # 'spill' overflow file (None: tick_spill.csv next to the tick store / CSV_FILE)
+JOURNAL_ENABLED = True         # append every tick to journal/ticks_YYYYMMDD.jrn
+JOURNAL_INITIAL_RECORDS = 2_000_000
+JOURNAL_GROW_RECORDS = 1_000_000
+JOURNAL_FLUSH_INTERVAL = 5     # seconds
+CHECKPOINT_ENABLED = True      # periodic state checkpoints (session_checkpoint.py, needs JOURNAL_ENABLED)
+CHECKPOINT_INTERVAL = 30       # seconds
+CHECKPOINT_DIR = session_checkpoint.CHECKPOINT_DIR
+CHECKPOINT_RESTORE = True      # on start, resume from today's checkpoint + journal tail (needs JOURNAL_ENABLED)
+BAR_INTERVAL = 60              # seconds per bar
+BAR_CLOSE_GRACE = 2            # exchange-time seconds a quiet symbol's bar waits for late ticks
+BOOK_WINDOW = 300              # ticks per symbol in the order book rolling window
 PRINT_FREQUENCY = 10
 SNAPSHOT_INTERVAL = 60         # seconds (every minute)
-GIT_INTERVAL = 300             # seconds (every 5 min)
+SNAPSHOT_MODE = 'delta'        # 'delta' (NDJSON latest state + keyframes) or 'full' (JSON tick dump)
+SNAPSHOT_KEYFRAME_EVERY = KEYFRAME_EVERY   # snapshots between full keyframes
+GIT_INTERVAL = 300             # seconds between publish commits (every 5 min)
+GIT_MAX_RETRIES = 4            # push attempts per publish cycle
 MARKET_START = time(9, 15, 0)
 MARKET_END = time(15, 30, 0)
+GIT_PUBLISH = True
+METRICS_FILE = os.path.join("metrics", "monitor_metrics.json")
+METRICS_INTERVAL = 10          # seconds between metrics file rewrites
+METRICS_HTTP = True            # serve /metrics (Prometheus) and /metrics.json on localhost
+METRICS_PORT = METRICS_PORT
+SUBSCRIBE_RATE = 10.0          # subscribe calls per second (token bucket, 0 = unlimited)
+SUBSCRIBE_BURST = 5
+SUBSCRIBE_CONCURRENCY = 4      # subscribe calls in flight
+SUBSCRIBE_BATCH_SIZE = 1       # tokens per subscribe_feeds call
+SUBSCRIBE_CONFIRM_TIMEOUT = 15 # seconds without a first tick before resubscribing
+SUBSCRIBE_MAX_RETRIES = 3
+PUBSUB_ENABLED = False         # fan ticks/bars out to local consumers (tick_pubsub.py)
+PUBSUB_ADDRESS = tick_pubsub.PUBSUB_ADDRESS   # Unix socket path (or (host, port))
+QUOTE_TABLE_ENABLED = False    # latest quote per symbol in shared memory (quote_table.py)
+QUOTE_TABLE_NAME = QUOTE_TABLE_NAME
+QUOTE_TABLE_CAPACITY = QUOTE_TABLE_CAPACITY
+CONFLATE_INTERVAL_MS = 0       # >0: conflate downstream consumers to one update per symbol per interval
+SHARD_COUNT = 1                # >1: split the watchlist across worker processes (tick_shards.py)
+
+
+SETTINGS = (
+    'TICK_STORE', 'TICK_STORE_DIR', 'CSV_FILE', 'BAR_CSV_FILE', 'SNAPSHOT_DIR', 'WATCHLIST_FILE',
+    'WATCHLIST_RELOAD', 'WATCHLIST_POLL_INTERVAL', 'TOKEN_FILE', 'CONTRACT_ENRICH',
+    'MAX_BUFFER_SIZE', 'BATCH_WRITE_SIZE', 'WRITE_QUEUE_SIZE', 'WRITE_POLICY', 'WRITE_FLUSH_INTERVAL',
+    'SPILL_FILE', 'JOURNAL_ENABLED', 'JOURNAL_INITIAL_RECORDS', 'JOURNAL_GROW_RECORDS', 'JOURNAL_FLUSH_INTERVAL',
+    'CHECKPOINT_ENABLED', 'CHECKPOINT_INTERVAL', 'CHECKPOINT_DIR', 'CHECKPOINT_RESTORE',
+    'BAR_INTERVAL', 'BAR_CLOSE_GRACE', 'BOOK_WINDOW', 'PRINT_FREQUENCY', 'SNAPSHOT_INTERVAL', 'SNAPSHOT_MODE',
+    'SNAPSHOT_KEYFRAME_EVERY', 'GIT_INTERVAL', 'GIT_MAX_RETRIES', 'MARKET_START', 'MARKET_END',
+    'GIT_PUBLISH', 'METRICS_FILE', 'METRICS_INTERVAL', 'METRICS_HTTP', 'METRICS_PORT',
+    'SUBSCRIBE_RATE', 'SUBSCRIBE_BURST', 'SUBSCRIBE_CONCURRENCY', 'SUBSCRIBE_BATCH_SIZE',
+    'SUBSCRIBE_CONFIRM_TIMEOUT', 'SUBSCRIBE_MAX_RETRIES', 'PUBSUB_ENABLED', 'PUBSUB_ADDRESS',
+    'QUOTE_TABLE_ENABLED', 'QUOTE_TABLE_NAME', 'QUOTE_TABLE_CAPACITY', 'CONFLATE_INTERVAL_MS',
+    'SHARD_COUNT',
+)
+
+
+class MonitorConfig:
+    """Settings for one TickMonitor, as lowercase attributes (snapshot_dir, git_publish, ...)"""
+
+    def __init__(self, **overrides):
+        """
+        Snapshot the module constants above, then apply overrides
+
+        Args:
+            **overrides: Lowercase setting names, e.g. MonitorConfig(git_publish=False)
+        """
+        defaults = globals()
+        for name in SETTINGS:
+            setattr(self, name.lower(), defaults[name])
+        for key, value in overrides.items():
+            if key.upper() not in SETTINGS:
+                raise TypeError(f"Unknown monitor setting: {key}")
+            setattr(self, key, value)
 
-os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    def subscription_options(self):
+        """SubscriptionManager keyword arguments from the SUBSCRIBE_* settings"""
+        return {
+            'rate': self.subscribe_rate,
+            'burst': self.subscribe_burst,
+            'concurrency': self.subscribe_concurrency,
+            'batch_size': self.subscribe_batch_size,
+            'confirm_timeout': self.subscribe_confirm_timeout,
+            'max_retries': self.subscribe_max_retries,
+        }
 
 # ===========================
 # LOAD WATCHLIST
@@ -46,227 +202,899 @@ def load_watchlist(fname):
                 token_symbol_list.append((token.strip(), symbol.strip()))
     return token_symbol_list
 
-TOKENS = load_watchlist(WATCHLIST_FILE)
-token_to_symbol = {token: symbol for token, symbol in TOKENS}
-
 # ===========================
-# CSV MANAGEMENT
+# SINKS
 # ===========================
-tick_data = []
-pending_writes = []
-csv_initialized = False
-write_counter = 0
-first_tick_received = False
-processed_tick_count = 0
-session_start_time = datetime.now()
-
-def initialize_csv():
-    global csv_initialized
-    if not os.path.exists(CSV_FILE):
-        columns = [
-            'Symbol', 'exchange_timestamp', 'last_price', 'volume_traded', 'last_traded_quantity',
-            'open_interest', 'change_in_oi',
-            'bid_price_1', 'bid_qty_1', 'bid_price_2', 'bid_qty_2',
-            'bid_price_3', 'bid_qty_3', 'bid_price_4', 'bid_qty_4',
-            'bid_price_5', 'bid_qty_5',
-            'ask_price_1', 'ask_qty_1', 'ask_price_2', 'ask_qty_2',
-            'ask_price_3', 'ask_qty_3', 'ask_price_4', 'ask_qty_4',
-            'ask_price_5', 'ask_qty_5',
-            'total_buy_qty', 'total_sell_qty'
-        ]
-        pd.DataFrame(columns=columns).to_csv(CSV_FILE, index=False)
-        print(f"✓ Created new CSV: {CSV_FILE}")
-    else:
-        print(f"✓ Using existing CSV: {CSV_FILE}")
-    csv_initialized = True
-
-def append_to_csv_batch(ticks_to_write):
-    if len(ticks_to_write) == 0:
-        return
-    try:
-        df = pd.DataFrame(ticks_to_write)
-        df.to_csv(CSV_FILE, mode='a', header=False, index=False)
-        if len(ticks_to_write) >= 50:
-            print(f"   💾 Wrote {len(ticks_to_write)} ticks to CSV")
-    except Exception as e:
-        print(f"   ⚠️ CSV write error: {e}")
+def create_tick_sink(cfg):
+    if cfg.tick_store == 'none':
+        return NullTickSink()
+    if cfg.tick_store == 'parquet':
+        try:
+            return tick_store.ParquetTickSink(cfg.tick_store_dir)
+        except ImportError as e:
+            print(f"⚠️ {e} - falling back to CSV")
+    return CSVTickSink(cfg.csv_file)
 
-# ===========================
-# HELPER FUNCTIONS
-# ===========================
-def safe_int(value, default=0):
-    if value is None or value == '' or value == "": return default
-    try: return int(float(value))
-    except (ValueError, TypeError): return default
-
-def safe_float(value, default=0.0):
-    if value is None or value == '' or value == "": return default
-    try: return float(value)
-    except (ValueError, TypeError): return default
-
-def safe_get_depth(data, key, index=0, default=0):
-    value = data.get(key, default)
-    if isinstance(value, list): return value[index] if len(value) > index else default
-    if isinstance(value, (int, float)): return value if index==0 else default
-    return default
+def spill_path(cfg):
+    if cfg.spill_file:
+        return cfg.spill_file
+    directory = cfg.tick_store_dir if cfg.tick_store == 'parquet' else os.path.dirname(cfg.csv_file)
+    return os.path.join(directory, "tick_spill.csv")
+
+def create_bar_sink(cfg):
+    if cfg.tick_store == 'none':
+        return None
+    if cfg.tick_store == 'parquet':
+        try:
+            return tick_store.ParquetBarSink(cfg.tick_store_dir)
+        except ImportError:
+            pass
+    return CSVBarSink(cfg.bar_csv_file)
+
+def new_session_stats():
+    return {
+        'ws_connect_attempts': 0,
+        'ws_errors': 0,
+        'last_tick_ns': 0,
+        'ticks_per_sec': 0.0,
+        'snapshots': 0,
+        'snapshot_ms': 0.0,
+        'max_snapshot_ms': 0.0,
+        'journal_flush_ms': 0.0,
+        'max_journal_flush_ms': 0.0,
+    }
 
 # ===========================
-# SNAPSHOT + GIT FUNCTIONS
+# BREEZE API SETUP (ALL FROM CONFIG)
 # ===========================
-def create_snapshot():
-    snapshot_quotes = []
-    current_time = datetime.now()
-    buffer = tick_data[-MAX_BUFFER_SIZE:] if len(tick_data) > MAX_BUFFER_SIZE else tick_data[:]
-    for tick in buffer:
-        snapshot_tick = tick.copy()
-        snapshot_quotes.append(snapshot_tick)
-    snap_time = current_time.strftime('%Y%m%d_%H%M%S')
-    snap_file = os.path.join(SNAPSHOT_DIR, f"fut_snapshot_{snap_time}.json")
-    with open(snap_file, 'w') as f:
-        json.dump(snapshot_quotes, f, indent=2, default=str)  # default=str to handle timestamps
-    print(f"✓ Snapshot written: {snap_file}")
-    return snap_file
-
-def git_publish(filepath):
+def connect_breeze():
+    from breeze_connect import BreezeConnect
+    breeze = BreezeConnect(api_key=config.BREEZE_API_KEY)
+    print("Connecting to API...")
     try:
-        subprocess.run(["git", "add", filepath], check=True)
-        subprocess.run(["git", "commit", "-m", f"Auto-snapshot {os.path.basename(filepath)}"], check=True)
-        subprocess.run(["git", "push"], check=True)
-        print("✓ Snapshot published on git")
+        breeze.generate_session(api_secret=config.BREEZE_API_SECRET, session_token=config.BREEZE_SESSION_TOKEN)
+        print("Session connected.")
     except Exception as e:
-        print(f"   ⚠️ Git publish error: {e}")
+        print(f"❌ Session Error: {e}")
+        raise ConnectionError(f"Breeze session failed: {e}") from e
+    return breeze
 
-# ===========================
-# BREEZE API SETUP (ALL FROM CONFIG)
-# ===========================
-breeze = BreezeConnect(api_key=config.BREEZE_API_KEY)
-print("Connecting to API...")
-try:
-    breeze.generate_session(api_secret=config.BREEZE_API_SECRET, session_token=config.BREEZE_SESSION_TOKEN)
-    print("Session connected.")
-except Exception as e:
-    print(f"❌ Session Error: {e}")
-    exit(1)
 
-# ===========================
-# TICK CALLBACK
-# ===========================
-def on_ticks(ticks):
-    global tick_data, pending_writes, write_counter, processed_tick_count, first_tick_received
-    if not csv_initialized:
-        initialize_csv()
-    if not first_tick_received and ticks:
-        print(f"\n🔍 First tick received! {str(ticks)[:150]}")
-        first_tick_received = True
-    current_time = datetime.now()
-    tick_list = ticks if isinstance(ticks, list) else [ticks]
-    if processed_tick_count % PRINT_FREQUENCY == 0:
-        runtime = (current_time - session_start_time).seconds
+# ============================================================
+# MONITOR
+# ============================================================
+
+class TickMonitor:
+    """
+    One monitoring session: config, feed, buffers and sinks
+
+    start() wires the feed and sinks and subscribes, run() is the blocking
+    snapshot/metrics loop, stop() disconnects and flushes everything.
+    run_session() does all three.
+    """
+
+    def __init__(self, config=None, feed=None, watchlist=None, tick_sink=None, bar_sink=None):
+        """
+        Initialize monitor (no connections, threads or files until start())
+
+        Args:
+            config: MonitorConfig (None = module defaults)
+            feed: BreezeConnect or stand-in with on_ticks/on_error attributes,
+                  ws_connect(), subscribe_feeds(stock_token=...) and ws_disconnect();
+                  feeds with manages_subscriptions=True subscribe themselves and
+                  may take pre-normalized batches via an on_batch attribute
+                  (None = connect_breeze() on start)
+            watchlist: (token, symbol) pairs (None = config.watchlist_file on start,
+                       hot-reloaded if config.watchlist_reload)
+            tick_sink: Tick store for the background writer (None = from config.tick_store)
+            bar_sink: Closed-bar sink (None = from config.tick_store); injected
+                      sinks are closed by stop()
+        """
+        self.config = config or MonitorConfig()
+        cfg = self.config
+        self.feed = feed
+        self.tick_sink = tick_sink
+        self.bar_sink = bar_sink
+
+        self.tokens = []
+        self.token_to_symbol = {}
+        self.token_parser = None
+        self.contracts = {}            # symbol -> {'lot_size', 'tick_size' (rupees), 'expiry_date'}
+        self.tick_buffer = TickRingBuffer(cfg.max_buffer_size)
+        self.bar_aggregator = BarAggregator(cfg.bar_interval, cfg.bar_close_grace)
+        self.order_books = OrderBookSet(cfg.book_window)
+        # publish_downstream may run on the conflator thread: held around it
+        # and around every other reader/writer of order_books
+        self.downstream_lock = threading.Lock()
+        self.snapshot_bars = []        # bars closed since the last snapshot
+        self.tick_writer = None
+        self.tick_journal = None
+        self.delta_snapshotter = None
+        self.tick_publisher = None
+        self.quote_table = None
+        self.conflator = None
+        self.git_publisher = None
+        self.metrics_server = None
+        self.subscriptions = None
+        self.watchlist_watcher = None
+        self.checkpoint_writer = None
+        self.checkpoint_stats = {'captures': 0, 'capture_ms': 0.0, 'max_capture_ms': 0.0, 'restore': None}
+        # Held while ticks are ingested, so a checkpoint taken from the main
+        # loop matches the journal position
+        self.ingest_lock = threading.Lock()
+        self._retired_symbols = []     # left the watchlist, dropped on the ingest thread
+        self.watchlist_stats = {'reloads': 0, 'last_reload': None, 'last_reload_ms': None,
+                                'added': [], 'removed': [], 'renamed': []}
+
+        self.first_tick_received = False
+        self.processed_tick_count = 0
+        self.session_start_time = datetime.now()
+        self.latency_tracker = LatencyTracker()
+        self.metrics_sources = {}      # name -> callable returning a dict for the metrics file
+        self.session_stats = new_session_stats()
+        self.running = False
+        self._connected = False
+        if watchlist is not None:
+            self.set_watchlist(watchlist)
+
+    def set_watchlist(self, token_symbol_list):
+        """Install the (token, symbol) list and preallocate per-symbol buffers"""
+        self.tokens = list(token_symbol_list)
+        self.token_to_symbol = {token: symbol for token, symbol in self.tokens}
+        for token, symbol in self.tokens:
+            self.tick_buffer.add_symbol(symbol)
+
+    def reload_watchlist(self, token_symbol_list):
+        """
+        Apply a new watchlist to the running session: subscribe added tokens,
+        unsubscribe removed ones, keep all state for the rest
+
+        Single-process sessions only: sharded sessions (SHARD_COUNT > 1)
+        subscribe each worker's shard once and never call this.
+
+        The token map is rebuilt from the new list (late ticks of removed
+        tokens become UNKNOWN). Symbols no longer watched under any token
+        lose their buffer, bar, book and metric series on the ingest thread
+        (retire_symbols), and their quote table rows are freed for reuse.
+
+        Returns:
+            dict: Reload summary (None if nothing changed)
+        """
+        start = time_module.perf_counter()
+        added, removed, renamed = diff_watchlist(self.tokens, token_symbol_list)
+        if not (added or removed or renamed):
+            return None
+        token_to_symbol = dict(token_symbol_list)
+        watched = set(token_to_symbol.values())
+        gone = sorted({symbol for _, symbol in self.tokens} - watched)
+        for token, symbol in added + [(token, new) for token, _, new in renamed]:
+            self.tick_buffer.add_symbol(symbol)
+            if self.quote_table:
+                try:
+                    self.quote_table.add(symbol, token)
+                except ValueError as e:
+                    print(f"⚠️ {symbol} not in quote table: {e}")
+        self.token_to_symbol = token_to_symbol    # swapped whole: on_ticks never sees a partial map
+        self.tokens = list(token_symbol_list)
+        self._retired_symbols.extend(gone)
+        if gone:
+            self.contracts = {symbol: c for symbol, c in self.contracts.items() if symbol in watched}
+        if self.token_parser:
+            self.add_contracts(added + [(token, new) for token, _, new in renamed])
+
+        subscribe_seconds = 0.0
+        subscriptions = self.subscriptions
+        if subscriptions:
+            for token, _, symbol in renamed:
+                subscriptions.symbols[token] = symbol
+            if removed:
+                subscriptions.unsubscribe([token for token, _ in removed])
+            if added:
+                subscribe_seconds = subscriptions.subscribe(added)
+        elif added or removed:
+            print("⚠️ Feed manages its own subscriptions: restart to subscribe/unsubscribe")
+
+        elapsed_ms = (time_module.perf_counter() - start) * 1000
+        summary = {
+            'reloads': self.watchlist_stats['reloads'] + 1,
+            'last_reload': datetime.now(),
+            'last_reload_ms': round(elapsed_ms, 1),
+            'added': [symbol for _, symbol in added],
+            'removed': [symbol for _, symbol in removed],
+            'renamed': [f"{old}->{new}" for _, old, new in renamed],
+        }
+        self.watchlist_stats = summary
+        print(f"🔄 Watchlist reloaded in {elapsed_ms:.1f}ms "
+              f"(subscribe {subscribe_seconds:.2f}s): "
+              f"+{len(added)} -{len(removed)} ~{len(renamed)} -> {len(self.tokens)} tokens"
+              + (f" | added: {', '.join(summary['added'])}" if added else "")
+              + (f" | removed: {', '.join(summary['removed'])}" if removed else ""))
+        return summary
+
+    def retire_symbols(self):
+        """Drop per-symbol state of symbols removed from the watchlist (ingest thread)"""
+        watched = set(self.token_to_symbol.values())
+        while self._retired_symbols:
+            symbol = self._retired_symbols.pop()
+            if symbol in watched:                # added back since
+                continue
+            self.tick_buffer.remove_symbol(symbol)
+            self.bar_aggregator.remove_symbol(symbol)
+            self.latency_tracker.remove_symbol(symbol)
+            if self.conflator:
+                self.conflator.remove_symbol(symbol)
+            with self.downstream_lock:
+                self.order_books.remove_symbol(symbol)
+                if self.quote_table:
+                    self.quote_table.remove(symbol)
+            if self.delta_snapshotter:
+                self.delta_snapshotter.remove_symbol(symbol)
+
+    def load_contracts(self):
+        """Load the token master and look up contract details for the watchlist"""
+        cfg = self.config
+        if not cfg.contract_enrich:
+            return
+        if not os.path.exists(cfg.token_file):
+            print(f"⚠️ Token file not found: {cfg.token_file} (ticks published without lot/tick size)")
+            return
+        self.token_parser = FuturesTokenParser(cfg.token_file)
+        self.add_contracts(self.tokens)
+        print(f"✓ Contract details for {len(self.contracts)}/{len(self.tokens)} watchlist tokens")
+
+    def add_contracts(self, token_symbol_list):
+        """Look up (token, symbol) pairs by token in the token master"""
+        contracts = dict(self.contracts)
+        for token, symbol in token_symbol_list:
+            contract_info = self.token_parser.get_contract_by_token(token)
+            if contract_info:
+                contracts[symbol] = {
+                    'lot_size': contract_info['lot_size'],
+                    'tick_size': contract_info['tick_size'],
+                    'expiry_date': contract_info['expiry_date'],
+                }
+        self.contracts = contracts     # swapped whole, like token_to_symbol
+
+    # ==================== SINKS ====================
+
+    def start_sinks(self):
+        cfg = self.config
+        self.tick_writer = BackgroundTickWriter(
+            self.tick_sink or create_tick_sink(cfg),
+            max_queue=cfg.write_queue_size,
+            policy=cfg.write_policy,
+            batch_size=cfg.batch_write_size,
+            flush_interval=cfg.write_flush_interval,
+            spill_file=spill_path(cfg),
+        )
+        self.tick_writer.start()
+        self.bar_aggregator = BarAggregator(cfg.bar_interval, cfg.bar_close_grace)
+        self.order_books = OrderBookSet(cfg.book_window)
+        if self.bar_sink is None:
+            self.bar_sink = create_bar_sink(cfg)
+        if cfg.journal_enabled:
+            self.tick_journal = TickJournal(journal_path(), cfg.journal_initial_records, cfg.journal_grow_records)
+        if cfg.pubsub_enabled:
+            self.tick_publisher = TickPublisher(cfg.pubsub_address)
+            self.tick_publisher.start()
+            self.metrics_sources['pubsub'] = self.tick_publisher.stats
+        if cfg.quote_table_enabled:
+            self.quote_table = QuoteTable(cfg.quote_table_name, max(cfg.quote_table_capacity, len(self.tokens)))
+            for token, symbol in self.tokens:
+                self.quote_table.add(symbol, token)
+            print(f"✓ Quote table in shared memory: {cfg.quote_table_name} ({len(self.tokens)} symbols)")
+            self.metrics_sources['quote_table'] = self.quote_table.stats
+        if cfg.conflate_interval_ms > 0:
+            self.conflator = TickConflator(cfg.conflate_interval_ms, self.publish_downstream)
+            self.conflator.start()
+            self.metrics_sources['conflation'] = self.conflator.stats
+        if cfg.checkpoint_enabled and not cfg.journal_enabled:
+            print("⚠️ Checkpoints off: without the tick journal (JOURNAL_ENABLED) they could never be restored")
+        elif cfg.checkpoint_enabled:
+            writer = self.checkpoint_writer = CheckpointWriter(checkpoint_path(checkpoint_dir=cfg.checkpoint_dir))
+            writer.start()
+            # Bound to this writer: stop() releases self.checkpoint_writer before the final metrics
+            self.metrics_sources['checkpoint'] = lambda: dict(self.checkpoint_stats, **writer.stats())
+
+    def publish_closed_bars(self):
+        """Move closed bars to the bar sink and the next snapshot"""
+        bars = self.bar_aggregator.drain_closed()
+        if bars:
+            self.snapshot_bars.extend(bars)
+            if self.bar_sink:
+                self.bar_sink.write_bars(bars)
+            if self.tick_publisher:
+                self.tick_publisher.publish_bars(bars)
+
+    def stop_sinks(self):
+        self.tick_writer.stop()
+        if self.conflator:
+            self.conflator.stop()
+            self.conflator = None
+        self.bar_aggregator.close_all()
+        self.publish_closed_bars()
+        if self.tick_publisher:
+            self.tick_publisher.stop()
+            self.tick_publisher = None
+        if self.quote_table:
+            self.quote_table.close()
+            self.quote_table = None
+        if self.bar_sink:
+            self.bar_sink.close()
+        if self.tick_journal:
+            self.tick_journal.close()
+            self.tick_journal = None
+
+    # ==================== CHECKPOINTS ====================
+
+    def _checkpoint_settings(self):
+        cfg = self.config
+        return {'max_buffer_size': cfg.max_buffer_size, 'bar_interval': cfg.bar_interval,
+                'book_window': cfg.book_window, 'tick_fields': list(TICK_FIELDS)}
+
+    def capture_checkpoint(self):
+        """
+        Copy session state (hold ingest_lock, or call while no feed is
+        running, so it matches the journal position)
+
+        Ring buffers are copied as arrays; bars, books and pending snapshot
+        bars are pickled here (much faster than deep-copying them).
+
+        Returns:
+            dict: Private copy, ready for CheckpointWriter.submit
+        """
+        journal = self.tick_journal
+        derived = {'bars': self.bar_aggregator, 'books': self.order_books, 'snapshot_bars': self.snapshot_bars}
+        with self.downstream_lock:
+            derived = pickle.dumps(derived, protocol=pickle.HIGHEST_PROTOCOL)
+        return {
+            'created_ns': time_module.time_ns(),
+            'settings': self._checkpoint_settings(),
+            'tokens': self.tokens,
+            'journal_path': journal.path if journal else None,
+            'journal_count': journal.count if journal else None,
+            'processed_tick_count': self.processed_tick_count,
+            'session_start': self.session_start_time,
+            'buffer': self.tick_buffer.copy(),
+            'derived': derived,
+        }
+
+    def take_checkpoint(self):
+        """Capture now (pausing ingest) and hand the copy to the checkpoint writer thread"""
+        start = time_module.perf_counter()
+        with self.ingest_lock:
+            state = self.capture_checkpoint()
+        self.checkpoint_writer.submit(state)
+        elapsed_ms = (time_module.perf_counter() - start) * 1000
+        stats = self.checkpoint_stats
+        stats['captures'] += 1
+        stats['capture_ms'] = round(elapsed_ms, 3)
+        stats['max_capture_ms'] = round(max(stats['max_capture_ms'], elapsed_ms), 3)
+
+    def restore_checkpoint(self, path=None):
+        """
+        Resume from a checkpoint: install its state, then replay the journal
+        records written after it
+
+        Args:
+            path: Checkpoint file (None = today's in config.checkpoint_dir)
+
+        Returns:
+            dict: Restore summary (None if nothing was restored)
+        """
+        start = time_module.perf_counter()
+        path = path or checkpoint_path(checkpoint_dir=self.config.checkpoint_dir)
+        if self.tick_journal is None:
+            # Without the journal every tick after the checkpoint would be silently lost
+            if os.path.exists(path):
+                print(f"⚠️ Checkpoint {path} not restored: the tick journal is off (JOURNAL_ENABLED)")
+            return None
+        state = load_checkpoint(path)
+        if state is None:
+            return None
+        if state['settings'] != self._checkpoint_settings():
+            print(f"⚠️ Checkpoint {path} taken with other settings {state['settings']}, not restored")
+            return None
+        self.tick_buffer = state['buffer']
+        for token, symbol in self.tokens:
+            self.tick_buffer.add_symbol(symbol)
+        derived = pickle.loads(state['derived'])
+        self.bar_aggregator = derived['bars']
+        with self.downstream_lock:
+            self.order_books = derived['books']
+        self.snapshot_bars = derived['snapshot_bars']
+        self.processed_tick_count = state['processed_tick_count']
+        self.session_start_time = state['session_start']
+        load_ms = (time_module.perf_counter() - start) * 1000
+
+        replayed = self._replay_journal_tail(state['journal_path'], state['journal_count'])
+        if self.quote_table:
+            with self.downstream_lock:
+                for symbol in self.tick_buffer.symbols():
+                    latest = self.tick_buffer.latest(symbol)
+                    if latest is not None:
+                        self.quote_table.update(symbol, latest.tolist(), self.tick_buffer.latest_recv(symbol))
+
+        elapsed_ms = (time_module.perf_counter() - start) * 1000
+        summary = {
+            'path': path,
+            'checkpoint_age_seconds': round((time_module.time_ns() - state['created_ns']) / 1e9, 1),
+            'symbols': len(self.tick_buffer.symbols()),
+            'journal_ticks_replayed': replayed,
+            'load_ms': round(load_ms, 1),
+            'total_ms': round(elapsed_ms, 1),
+        }
+        self.checkpoint_stats['restore'] = summary
+        print(f"♻️ Restored {path} ({summary['symbols']} symbols, "
+              f"{summary['checkpoint_age_seconds']:.0f}s old) + {replayed:,} journal ticks "
+              f"in {elapsed_ms:.1f}ms (load {load_ms:.1f}ms)")
+        return summary
+
+    def _replay_journal_tail(self, path, start_count):
+        journal = self.tick_journal
+        if journal is None or start_count is None or path != journal.path or journal.count <= start_count:
+            return 0
+        reader = JournalReader(journal.path)
+        records = reader.records()
+        tail = records[start_count:].copy()
+        del records                    # release the map before closing
+        reader.close()
+        symbols, rows = records_to_rows(tail, reader.price_scale)
+        for symbol, row in zip(symbols, rows):
+            self.replay_row(symbol, row)
+        return len(rows)
+
+    def replay_row(self, symbol, row):
+        """Re-apply a journaled tick on restore (not journaled or stored again)"""
+        self.tick_buffer.append(symbol, row)
+        self.bar_aggregator.update(symbol, row)
+        self.publish_downstream(symbol, row, row[RECV_INDEX])
+        self.processed_tick_count += 1
+
+    # ==================== METRICS ====================
+
+    def collect_metrics(self):
+        """
+        Gather health metrics for the metrics file and endpoint
+
+        Returns:
+            tuple: (MetricSet, extra JSON-only dict)
+        """
+        m = MetricSet()
+        now_ns = time_module.time_ns()
+        stats = self.session_stats
+        tick_buffer, tick_writer, git_publisher = self.tick_buffer, self.tick_writer, self.git_publisher
+        m.counter('ticks_processed_total', "Ticks processed this session", self.processed_tick_count)
+        m.gauge('ticks_per_second', "Tick rate over the last metrics interval", round(stats['ticks_per_sec'], 2))
+        for symbol in tick_buffer.symbols():
+            m.counter('ticks_total', "Ticks received per symbol", tick_buffer.total_ticks(symbol), {'symbol': symbol})
+        last_tick = stats['last_tick_ns']
+        m.gauge('last_tick_age_seconds', "Seconds since the last tick (stalled feed)",
+                round((now_ns - last_tick) / 1e9, 3) if last_tick else None)
+        m.gauge('buffer_ticks', "Ticks held in the in-memory ring buffers", len(tick_buffer))
+        m.gauge('buffer_capacity', "Ring buffer capacity (all symbols)", tick_buffer.capacity * len(tick_buffer.symbols()))
+
+        if tick_writer:
+            writer = tick_writer.stats()
+            m.gauge('write_queue_depth', "Ticks waiting for the writer thread", writer['queue_depth'])
+            m.counter('ticks_written_total', "Ticks written to the tick store", writer['written'])
+            m.counter('ticks_dropped_total', "Ticks dropped by the write queue", writer['dropped'])
+            m.counter('write_errors_total', "Failed tick store batch writes", writer['write_errors'])
+            for stat in ('last', 'avg', 'max'):
+                m.gauge('write_latency_ms', "Tick store batch write time", writer[f'{stat}_write_ms'], {'stat': stat})
+        if self.tick_journal:
+            m.counter('journal_records_total', "Records in the tick journal", self.tick_journal.count)
+        m.gauge('journal_flush_ms', "Last tick journal sync time", round(stats['journal_flush_ms'], 3))
+        m.counter('snapshots_total', "Snapshots written", stats['snapshots'])
+        m.counter('late_bar_ticks_total', "Ticks dropped because their bar had already closed",
+                  self.bar_aggregator.late_ticks)
+        for stat in ('last', 'max'):
+            m.gauge('snapshot_duration_ms', "Snapshot write time",
+                    round(stats['snapshot_ms' if stat == 'last' else 'max_snapshot_ms'], 3), {'stat': stat})
+
+        m.gauge('git_publish_lag_seconds', "Age of the oldest unpublished snapshot",
+                round(git_publisher.publish_lag(), 1) if git_publisher else 0.0)
+        if git_publisher:
+            m.counter('git_push_failures_total', "Failed git push attempts", git_publisher.push_failures)
+        m.counter('ws_connect_attempts_total', "Websocket connect attempts, the first included",
+                  stats['ws_connect_attempts'])
+        m.counter('ws_errors_total', "Websocket errors reported by the feed", stats['ws_errors'])
+
+        feed_lag, callback = self.latency_tracker.feed_lag_all, self.latency_tracker.callback
+        for q in (50, 99):
+            m.gauge('feed_lag_ms', "Receive time minus exchange time", round(feed_lag.percentile(q), 3), {'quantile': str(q / 100)})
+            m.gauge('callback_ms', "Tick callback processing time", round(callback.percentile(q), 3), {'quantile': str(q / 100)})
+        m.gauge('process_rss_bytes', "Resident memory of the monitor process", process_rss_bytes())
+
+        extra = {
+            'updated': datetime.now(),
+            'session_start': self.session_start_time,
+            'latency': self.latency_tracker.summary(),
+        }
+        if tick_writer:
+            extra['writer'] = tick_writer.stats()
+        if git_publisher:
+            extra['git'] = git_publisher.stats()
+        for name, source in self.metrics_sources.items():
+            extra[name] = source()
+        return m, extra
+
+    def write_metrics(self):
+        """Rewrite the metrics file"""
+        metrics, extra = self.collect_metrics()
+        write_json_atomic(self.config.metrics_file, dict(metrics.to_dict(), **extra))
+
+    def start_metrics_server(self):
+        cfg = self.config
+        if cfg.metrics_http:
+            self.metrics_server = MetricsServer(self.collect_metrics, port=cfg.metrics_port)
+            try:
+                self.metrics_server.start()
+            except OSError as e:
+                print(f"⚠️ Metrics endpoint not started (port {cfg.metrics_port}): {e}")
+                self.metrics_server = None
+
+    def stop_metrics_server(self):
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    # ==================== SNAPSHOT + GIT ====================
+
+    def create_snapshot(self):
+        start = time_module.perf_counter()
+        snap_file = self.create_delta_snapshot() if self.config.snapshot_mode == 'delta' else self.create_full_snapshot()
+        elapsed_ms = (time_module.perf_counter() - start) * 1000
+        stats = self.session_stats
+        stats['snapshots'] += 1
+        stats['snapshot_ms'] = elapsed_ms
+        stats['max_snapshot_ms'] = max(stats['max_snapshot_ms'], elapsed_ms)
+        return snap_file
+
+    def create_delta_snapshot(self):
+        if self.delta_snapshotter is None:
+            self.delta_snapshotter = DeltaSnapshotter(self.config.snapshot_dir, self.config.snapshot_keyframe_every)
+        bars = list(self.snapshot_bars)
+        self.snapshot_bars.clear()
+        with self.downstream_lock:
+            snap_file = self.delta_snapshotter.write(self.tick_buffer, bars, books=self.order_books)
+        print(f"✓ Snapshot written: {snap_file}")
+        return snap_file
+
+    def create_full_snapshot(self):
+        snapshot_quotes = []
+        current_time = datetime.now()
+        for symbol in self.tick_buffer.symbols():
+            snapshot_quotes.extend(self.tick_buffer.to_records(symbol))
+        bars = bars_for_json(self.snapshot_bars)
+        self.snapshot_bars.clear()
+        snap_time = current_time.strftime('%Y%m%d_%H%M%S')
+        os.makedirs(self.config.snapshot_dir, exist_ok=True)
+        snap_file = os.path.join(self.config.snapshot_dir, f"fut_snapshot_{snap_time}.json")
+        with self.downstream_lock:
+            books = self.order_books.summaries()
+        with open(snap_file, 'w') as f:
+            json.dump({
+                'snapshot_time': current_time,
+                'bar_interval': self.config.bar_interval,
+                'bars': bars,
+                'books': books,
+                'ticks': snapshot_quotes,
+            }, f, indent=2, default=str)  # default=str to handle timestamps
+        print(f"✓ Snapshot written: {snap_file}")
+        return snap_file
+
+    def start_git_publisher(self):
+        if self.config.git_publish:
+            self.git_publisher = GitPublisher(min_interval=self.config.git_interval,
+                                              max_retries=self.config.git_max_retries)
+            self.git_publisher.start()
+
+    def stop_git_publisher(self):
+        publisher = self.git_publisher
+        if publisher:
+            publisher.stop()
+            print(f"✓ Git publisher stopped ({publisher.pushes} pushes, "
+                  f"{publisher.push_failures} failed attempts)")
+            self.git_publisher = None
+
+    # ==================== TICK CALLBACK ====================
+
+    def print_status(self):
+        current_time = datetime.now()
+        runtime = (current_time - self.session_start_time).seconds
+        writer = self.tick_writer
         print(f"📊 [{current_time.strftime('%H:%M:%S')}] "
-              f"Processed: {processed_tick_count:,} | "
-              f"Buffer: {len(tick_data)} | "
+              f"Processed: {self.processed_tick_count:,} | "
+              f"Buffer: {len(self.tick_buffer)} | "
+              f"Write queue: {writer.queue_depth()} ({writer.last_write_ms:.1f}ms) | "
+              f"Git lag: {self.git_publisher.publish_lag() if self.git_publisher else 0:.0f}s | "
+              f"{self.latency_tracker.status_line()} | "
               f"Runtime: {runtime//60}m {runtime%60}s")
-    for tick in tick_list:
-        token = tick.get('symbol')
-        symbol = token_to_symbol.get(token, "UNKNOWN")
-        new_tick = {
-            'Symbol': symbol,
-            'exchange_timestamp': current_time,
-            'last_price': safe_float(tick.get('last', tick.get('ltp', 0))),
-            'volume_traded': safe_int(tick.get('ttq', tick.get('volume', 0))),
-            'last_traded_quantity': safe_int(tick.get('ltq', 0)),
-            'open_interest': safe_int(tick.get('OI', 0)),
-            'change_in_oi': safe_int(tick.get('CHNGOI', 0)),
-        }
-        for i in range(5):
-            new_tick[f'bid_price_{i+1}'] = safe_float(safe_get_depth(tick, 'bPrice', i, 0))
-            new_tick[f'bid_qty_{i+1}'] = safe_int(safe_get_depth(tick, 'bQty', i, 0))
-            new_tick[f'ask_price_{i+1}'] = safe_float(safe_get_depth(tick, 'sPrice', i, 0))
-            new_tick[f'ask_qty_{i+1}'] = safe_int(safe_get_depth(tick, 'sQty', i, 0))
-        new_tick['total_buy_qty'] = safe_int(tick.get('totalBuyQt', 0))
-        new_tick['total_sell_qty'] = safe_int(tick.get('totalSellQ', 0))
-        tick_data.append(new_tick)
-        pending_writes.append(new_tick)
-        processed_tick_count += 1
-    write_counter += len(tick_list)
-    if write_counter >= BATCH_WRITE_SIZE:
-        append_to_csv_batch(pending_writes)
-        pending_writes = []
-        write_counter = 0
-    if len(tick_data) > MAX_BUFFER_SIZE:
-        removed = len(tick_data) - MAX_BUFFER_SIZE
-        tick_data = tick_data[-MAX_BUFFER_SIZE:]
-        print(f"   🧹 Memory buffer cleared ({removed} old ticks removed)")
-
-def on_error(error):
-    print(f"❌ WebSocket Error: {error}")
-
-breeze.on_ticks = on_ticks
-breeze.on_error = on_error
-
-print("\n🔌 Connecting to websocket...")
-max_retries = 3
-retry_count = 0
-connected = False
-while retry_count < max_retries and not connected:
+
+    def ingest_row(self, symbol, row, recv_ns):
+        """Push one normalized row through buffer, latency, bars, journal and writer"""
+        self.tick_buffer.append(symbol, row)
+        if row[0] != recv_ns:       # equal only when the tick had no usable 'ltt'
+            self.latency_tracker.record_tick(symbol, row[0], recv_ns)
+        self.bar_aggregator.update(symbol, row)
+        if self.tick_journal:
+            self.tick_journal.append(symbol, row)
+        self.tick_writer.put((symbol, row))
+        if self.conflator:
+            self.conflator.update(symbol, row, recv_ns)
+        else:
+            self.publish_downstream(symbol, row, recv_ns)
+        self.processed_tick_count += 1
+
+    def publish_downstream(self, symbol, row, recv_ns, extras=None):
+        """Order books, pub/sub and quote table (every tick, or conflated updates)"""
+        with self.downstream_lock:
+            self.order_books.update(symbol, row)
+            if self.tick_publisher:
+                contract = self.contracts.get(symbol)
+                if contract:
+                    extras = {**contract, **extras} if extras else contract
+                self.tick_publisher.publish_tick(symbol, row, recv_ns, extras)
+            if self.quote_table:
+                self.quote_table.update(symbol, row, recv_ns)
+
+    def on_ticks(self, ticks):
+        callback_start = time_module.perf_counter()
+        if not self.first_tick_received and ticks:
+            print(f"\n🔍 First tick received! {str(ticks)[:150]}")
+            self.first_tick_received = True
+        ts_ns = time_module.time_ns()
+        self.session_stats['last_tick_ns'] = ts_ns
+        tick_list = ticks if isinstance(ticks, list) else [ticks]
+        if self.processed_tick_count % self.config.print_frequency == 0:
+            self.print_status()
+        if len(tick_list) >= BATCH_NORMALIZE_MIN:
+            rows = normalize_batch(tick_list, ts_ns).tolist()
+        else:
+            rows = [build_tick_row(tick, ts_ns) for tick in tick_list]
+        subscriptions = self.subscriptions
+        awaiting = subscriptions.pending if subscriptions else ()
+        token_to_symbol = self.token_to_symbol
+        with self.ingest_lock:
+            for tick, row in zip(tick_list, rows):
+                token = tick.get('symbol')
+                if token in awaiting:
+                    subscriptions.confirm(token)
+                self.ingest_row(token_to_symbol.get(token, "UNKNOWN"), row, ts_ns)
+            if self._retired_symbols:
+                self.retire_symbols()
+        self.latency_tracker.record_callback((time_module.perf_counter() - callback_start) * 1000)
+
+    def ingest_batch(self, batch):
+        """Merge (symbol, recv_ns, row) tuples normalized by shard workers (tick_shards.py)"""
+        merge_start = time_module.perf_counter()
+        print_frequency = self.config.print_frequency
+        printed_at = self.processed_tick_count // print_frequency
+        with self.ingest_lock:
+            for symbol, recv_ns, row in batch:
+                self.ingest_row(symbol, row, recv_ns)
+            if self._retired_symbols:
+                self.retire_symbols()
+        if batch:
+            self.session_stats['last_tick_ns'] = batch[-1][1]
+        if self.processed_tick_count // print_frequency != printed_at:
+            self.print_status()
+        self.latency_tracker.record_callback((time_module.perf_counter() - merge_start) * 1000)
+
+    def on_error(self, error):
+        self.session_stats['ws_errors'] += 1
+        print(f"❌ WebSocket Error: {error}")
+
+    # ==================== CONNECTION ====================
+
+    def connect_websocket(self, max_retries=3):
+        print("\n🔌 Connecting to websocket...")
+        retry_count = 0
+        while retry_count < max_retries:
+            try:
+                if retry_count > 0:
+                    print(f"   ⏳ Retry {retry_count + 1}/{max_retries}...")
+                    time_module.sleep(5)
+                self.session_stats['ws_connect_attempts'] += 1
+                self.feed.ws_connect()
+                print("✓ Websocket connected!")
+                return
+            except Exception as e:
+                retry_count += 1
+                print(f"   ⚠️  Attempt {retry_count} failed: {str(e)[:100]}")
+        print(f"\n❌ Failed after {max_retries} attempts.")
+        raise ConnectionError(f"Websocket connect failed after {max_retries} attempts")
+
+    def subscribe_all(self, rate=None):
+        """
+        Subscribe the watchlist through a rate-limited SubscriptionManager
+
+        Args:
+            rate: Subscribe calls per second (None = config.subscribe_rate, 0 = unlimited)
+        """
+        options = self.config.subscription_options()
+        if rate is not None:
+            options['rate'] = rate
+        print(f"\n📡 Subscribing to feeds...")
+        self.subscriptions = SubscriptionManager(self.feed, **options)
+        self.metrics_sources['subscriptions'] = self.subscriptions.stats
+        self.subscriptions.subscribe(self.tokens)
+        self.subscriptions.report()
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self, subscribe_rate=None):
+        """
+        Start sinks and background threads, connect the feed and subscribe
+
+        Args:
+            subscribe_rate: Subscribe calls per second (None = config.subscribe_rate, 0 = unlimited)
+        """
+        cfg = self.config
+        if not self.tokens:
+            self.set_watchlist(load_watchlist(cfg.watchlist_file))
+            if cfg.watchlist_reload:
+                self.watchlist_watcher = WatchlistWatcher(cfg.watchlist_file, load_watchlist)
+                self.metrics_sources['watchlist'] = lambda: dict(self.watchlist_stats, tokens=len(self.tokens))
+        if self.token_parser is None:
+            self.load_contracts()
+        if self.feed is None:
+            self.feed = connect_breeze()
+        feed = self.feed
+        self.session_start_time = datetime.now()
+        self.subscriptions = None
+        self.latency_tracker = LatencyTracker()
+        self.session_stats = new_session_stats()
+        self.start_sinks()
+        if cfg.checkpoint_restore:
+            self.restore_checkpoint()
+        self.start_git_publisher()
+        self.start_metrics_server()
+        self.running = True
+        feed.on_ticks = self.on_ticks
+        feed.on_error = self.on_error
+        if hasattr(feed, 'on_batch'):
+            feed.on_batch = self.ingest_batch
+
+        try:
+            self.connect_websocket()
+            self._connected = True
+            if not getattr(feed, 'manages_subscriptions', False):
+                self.subscribe_all(subscribe_rate)
+        except BaseException:
+            self.stop()
+            raise
+
+        print("\n" + "="*80)
+        print("🔴 LIVE STREAMING (MULTI-STOCK)")
+        print("="*80)
+        print(f"Tracking: {', '.join([symbol for token, symbol in self.tokens])}")
+        print(f"Market: {cfg.market_start.strftime('%H:%M')} - {cfg.market_end.strftime('%H:%M')}")
+        print(f"Press Ctrl+C to stop\n")
+
+    def run(self, stop_condition=None):
+        """
+        Snapshot / bar flush / journal sync / metrics loop (git publishing happens on
+        the publisher thread, this loop never waits on git)
+
+        Args:
+            stop_condition: Optional callable, loop ends when it returns True
+                            (market close is always checked for live sessions)
+
+        Returns:
+            str: Last snapshot file (or None)
+        """
+        cfg = self.config
+        stats = self.session_stats
+        last_snapshot_time = time_module.time()
+        last_journal_flush = time_module.time()
+        last_metrics_time = time_module.time()
+        last_watchlist_poll = time_module.time()
+        last_checkpoint = time_module.time()
+        last_metrics_count = self.processed_tick_count
+        last_snapshot_file = None
+
+        try:
+            while True:
+                time_module.sleep(0.25)
+                now_ts = time_module.time()
+                # Close finished bars (also for symbols with no new ticks)
+                self.bar_aggregator.flush()      # by exchange time, not the local clock
+                self.publish_closed_bars()
+                # Snapshot every minute
+                if now_ts - last_snapshot_time >= cfg.snapshot_interval:
+                    last_snapshot_file = self.create_snapshot()
+                    last_snapshot_time = now_ts
+                    if self.git_publisher:
+                        self.git_publisher.submit(last_snapshot_file)
+                # Journal sync
+                if self.tick_journal and now_ts - last_journal_flush >= cfg.journal_flush_interval:
+                    flush_start = time_module.perf_counter()
+                    self.tick_journal.flush()
+                    flush_ms = (time_module.perf_counter() - flush_start) * 1000
+                    stats['journal_flush_ms'] = flush_ms
+                    stats['max_journal_flush_ms'] = max(stats['max_journal_flush_ms'], flush_ms)
+                    last_journal_flush = now_ts
+                # Checkpoint (also when the feed is quiet)
+                if self.checkpoint_writer and now_ts - last_checkpoint >= cfg.checkpoint_interval:
+                    self.take_checkpoint()
+                    last_checkpoint = now_ts
+                # Watchlist hot reload
+                if self.watchlist_watcher and now_ts - last_watchlist_poll >= cfg.watchlist_poll_interval:
+                    token_symbol_list = self.watchlist_watcher.poll()
+                    if token_symbol_list is not None:
+                        self.reload_watchlist(token_symbol_list)
+                    last_watchlist_poll = now_ts
+                # Metrics file
+                if now_ts - last_metrics_time >= cfg.metrics_interval:
+                    stats['ticks_per_sec'] = (self.processed_tick_count - last_metrics_count) / (now_ts - last_metrics_time)
+                    last_metrics_count = self.processed_tick_count
+                    self.write_metrics()
+                    last_metrics_time = now_ts
+                if stop_condition is not None:
+                    if stop_condition():
+                        break
+                # Market close check
+                elif datetime.now().time() >= cfg.market_end:
+                    print("\nMarket closed. Auto-stopping...")
+                    break
+        except KeyboardInterrupt:
+            print("⏹️ MANUAL STOP")
+        return last_snapshot_file
+
+    def stop(self):
+        """Disconnect the feed, flush and close sinks, write final metrics"""
+        if not self.running:
+            return
+        self.running = False
+        print("Disconnecting...")
+        if self.subscriptions:
+            self.subscriptions.stop()
+        if self._connected:
+            self.feed.ws_disconnect()
+            self._connected = False
+        if self.checkpoint_writer:
+            self.take_checkpoint()
+            self.checkpoint_writer.stop()
+            self.checkpoint_writer = None
+        self.stop_sinks()
+        self.stop_git_publisher()
+        self.write_metrics()
+        self.stop_metrics_server()
+        print(f"✓ Metrics written: {self.config.metrics_file}")
+
+    def run_session(self, stop_condition=None, subscribe_rate=None):
+        """
+        start(), run() until stopped, then stop()
+
+        Args:
+            stop_condition: Optional callable ending the session (see run())
+            subscribe_rate: Subscribe calls per second (None = config.subscribe_rate, 0 = unlimited)
+
+        Returns:
+            str: Last snapshot file (or None)
+        """
+        self.start(subscribe_rate)
+        try:
+            return self.run(stop_condition)
+        finally:
+            self.stop()
+
+
+def main():
+    cfg = MonitorConfig()
     try:
-        if retry_count > 0:
-            print(f"   ⏳ Retry {retry_count + 1}/{max_retries}...")
-            time_module.sleep(5)
-        breeze.ws_connect()
-        print("✓ Websocket connected!")
-        connected = True
-    except Exception as e:
-        retry_count += 1
-        print(f"   ⚠️  Attempt {retry_count} failed: {str(e)[:100]}")
-        if retry_count >= max_retries:
-            print(f"\n❌ Failed after {max_retries} attempts.")
-            exit(1)
-
-print(f"\n📡 Subscribing to feeds...")
-for token, symbol in TOKENS:
-    breeze.subscribe_feeds(stock_token=token)
-    print(f"✓ Subscribed: {symbol} ({token})")
-    time_module.sleep(1)
-
-print("\n" + "="*80)
-print("🔴 LIVE STREAMING (MULTI-STOCK)")
-print("="*80)
-print(f"Tracking: {', '.join([symbol for token, symbol in TOKENS])}")
-print(f"Market: {MARKET_START.strftime('%H:%M')} - {MARKET_END.strftime('%H:%M')}")
-print(f"Press Ctrl+C to stop\n")
+        if cfg.shard_count > 1:
+            from tick_shards import run_sharded
+            run_sharded(load_watchlist(cfg.watchlist_file), cfg.shard_count, config=cfg)
+        else:
+            TickMonitor(cfg).run_session()
+    except ConnectionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print("🎉 Multi-stock collector script completed!")
 
-# ===========================
-# MAIN LOOP + SNAPSHOT + GIT PUBLISH
-# ===========================
-last_snapshot_time = time_module.time()
-last_git_time = time_module.time()
-last_snapshot_file = None
-
-try:
-    while True:
-        time_module.sleep(0.25)
-        now_ts = time_module.time()
-        # Snapshot every minute
-        if now_ts - last_snapshot_time >= SNAPSHOT_INTERVAL:
-            last_snapshot_file = create_snapshot()
-            last_snapshot_time = now_ts
-        # Git publish every 5 min
-        if last_snapshot_file and (now_ts - last_git_time >= GIT_INTERVAL):
-            git_publish(last_snapshot_file)
-            last_git_time = now_ts
-        # Market close check
-        if datetime.now().time() >= MARKET_END:
-            print("\nMarket closed. Auto-stopping...")
-            break
-except KeyboardInterrupt:
-    print("⏹️ MANUAL STOP")
-
-print("Disconnecting...")
-breeze.ws_disconnect()
-if len(pending_writes) > 0:
-    append_to_csv_batch(pending_writes)
-    print(f"✓ Wrote final {len(pending_writes)} ticks")
-if last_snapshot_file:
-    git_publish(last_snapshot_file)
-print("🎉 Multi-stock collector script completed!")
+
+if __name__ == "__main__":
+    main()
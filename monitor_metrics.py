@@ -0,0 +1,164 @@
+"""
+Monitor Metrics Exposition
+Health metrics for a running live_tick_monitor session
+- MetricSet: gauges/counters with labels, rendered as Prometheus text or JSON
+- MetricsServer: local HTTP endpoint (/metrics Prometheus, /metrics.json)
+- write_json_atomic: periodically rewritten metrics file for cron/alerts
+- process_rss_bytes: current resident memory (psutil, /proc, or peak RSS)
+
+Scrape:
+    curl -s localhost:9108/metrics
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+METRICS_PORT = 9108
+METRIC_PREFIX = "nse_"
+
+
+def process_rss_bytes():
+    """Resident set size of this process in bytes (0 if unknown)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024   # peak, KiB on Linux
+    except ImportError:
+        return 0
+
+
+def write_json_atomic(path, data):
+    """Rewrite a JSON file so readers never see a partial document"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def _format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(label_value):
+    return str(label_value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricSet:
+    """One collection pass worth of metrics"""
+
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self._metrics = {}             # name -> (type, help, [(labels dict, value)])
+
+    def _add(self, kind, name, help_text, value, labels):
+        entry = self._metrics.setdefault(name, (kind, help_text, []))
+        entry[2].append((labels or {}, value))
+
+    def gauge(self, name, help_text, value, labels=None):
+        self._add('gauge', name, help_text, value, labels)
+
+    def counter(self, name, help_text, value, labels=None):
+        self._add('counter', name, help_text, value, labels)
+
+    def prometheus(self):
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for name, (kind, help_text, samples) in self._metrics.items():
+            full_name = self.prefix + name
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{full_name}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{full_name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self):
+        """
+        JSON form: unlabelled metrics map to a value, single-label metrics
+        to {label value: value}, multi-label metrics to a list of samples
+        """
+        data = {}
+        for name, (_, _, samples) in self._metrics.items():
+            if len(samples) == 1 and not samples[0][0]:
+                data[name] = samples[0][1]
+            elif all(len(labels) == 1 for labels, _ in samples):
+                data[name] = {next(iter(labels.values())): value for labels, value in samples}
+            else:
+                data[name] = [dict(labels, value=value) for labels, value in samples]
+        return data
+
+
+class MetricsServer:
+
+    def __init__(self, collect, host="127.0.0.1", port=METRICS_PORT):
+        """
+        Initialize server
+
+        Args:
+            collect: Callable returning (MetricSet, extra JSON dict)
+            host: Bind address (keep local)
+            port: TCP port
+        """
+        self.collect = collect
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        collect = self.collect
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/metrics':
+                    body = collect()[0].prometheus().encode()
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif path == '/metrics.json':
+                    metrics, extra = collect()
+                    body = json.dumps(dict(metrics.to_dict(), **extra), indent=2, default=str).encode()
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        print(f"✓ Metrics endpoint: http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,155 @@
+"""
+Live Order Book State
+Per-symbol top-5 book with microstructure metrics, updated O(1) per tick
+- spread, mid, microprice (queue-weighted mid)
+- depth imbalance over the 5 levels: (bid qty - ask qty) / (bid qty + ask qty)
+- buy/sell pressure ratio: totalBuyQt / totalSellQ
+- Rolling window (last N two-sided ticks) per metric with O(1) means
+"""
+
+import math
+import numpy as np
+from tick_buffer import TICK_FIELDS, DEPTH_LEVELS
+
+METRICS = ('spread', 'mid', 'microprice', 'imbalance', 'pressure')
+BOOK_WINDOW = 300              # ticks kept per symbol for rolling metrics
+
+# Row positions (rows are tuples in TICK_FIELDS order)
+_TS = TICK_FIELDS.index('exchange_timestamp')
+_LAST = TICK_FIELDS.index('last_price')
+_BID_PX = [TICK_FIELDS.index(f'bid_price_{i}') for i in range(1, DEPTH_LEVELS + 1)]
+_BID_QTY = [TICK_FIELDS.index(f'bid_qty_{i}') for i in range(1, DEPTH_LEVELS + 1)]
+_ASK_PX = [TICK_FIELDS.index(f'ask_price_{i}') for i in range(1, DEPTH_LEVELS + 1)]
+_ASK_QTY = [TICK_FIELDS.index(f'ask_qty_{i}') for i in range(1, DEPTH_LEVELS + 1)]
+_TOTAL_BUY = TICK_FIELDS.index('total_buy_qty')
+_TOTAL_SELL = TICK_FIELDS.index('total_sell_qty')
+
+WINDOW_DTYPE = np.dtype([('ts', 'i8')] + [(name, 'f8') for name in METRICS])
+
+
+def _rounded(value, digits=6):
+    return None if value is None or math.isnan(value) else round(value, digits)
+
+
+class OrderBook:
+    """Top-of-book state and rolling metrics for one symbol"""
+
+    def __init__(self, symbol, window=BOOK_WINDOW):
+        self.symbol = symbol
+        self.window = window
+        self.bids = [(0.0, 0)] * DEPTH_LEVELS     # (price, qty) best first
+        self.asks = [(0.0, 0)] * DEPTH_LEVELS
+        self.last_price = 0.0
+        self.timestamp = 0
+        self.updates = 0
+
+        self.spread = math.nan
+        self.mid = math.nan
+        self.microprice = math.nan
+        self.imbalance = math.nan
+        self.pressure = math.nan
+
+        self._history = np.zeros(window, dtype=WINDOW_DTYPE)
+        self._count = 0                           # two-sided ticks ever recorded
+        self._sums = dict.fromkeys(METRICS, 0.0)
+
+    def update(self, row):
+        """Apply one tick row (TICK_FIELDS order)"""
+        self.timestamp = row[_TS]
+        self.last_price = row[_LAST]
+        self.bids = [(row[p], row[q]) for p, q in zip(_BID_PX, _BID_QTY)]
+        self.asks = [(row[p], row[q]) for p, q in zip(_ASK_PX, _ASK_QTY)]
+        self.updates += 1
+
+        bid, bid_qty = self.bids[0]
+        ask, ask_qty = self.asks[0]
+        total_buy, total_sell = row[_TOTAL_BUY], row[_TOTAL_SELL]
+        self.pressure = total_buy / total_sell if total_sell else math.nan
+
+        if bid <= 0 or ask <= 0:
+            self.spread = self.mid = self.microprice = self.imbalance = math.nan
+            return
+        self.spread = ask - bid
+        self.mid = (bid + ask) / 2
+        top_qty = bid_qty + ask_qty
+        self.microprice = (bid * ask_qty + ask * bid_qty) / top_qty if top_qty else self.mid
+        bid_depth = sum(q for _, q in self.bids)
+        ask_depth = sum(q for _, q in self.asks)
+        depth = bid_depth + ask_depth
+        self.imbalance = (bid_depth - ask_depth) / depth if depth else 0.0
+        self._record()
+
+    def _record(self):
+        slot = self._count % self.window
+        entry = self._history[slot]
+        full = self._count >= self.window
+        pressure = 0.0 if math.isnan(self.pressure) else self.pressure   # 0 when totalSellQ is 0
+        values = (self.spread, self.mid, self.microprice, self.imbalance, pressure)
+        for name, value in zip(METRICS, values):
+            if full:
+                self._sums[name] -= float(entry[name])
+            self._sums[name] += value
+        self._history[slot] = (self.timestamp,) + values
+        self._count += 1
+        if slot == self.window - 1:
+            # Re-anchor running sums once per window to stop float drift
+            for name in METRICS:
+                self._sums[name] = float(self._history[name].sum())
+
+    # ==================== QUERIES ====================
+
+    def rolling_mean(self, metric):
+        """Mean of a metric over the rolling window (nan if empty)"""
+        n = min(self._count, self.window)
+        return self._sums[metric] / n if n else math.nan
+
+    def history(self):
+        """Rolling window as a chronological structured array (copy)"""
+        if self._count <= self.window:
+            return self._history[:self._count].copy()
+        head = self._count % self.window
+        return np.concatenate([self._history[head:], self._history[:head]])
+
+    def summary(self):
+        """Current metrics + rolling means as a JSON-ready dict"""
+        summary = {
+            'bid': self.bids[0][0],
+            'ask': self.asks[0][0],
+            'spread': _rounded(self.spread),
+            'mid': _rounded(self.mid),
+            'microprice': _rounded(self.microprice),
+            'imbalance': _rounded(self.imbalance),
+            'pressure': _rounded(self.pressure),
+            'window': min(self._count, self.window),
+        }
+        for metric in METRICS:
+            summary[f'avg_{metric}'] = _rounded(self.rolling_mean(metric))
+        return summary
+
+
+class OrderBookSet:
+    """Order books for every symbol the monitor sees"""
+
+    def __init__(self, window=BOOK_WINDOW):
+        self.window = window
+        self.books = {}
+
+    def update(self, symbol, row):
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol, self.window)
+        book.update(row)
+
+    def remove_symbol(self, symbol):
+        self.books.pop(symbol, None)
+
+    def get(self, symbol):
+        """OrderBook for a symbol, or None before its first tick"""
+        return self.books.get(symbol)
+
+    def summary(self, symbol):
+        book = self.books.get(symbol)
+        return book.summary() if book else None
+
+    def summaries(self):
+        return {symbol: book.summary() for symbol, book in self.books.items()}
@@ -0,0 +1,301 @@
+"""
+Shared-Memory Latest-Quote Table
+Fixed-layout table of the latest quote per symbol in multiprocessing.shared_memory
+- One row per watchlist token: LTP, volume, OI, top of book, totals, times
+- Writer (live_tick_monitor) updates a row in place per tick; ticks of
+  unregistered symbols are counted and skipped, rows of removed symbols
+  are cleared and reused
+- Per-row seqlock: sequence is odd while a row is being written, readers
+  retry until they see the same even sequence before and after a copy
+- Readers attach by name: QuoteTableReader().view() is a zero-copy NumPy
+  view, read()/snapshot() return consistent copies
+
+Reader:
+    from quote_table import QuoteTableReader
+    quotes = QuoteTableReader()
+    print(quotes.read('RELIND')['last_price'])
+    table = quotes.snapshot()          # structured array, one row per symbol
+"""
+
+import sys
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from tick_buffer import TICK_FIELDS
+
+QUOTE_TABLE_NAME = "nse_latest_quotes"
+QUOTE_TABLE_CAPACITY = 512
+MAGIC = b'QUOTETB1'
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<i8'),
+    ('capacity', '<i8'),
+    ('rows', '<i8'),               # rows ever used (freed rows have an empty Symbol)
+    ('row_size', '<i8'),
+    ('created_ns', '<i8'),
+    ('reserved', '<i8', (2,)),
+])  # 64 bytes
+
+QUOTE_DTYPE = np.dtype([
+    ('Symbol', 'S16'),
+    ('token', 'S24'),
+    ('exchange_timestamp', '<i8'),
+    ('recv_ns', '<i8'),
+    ('last_price', '<f8'),
+    ('volume_traded', '<i8'),
+    ('open_interest', '<i8'),
+    ('change_in_oi', '<i8'),
+    ('bid_price_1', '<f8'),
+    ('bid_qty_1', '<i8'),
+    ('ask_price_1', '<f8'),
+    ('ask_qty_1', '<i8'),
+    ('total_buy_qty', '<i8'),
+    ('total_sell_qty', '<i8'),
+    ('updates', '<i8'),
+])
+
+# Tick row positions copied into a quote row (after Symbol/token)
+_ROW_FIELDS = ['exchange_timestamp', 'last_price', 'volume_traded', 'open_interest', 'change_in_oi',
+               'bid_price_1', 'bid_qty_1', 'ask_price_1', 'ask_qty_1', 'total_buy_qty', 'total_sell_qty']
+_IDX = [TICK_FIELDS.index(name) for name in _ROW_FIELDS]
+# Writer stores through flat 8-byte memoryviews: (word offset in row, is_float) per tick value
+_ROW_WORDS = QUOTE_DTYPE.itemsize // 8
+_SLOTS = [(QUOTE_DTYPE.fields[name][1] // 8, QUOTE_DTYPE.fields[name][0].kind == 'f') for name in _ROW_FIELDS]
+_RECV_WORD = QUOTE_DTYPE.fields['recv_ns'][1] // 8
+_UPDATES_WORD = QUOTE_DTYPE.fields['updates'][1] // 8
+
+
+def _layout(capacity):
+    seq_offset = HEADER_DTYPE.itemsize
+    data_offset = seq_offset + 8 * capacity
+    return seq_offset, data_offset, data_offset + QUOTE_DTYPE.itemsize * capacity
+
+
+_created = set()                   # tables created by this process
+
+
+def _attach(name):
+    """Attach without registering with the resource tracker (it would unlink on reader exit)"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if name in _created:
+        return shm
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+class _TableViews:
+
+    def _map(self, shm, capacity):
+        seq_offset, data_offset, _ = _layout(capacity)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf, offset=0)
+        self.seq = np.ndarray(capacity, dtype='<i8', buffer=shm.buf, offset=seq_offset)
+        self.data = np.ndarray(capacity, dtype=QUOTE_DTYPE, buffer=shm.buf, offset=data_offset)
+
+
+# ============================================================
+# WRITER
+# ============================================================
+
+class QuoteTable(_TableViews):
+
+    def __init__(self, name=QUOTE_TABLE_NAME, capacity=QUOTE_TABLE_CAPACITY):
+        """
+        Create (or replace) the shared table
+
+        Args:
+            name: Shared memory block name
+            capacity: Maximum symbols
+        """
+        self.name = name
+        self.capacity = capacity
+        size = _layout(capacity)[2]
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a crashed session
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(name)
+        self._map(self.shm, capacity)
+        seq_offset, data_offset, end = _layout(capacity)
+        self._seq_words = self.shm.buf[seq_offset:data_offset].cast('q')
+        self._int_words = self.shm.buf[data_offset:end].cast('q')
+        self._float_words = self.shm.buf[data_offset:end].cast('d')
+        self.seq[:] = 0
+        self.data[:] = np.zeros(capacity, dtype=QUOTE_DTYPE)
+        self.header[()] = (MAGIC, VERSION, capacity, 0, QUOTE_DTYPE.itemsize, time.time_ns(), (0, 0))
+        self.index = {}                # symbol -> row
+        self._free = []                # rows of removed symbols, reused first
+        self._seq = [0] * capacity     # Python mirrors of seq / updates
+        self._updates = [0] * capacity
+        self.skipped = 0               # ticks of symbols without a row
+
+    def add(self, symbol, token=''):
+        """Register a symbol (returns its row, no-op if already present)"""
+        row = self.index.get(symbol)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = int(self.header['rows'])
+            if row >= self.capacity:
+                raise ValueError(f"Quote table full ({self.capacity} symbols)")
+        self._write_row(row, (symbol.encode()[:16], str(token).encode()[:24]) + (0,) * 13)
+        self.index[symbol] = row
+        if row >= self.header['rows']:
+            self.header['rows'] = row + 1    # published after the row is named
+        return row
+
+    def remove(self, symbol):
+        """Clear a symbol's row and free it for the next add (no-op if absent)"""
+        row = self.index.pop(symbol, None)
+        if row is None:
+            return
+        self._write_row(row, np.zeros((), dtype=QUOTE_DTYPE))
+        self._updates[row] = 0
+        self._free.append(row)
+
+    def _write_row(self, row, record):
+        seq = self._seq[row] + 1
+        self._seq_words[row] = seq       # odd: readers retry
+        self.data[row] = record
+        self._seq_words[row] = seq + 1
+        self._seq[row] = seq + 1
+
+    def update(self, symbol, tick_row, recv_ns):
+        """Write the latest tick for a symbol (tick_row in TICK_FIELDS order)"""
+        row = self.index.get(symbol)
+        if row is None:                  # UNKNOWN or not registered: no row to write
+            self.skipped += 1
+            return
+        seq = self._seq[row] + 1
+        updates = self._updates[row] + 1
+        base = row * _ROW_WORDS
+        ints, floats = self._int_words, self._float_words
+        self._seq_words[row] = seq       # odd: write in progress
+        for i, (word, is_float) in zip(_IDX, _SLOTS):
+            if is_float:
+                floats[base + word] = tick_row[i]
+            else:
+                ints[base + word] = tick_row[i]
+        ints[base + _RECV_WORD] = recv_ns
+        ints[base + _UPDATES_WORD] = updates
+        self._seq_words[row] = seq + 1   # even: row consistent
+        self._seq[row] = seq + 1
+        self._updates[row] = updates
+
+    def stats(self):
+        """Rows in use and ticks skipped (metrics file)"""
+        return {'rows': len(self.index), 'capacity': self.capacity, 'skipped': self.skipped}
+
+    def close(self, unlink=True):
+        for words in (self._seq_words, self._int_words, self._float_words):
+            words.release()
+        del self.header, self.seq, self.data
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+            _created.discard(self.name)
+
+
+# ============================================================
+# READER
+# ============================================================
+
+class QuoteTableReader(_TableViews):
+
+    def __init__(self, name=QUOTE_TABLE_NAME):
+        """Attach to a table created by a running monitor"""
+        self.shm = _attach(name)
+        header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf, offset=0)
+        if bytes(header['magic']) != MAGIC:
+            self.shm.close()
+            raise ValueError(f"{name} is not a quote table")
+        self.capacity = int(header['capacity'])
+        self._map(self.shm, self.capacity)
+        self.index = {}
+
+    def rows(self):
+        return int(self.header['rows'])
+
+    def view(self):
+        """Zero-copy NumPy view of the used rows (may be torn mid-update, freed rows have an empty Symbol)"""
+        return self.data[:self.rows()]
+
+    def symbols(self):
+        return [s.decode() for s in self.data['Symbol'][:self.rows()]]
+
+    def _row_of(self, symbol):
+        row = self.index.get(symbol)
+        if row is None:
+            self.index = {s: i for i, s in enumerate(self.symbols())}
+            row = self.index.get(symbol)
+        return row
+
+    def read(self, symbol, max_spins=1000):
+        """
+        Consistent copy of one symbol's row
+
+        Returns:
+            np.void: QUOTE_DTYPE record (None if the symbol is not in the table)
+        """
+        row = self._row_of(symbol)
+        if row is None:
+            return None
+        record = self._read_row(row, max_spins)
+        if record['Symbol'] != symbol.encode()[:16]:    # row freed or reused since indexed
+            self.index = {}
+            row = self._row_of(symbol)
+            return None if row is None else self._read_row(row, max_spins)
+        return record
+
+    def _read_row(self, row, max_spins):
+        for _ in range(max_spins):
+            before = self.seq[row]
+            if before % 2 == 0:
+                record = self.data[row].copy()
+                if self.seq[row] == before:
+                    return record
+            time.sleep(0)                # let a preempted writer finish the row
+        raise TimeoutError(f"Quote row {row} kept changing")
+
+    def snapshot(self, max_spins=1000):
+        """
+        Consistent copy of every row in use (rows torn during the copy are re-read)
+
+        Returns:
+            np.ndarray: QUOTE_DTYPE structured array
+        """
+        n = self.rows()
+        before = self.seq[:n].copy()
+        table = self.data[:n].copy()
+        after = self.seq[:n]
+        torn = np.flatnonzero((before != after) | (before % 2 == 1))
+        for row in torn:
+            table[row] = self._read_row(row, max_spins)
+        return table[table['Symbol'] != b'']
+
+    def close(self):
+        del self.header, self.seq, self.data
+        self.shm.close()
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    reader = QuoteTableReader()
+    frame = pd.DataFrame(reader.snapshot())
+    frame['Symbol'] = frame['Symbol'].str.decode('ascii')
+    frame['token'] = frame['token'].str.decode('ascii')
+    print(frame.to_string(index=False))
+    reader.close()
@@ -0,0 +1,150 @@
+"""
+Session Checkpoints
+Periodic snapshot of the monitor's in-memory state for fast restarts
+- Ring buffers, running bars, order books, cumulative volumes and
+  counters pickled in one pass (NumPy arrays go in as raw buffers)
+- Copied on the ingest thread between callbacks, so a checkpoint matches
+  an exact tick journal position (a memcpy-sized pause)
+- Pickled and written atomically on a background thread; only the
+  newest pending checkpoint is written
+- One file per session date: checkpoints/session_YYYYMMDD.ckpt
+- Restore = load the checkpoint + replay the journal records after it
+
+Checkpoints are pickles: only restore files this monitor wrote.
+"""
+
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_MAGIC = b'TICKCKP1'
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(session_date=None, checkpoint_dir=CHECKPOINT_DIR):
+    """Default checkpoint file for a session date"""
+    session_date = session_date or datetime.now()
+    return os.path.join(checkpoint_dir, f"session_{session_date.strftime('%Y%m%d')}.ckpt")
+
+
+def dump_state(state):
+    """Serialize a state dict to checkpoint bytes"""
+    return CHECKPOINT_MAGIC + pickle.dumps((CHECKPOINT_VERSION, state), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint file
+
+    Returns:
+        dict: State as captured (None if missing or unreadable)
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(CHECKPOINT_MAGIC):
+            raise ValueError("bad magic")
+        version, state = pickle.loads(data[len(CHECKPOINT_MAGIC):])
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"version {version}")
+        return state
+    except Exception as e:
+        print(f"⚠️ Ignoring checkpoint {path}: {e}")
+        return None
+
+
+def write_atomic(path, data):
+    """Write bytes so a crash leaves either the old or the new file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CheckpointWriter:
+
+    def __init__(self, path):
+        """
+        Initialize writer
+
+        Args:
+            path: Checkpoint file (rewritten in place)
+        """
+        self.path = path
+        self._pending = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.written = 0
+        self.superseded = 0            # captured but replaced by a newer one before writing
+        self.write_errors = 0
+        self.last_bytes = 0
+        self.last_write_ms = 0.0
+        self.last_written = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, state):
+        """Queue a state dict the caller no longer touches (never blocks, replaces an unwritten one)"""
+        with self._lock:
+            if self._pending is not None:
+                self.superseded += 1
+            self._pending = state
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(1.0)
+            self._wake.clear()
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._lock:
+            state, self._pending = self._pending, None
+        if state is None:
+            return
+        start = time.perf_counter()
+        data = dump_state(state)
+        try:
+            write_atomic(self.path, data)
+        except OSError as e:
+            self.write_errors += 1
+            print(f"⚠️ Checkpoint write failed: {e}")
+            return
+        self.last_write_ms = (time.perf_counter() - start) * 1000
+        self.last_bytes = len(data)
+        self.last_written = datetime.now()
+        self.written += 1
+
+    def stop(self):
+        """Stop the thread and write what is pending"""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self._write_pending()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'written': self.written,
+            'superseded': self.superseded,
+            'write_errors': self.write_errors,
+            'last_bytes': self.last_bytes,
+            'last_write_ms': round(self.last_write_ms, 2),
+            'last_written': self.last_written,
+        }
@@ -0,0 +1,233 @@
+"""
+Rate-Limited Subscription Manager
+Subscribes a watchlist quickly without tripping the API's rate limit
+- Token-bucket rate limit (sustained rate + burst) shared by all calls
+- Concurrent subscribe calls on a small thread pool, optionally several
+  tokens per call (Breeze accepts a list for stock_token)
+- Confirmation: a token counts as live once its first tick arrives
+- Unconfirmed tokens are resubscribed after confirm_timeout, up to
+  max_retries times
+- Reports time-to-full-subscription (all calls acknowledged) and
+  time-to-first-tick for the whole watchlist
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst=1):
+        """
+        Args:
+            rate: Sustained calls per second (0 or None = unlimited)
+            burst: Calls allowed back to back before the rate applies
+        """
+        self.rate = rate or 0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SubscriptionManager:
+
+    def __init__(self, feed, rate=10.0, burst=5, concurrency=4, batch_size=1,
+                 confirm_timeout=15.0, max_retries=3, verbose=True):
+        """
+        Initialize manager
+
+        Args:
+            feed: BreezeConnect (or stand-in) with subscribe_feeds/unsubscribe_feeds
+            rate: Subscribe calls per second (0 = unlimited)
+            burst: Token-bucket burst size
+            concurrency: Subscribe calls in flight at once
+            batch_size: Tokens per subscribe call (1 = one token per call)
+            confirm_timeout: Seconds without a first tick before resubscribing
+            max_retries: Resubscribe attempts per token
+            verbose: Print per-token results
+        """
+        self.feed = feed
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.confirm_timeout = confirm_timeout
+        self.max_retries = max_retries
+        self.verbose = verbose
+
+        self.symbols = {}              # token -> symbol
+        self.attempts = {}             # token -> subscribe attempts
+        self.last_attempt = {}         # token -> monotonic time of last attempt
+        self.acked = set()             # subscribe call returned without error
+        self.failed = {}               # token -> last error
+        self.confirmed = {}            # token -> seconds from start to first tick
+        self.pending = set()           # subscribed, waiting for a first tick (checked per tick)
+
+        self.started = None
+        self.subscribe_seconds = None  # time-to-full-subscription
+        self.confirm_seconds = None    # time until every token delivered a tick
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._retry_thread = None
+
+    # ==================== SUBSCRIBE ====================
+
+    def subscribe(self, token_symbol_list):
+        """
+        Subscribe tokens (blocks until every call is acknowledged or failed)
+
+        Returns:
+            float: Seconds taken
+        """
+        start = time.monotonic()
+        if self.started is None:
+            self.started = start
+        tokens = []
+        with self._lock:
+            for token, symbol in token_symbol_list:
+                self.symbols[token] = symbol
+                self.confirmed.pop(token, None)
+                self.attempts[token] = 0
+                self.pending.add(token)
+                tokens.append(token)
+            self.confirm_seconds = None
+        self._call_all(tokens)
+        elapsed = time.monotonic() - start
+        self.subscribe_seconds = elapsed
+        self._start_retry_thread()
+        return elapsed
+
+    def unsubscribe(self, tokens):
+        """Unsubscribe tokens and forget their state"""
+        for token in tokens:
+            self.bucket.acquire()
+            try:
+                self.feed.unsubscribe_feeds(stock_token=token)
+            except Exception as e:
+                print(f"   ⚠️ Unsubscribe failed: {self.symbols.get(token, token)} ({token}): {str(e)[:100]}")
+            with self._lock:
+                self.pending.discard(token)
+                for state in (self.symbols, self.attempts, self.last_attempt, self.failed, self.confirmed):
+                    state.pop(token, None)
+                self.acked.discard(token)
+
+    def _call_all(self, tokens):
+        batches = [tokens[i:i + self.batch_size] for i in range(0, len(tokens), self.batch_size)]
+        if self.concurrency == 1 or len(batches) == 1:
+            for batch in batches:
+                self._call(batch)
+            return
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="subscribe") as pool:
+            list(pool.map(self._call, batches))
+
+    def _call(self, batch):
+        self.bucket.acquire()
+        now = time.monotonic()
+        with self._lock:
+            for token in batch:
+                self.attempts[token] = self.attempts.get(token, 0) + 1
+                self.last_attempt[token] = now
+        try:
+            self.feed.subscribe_feeds(stock_token=batch[0] if len(batch) == 1 else batch)
+        except Exception as e:
+            with self._lock:
+                for token in batch:
+                    self.failed[token] = str(e)[:200]
+            print(f"   ⚠️ Subscribe failed: {', '.join(self.symbols.get(t, t) for t in batch)}: {str(e)[:100]}")
+            return
+        with self._lock:
+            for token in batch:
+                self.acked.add(token)
+                self.failed.pop(token, None)
+        if self.verbose:
+            for token in batch:
+                print(f"✓ Subscribed: {self.symbols.get(token, token)} ({token})")
+
+    # ==================== CONFIRMATION ====================
+
+    def confirm(self, token):
+        """Record the first tick for a token (call when token in self.pending)"""
+        with self._lock:
+            if token not in self.pending:
+                return
+            self.pending.discard(token)
+            self.confirmed[token] = time.monotonic() - self.started
+            if not self.pending:
+                self.confirm_seconds = time.monotonic() - self.started
+                print(f"✓ All {len(self.confirmed)} tokens streaming "
+                      f"({self.confirm_seconds:.1f}s after first subscribe)")
+
+    def _start_retry_thread(self):
+        if self._retry_thread and self._retry_thread.is_alive():
+            return
+        self._retry_thread = threading.Thread(target=self._retry_loop, name="subscribe-retry", daemon=True)
+        self._retry_thread.start()
+
+    def _retry_loop(self):
+        while not self._stop_event.wait(1.0):
+            now = time.monotonic()
+            with self._lock:
+                due = [t for t in self.pending
+                       if now - self.last_attempt.get(t, now) >= self.confirm_timeout
+                       and self.attempts.get(t, 0) <= self.max_retries]
+                waiting = [t for t in self.pending if self.attempts.get(t, 0) <= self.max_retries]
+            if due:
+                print(f"   🔁 Resubscribing {len(due)} tokens with no ticks yet: "
+                      f"{', '.join(self.symbols[t] for t in due[:10])}{' ...' if len(due) > 10 else ''}")
+                self._call_all(due)
+            elif not waiting:
+                with self._lock:
+                    stuck = sorted(self.symbols[t] for t in self.pending)
+                if stuck:
+                    print(f"   ⚠️ No ticks after {self.max_retries} retries: {', '.join(stuck)}")
+                return
+
+    def stop(self):
+        self._stop_event.set()
+
+    # ==================== REPORTING ====================
+
+    def report(self):
+        """Print time-to-full-subscription"""
+        with self._lock:
+            total, acked, confirmed, failed = len(self.symbols), len(self.acked), len(self.confirmed), len(self.failed)
+        print(f"✓ Subscribed {acked}/{total} tokens in {self.subscribe_seconds or 0:.2f}s"
+              f" | streaming: {confirmed}/{total}"
+              + (f" | failed: {failed}" if failed else ""))
+
+    def stats(self):
+        """Subscription state as a dict (metrics file, read from a snapshot taken under the lock)"""
+        with self._lock:
+            symbols = dict(self.symbols)
+            acked = len(self.acked)
+            first_tick = sorted(self.confirmed.values())
+            pending = list(self.pending)
+            failed = dict(self.failed)
+            attempts = list(self.attempts.values())
+        return {
+            'tokens': len(symbols),
+            'acked': acked,
+            'confirmed': len(first_tick),
+            'pending': sorted(symbols[t] for t in pending if t in symbols),
+            'failed': {symbols.get(t, t): e for t, e in failed.items()},
+            'retries': sum(max(0, a - 1) for a in attempts),
+            'subscribe_seconds': round(self.subscribe_seconds, 3) if self.subscribe_seconds is not None else None,
+            'all_streaming_seconds': round(self.confirm_seconds, 3) if self.confirm_seconds is not None else None,
+            'median_first_tick_seconds': round(first_tick[len(first_tick) // 2], 3) if first_tick else None,
+        }
@@ -0,0 +1,243 @@
+"""
+Symbol Search Index
+Ranked prefix, substring and typo-tolerant lookup over futures symbols
+- Terms: Breeze short name, full company name and each of its words,
+  normalized to upper-case alphanumerics without filler words
+  ("Tata Steel Ltd." -> "TATASTEEL")
+- Prefix trie: every node keeps the terms below it, so a prefix lookup
+  is one walk of len(prefix) nodes
+- Trigram inverted index (terms padded with ^ and $): substring candidates
+  come from intersecting posting lists, typo candidates from shared-gram
+  counts, confirmed with a banded edit distance
+- Ranking: exact, prefix, substring, then typo matches; a short name beats
+  a company name beats a single word; then fewer typos, shorter terms
+"""
+
+import re
+
+GRAM = 3
+STOPWORDS = frozenset({'LIMITED', 'LTD', 'THE', 'AND', 'OF', 'CO', 'COMPANY', 'CORPORATION', 'CORP', 'INC'})
+
+MATCH_EXACT = 'exact'
+MATCH_PREFIX = 'prefix'
+MATCH_SUBSTRING = 'substring'
+MATCH_FUZZY = 'fuzzy'
+_MATCH_RANK = {MATCH_EXACT: 0, MATCH_PREFIX: 1, MATCH_SUBSTRING: 2, MATCH_FUZZY: 3}
+
+KIND_SYMBOL = 0
+KIND_NAME = 1
+KIND_WORD = 2
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]+')
+
+
+def normalize_words(text):
+    """Upper-case alphanumeric words, filler words dropped (kept if that is all there is)"""
+    words = [word for word in _NON_ALNUM.split(str(text).upper()) if word]
+    kept = [word for word in words if word not in STOPWORDS]
+    return kept or words
+
+
+def normalize(text):
+    """Search key for a symbol, name or query ("Sun Pharma Ltd" -> "SUNPHARMA")"""
+    return ''.join(normalize_words(text))
+
+
+def _grams(term):
+    padded = f"^{term}$"
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (adjacent swaps count as one edit)
+
+    Only a band of width 2 * limit + 1 is computed.
+
+    Returns:
+        int: Distance, or limit + 1 as soon as it must exceed limit
+    """
+    over = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return over
+    before = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_best = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1,
+                           previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if before is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                distance = min(distance, before[j - 2] + 1)
+            current[j] = min(distance, over)
+            row_best = min(row_best, current[j])
+        if row_best > limit:
+            return over
+        before, previous = previous, current
+    return previous[len(b)]
+
+
+def default_typos(query):
+    """Edits tolerated for a normalized query: none under 4 chars, 1 under 8, else 2"""
+    return 0 if len(query) < 4 else 1 if len(query) < 8 else 2
+
+
+class SymbolSearchIndex:
+
+    def __init__(self, names):
+        """
+        Build the index
+
+        Args:
+            names: {symbol: iterable of company names} (the symbol itself is always indexed)
+        """
+        self.terms = []                # term id -> normalized term
+        self._term_ids = {}            # term -> term id
+        self._owners = []              # term id -> {symbol: best kind}
+        self._trie = ({}, [])          # node = (children, term ids at or below)
+        self._grams = {}               # gram -> [term ids]
+
+        for symbol, symbol_names in names.items():
+            self._add(normalize(symbol), symbol, KIND_SYMBOL)
+            for name in symbol_names:
+                words = normalize_words(name)
+                self._add(''.join(words), symbol, KIND_NAME)
+                for word in words:
+                    if len(word) > 1:
+                        self._add(word, symbol, KIND_WORD)
+
+    def _add(self, term, symbol, kind):
+        if not term:
+            return
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self.terms)
+            self.terms.append(term)
+            self._owners.append({})
+            node = self._trie
+            node[1].append(term_id)
+            for char in term:
+                node = node[0].setdefault(char, ({}, []))
+                node[1].append(term_id)
+            for gram in _grams(term):
+                self._grams.setdefault(gram, []).append(term_id)
+        owners = self._owners[term_id]
+        if kind < owners.get(symbol, KIND_WORD + 1):
+            owners[symbol] = kind
+
+    # ==================== TERM LOOKUPS ====================
+
+    def _prefix_ids(self, query):
+        node = self._trie
+        for char in query:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return node[1]
+
+    def _substring_ids(self, query):
+        if len(query) < GRAM:
+            return [term_id for term_id, term in enumerate(self.terms) if query in term]
+        postings = sorted((self._grams.get(query[i:i + GRAM], ()) for i in range(len(query) - GRAM + 1)),
+                          key=len)
+        if not postings[0]:
+            return []
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return [term_id for term_id in candidates if query in self.terms[term_id]]
+
+    def _fuzzy_ids(self, query, max_typos):
+        grams = _grams(query)
+        shared = {}
+        for gram in grams:
+            for term_id in self._grams.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+        # q-gram lemma: each edit can break at most GRAM of the query's grams
+        needed = len(grams) - max_typos * GRAM
+        matches = []
+        for term_id, count in shared.items():
+            if count >= needed:
+                distance = edit_distance(query, self.terms[term_id], max_typos)
+                if distance <= max_typos:
+                    matches.append((term_id, distance))
+        return matches
+
+    def _symbols(self, term_ids):
+        return sorted({symbol for term_id in term_ids for symbol in self._owners[term_id]})
+
+    # ==================== PUBLIC API ====================
+
+    def prefix(self, query):
+        """Symbols with a term starting with query (sorted)"""
+        return self._symbols(self._prefix_ids(normalize(query)))
+
+    def substring(self, query):
+        """Symbols with a term containing query (sorted, empty query = all)"""
+        return self._symbols(self._substring_ids(normalize(query)))
+
+    def name_symbol(self, name):
+        """
+        Symbol whose short name or full company name is exactly name (normalized)
+
+        Returns:
+            str: Symbol or None
+        """
+        term_id = self._term_ids.get(normalize(name))
+        if term_id is None:
+            return None
+        owners = [(kind, symbol) for symbol, kind in self._owners[term_id].items() if kind <= KIND_NAME]
+        return min(owners)[1] if owners else None
+
+    def search(self, query, limit=10, max_typos=None):
+        """
+        Ranked lookup (one- and two-character queries match as prefixes only)
+
+        Args:
+            query: Free-form symbol or company name
+            limit: Maximum results
+            max_typos: Edits tolerated when there are fewer than limit
+                       direct matches (None = by query length, 0 = off)
+
+        Returns:
+            list: [(symbol, match, term)] best first; match is 'exact',
+                  'prefix', 'substring' or 'fuzzy'
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        best = {}                      # symbol -> (rank, match, term)
+
+        def offer(term_id, match, distance=0):
+            term = self.terms[term_id]
+            for symbol, kind in self._owners[term_id].items():
+                rank = (_MATCH_RANK[match], kind, distance, len(term), symbol)
+                if symbol not in best or rank < best[symbol][0]:
+                    best[symbol] = (rank, match, term)
+
+        direct = self._prefix_ids(query) if len(query) < GRAM else self._substring_ids(query)
+        for term_id in direct:
+            term = self.terms[term_id]
+            offer(term_id, MATCH_EXACT if term == query else
+                  MATCH_PREFIX if term.startswith(query) else MATCH_SUBSTRING)
+
+        max_typos = default_typos(query) if max_typos is None else max_typos
+        if max_typos and len(best) < limit:
+            for term_id, distance in self._fuzzy_ids(query, max_typos):
+                offer(term_id, MATCH_FUZZY, distance)
+
+        ranked = sorted(best.values())[:limit]
+        return [(rank[-1], match, term) for rank, match, term in ranked]
+
+    def best(self, query, max_typos=None):
+        """Top-ranked symbol for query, or None"""
+        results = self.search(query, limit=1, max_typos=max_typos)
+        return results[0][0] if results else None
+
+    def stats(self):
+        return {
+            'terms': len(self.terms),
+            'grams': len(self._grams),
+            'symbols': len({symbol for owners in self._owners for symbol in owners}),
+        }
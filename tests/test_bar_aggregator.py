@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from bar_aggregator import BarAggregator
+from tick_buffer import TICK_FIELDS, LOCAL_TZ
+
+
+def at(minute, second):
+    return int(datetime(2025, 11, 17, 10, minute, second, tzinfo=LOCAL_TZ).timestamp()) * 1_000_000_000
+
+
+def row(ts_ns, price, volume):
+    values = dict.fromkeys(TICK_FIELDS, 0)
+    values.update(exchange_timestamp=ts_ns, last_price=price, volume_traded=volume)
+    return tuple(values[name] for name in TICK_FIELDS)
+
+
+def test_late_tick_after_flush_is_dropped_not_a_second_bar():
+    bars = BarAggregator(60, grace_seconds=2)
+    bars.update('AAA', row(at(0, 58), 100.0, 10))
+    bars.update('BBB', row(at(1, 5), 50.0, 10))       # exchange clock is past 10:00 + grace
+    bars.flush()
+    bars.update('AAA', row(at(0, 59), 101.0, 15))     # late tick for the closed 10:00 bar
+    bars.update('AAA', row(at(1, 10), 102.0, 20))
+    bars.close_all()
+
+    aaa = [bar for bar in bars.drain_closed() if bar['Symbol'] == 'AAA']
+    assert [bar['bar_start'] for bar in aaa] == [at(0, 0), at(1, 0)]
+    assert aaa[0]['close'] == 100.0
+    assert aaa[1]['volume'] == 10                    # the late tick's volume lands in the next bar
+    assert bars.late_ticks == 1
+
+
+def test_late_tick_within_grace_joins_its_bar():
+    bars = BarAggregator(60, grace_seconds=2)
+    bars.update('AAA', row(at(0, 58), 100.0, 10))
+    bars.update('BBB', row(at(1, 1), 50.0, 10))
+    bars.flush()                                     # 10:01:01 - 2s grace: 10:00 bar stays open
+    bars.update('AAA', row(at(0, 59), 101.0, 15))
+    assert bars.drain_closed() == []
+    assert bars.current('AAA')['close'] == 101.0
+    assert bars.late_ticks == 0
+
+
+def test_flush_ignores_the_local_clock():
+    bars = BarAggregator(60)
+    bars.update('AAA', row(at(0, 30), 100.0, 10))
+    bars.flush()
+    assert bars.drain_closed() == []
@@ -0,0 +1,22 @@
+from test_token_parser import SRF_ROW, write_master
+from token_parser import FuturesTokenParser
+
+
+def option_row(token, strike_paise, option_type):
+    """SRF master row turned into an option the way the options master lists them"""
+    fields = SRF_ROW.split('\t')
+    fields[0], fields[1], fields[3] = str(token), 'OPTSTK', 'OPTION'
+    fields[5], fields[6] = str(strike_paise), option_type
+    return '\t'.join(fields)
+
+
+def test_option_chain_strikes_are_in_rupees(tmp_path):
+    listed = [(strike, side) for strike in range(2900, 3200, 50) for side in ('CE', 'PE')]
+    rows = [SRF_ROW] + [option_row(60000 + i, strike * 100, side) for i, (strike, side) in enumerate(listed)]
+    instruments = FuturesTokenParser(write_master(tmp_path / "future_tokens.txt", rows)).instruments
+
+    assert list(instruments.strikes('SRF', '12/30/25', 'CE')) == [2900.0, 2950.0, 3000.0, 3050.0, 3100.0, 3150.0]
+    chain = instruments.option_chain('SRF', '12/30/25', 3010.0, steps=1)
+    assert [(c['strike'], c['option_type']) for c in chain] == [
+        (2950.0, 'CE'), (2950.0, 'PE'), (3000.0, 'CE'), (3000.0, 'PE'), (3050.0, 'CE'), (3050.0, 'PE')]
+    assert chain[0]['tick_size'] == 0.10
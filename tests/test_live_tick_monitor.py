@@ -0,0 +1,104 @@
+import json
+import os
+import time
+
+import live_tick_monitor as monitor
+from tick_replay import ReplayFeed
+
+TOKENS = [('4.1!1001', 'AAA'), ('4.1!1002', 'BBB')]
+
+
+def make_ticks(count=40):
+    ticks, ts_ns = [], []
+    for i in range(count):
+        token, _ = TOKENS[i % len(TOKENS)]
+        ticks.append({'symbol': token, 'last': 100.0 + i, 'ttq': 1000 + i, 'ltq': 1,
+                      'ltt': f"Mon Nov 17 10:00:{i // 2:02d} 2025",
+                      'bPrice': [99.5] * 5, 'bQty': [10] * 5, 'sPrice': [100.5] * 5, 'sQty': [10] * 5})
+        ts_ns.append(1_763_353_800_000_000_000 + i * 1_000_000)
+    return ts_ns, ticks
+
+
+def make_config(tmp_path, **overrides):
+    settings = dict(
+        tick_store='none',
+        snapshot_dir=str(tmp_path / "snapshots"),
+        metrics_file=str(tmp_path / "metrics.json"),
+        metrics_http=False,
+        git_publish=False,
+        checkpoint_dir=str(tmp_path / "checkpoints"),
+        watchlist_reload=False,
+        contract_enrich=False,
+        print_frequency=10**9,
+    )
+    settings.update(overrides)
+    return monitor.MonitorConfig(**settings)
+
+
+def test_stop_with_checkpoints_writes_final_metrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ts_ns, ticks = make_ticks()
+    feed = ReplayFeed(ts_ns, ticks, speed=0, start_timeout=0.5)
+    session = monitor.TickMonitor(make_config(tmp_path, checkpoint_enabled=True, checkpoint_restore=False),
+                                  feed=feed, watchlist=TOKENS)
+
+    session.run_session(stop_condition=feed.finished.is_set, subscribe_rate=0)
+
+    assert session.checkpoint_writer is None
+    with open(tmp_path / "metrics.json") as f:
+        metrics = json.load(f)
+    assert metrics['checkpoint']['written'] >= 1
+    assert metrics['checkpoint']['captures'] >= 1
+    assert os.listdir(tmp_path / "checkpoints")
+
+
+def test_restore_needs_the_journal(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ts_ns, ticks = make_ticks()
+    feed = ReplayFeed(ts_ns, ticks, speed=0, start_timeout=0.5)
+    first = monitor.TickMonitor(make_config(tmp_path, checkpoint_restore=False), feed=feed, watchlist=TOKENS)
+    first.run_session(stop_condition=feed.finished.is_set, subscribe_rate=0)
+    assert os.listdir(tmp_path / "checkpoints")
+
+    second = monitor.TickMonitor(make_config(tmp_path, journal_enabled=False), watchlist=TOKENS)
+    assert second.restore_checkpoint() is None
+    assert second.processed_tick_count == 0
+
+
+def test_no_checkpoints_without_the_journal(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    session = monitor.TickMonitor(make_config(tmp_path, journal_enabled=False), watchlist=TOKENS)
+    session.start_sinks()
+    session.stop_sinks()
+    assert session.checkpoint_writer is None
+    assert not os.path.exists(tmp_path / "checkpoints")
+
+
+def test_quiet_feed_still_checkpoints(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    feed = ReplayFeed([], [], speed=0, start_timeout=0.5)
+    session = monitor.TickMonitor(make_config(tmp_path, checkpoint_interval=0.2, checkpoint_restore=False),
+                                  feed=feed, watchlist=TOKENS)
+    deadline = time.monotonic() + 1.5
+    session.run_session(stop_condition=lambda: time.monotonic() > deadline, subscribe_rate=0)
+    assert session.checkpoint_stats['captures'] >= 3        # from the main loop, not only stop()
+
+
+def test_reload_drops_removed_and_renamed_symbols(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    session = monitor.TickMonitor(make_config(tmp_path, checkpoint_enabled=False), watchlist=TOKENS)
+    session.start_sinks()
+    _, ticks = make_ticks(4)
+    session.on_ticks(ticks)
+    assert sorted(session.tick_buffer.symbols()) == ['AAA', 'BBB']
+
+    session.reload_watchlist([('4.1!1001', 'AAA2')])
+    assert session.token_to_symbol == {'4.1!1001': 'AAA2'}
+    session.on_ticks(ticks[:1])
+    session.stop_sinks()
+
+    assert session.tick_buffer.symbols() == ['AAA2']
+    assert sorted(session.order_books.books) == ['AAA2']
+    assert sorted(session.latency_tracker.feed_lag) == ['AAA2']
+    metrics, _ = session.collect_metrics()
+    assert 'BBB' not in json.dumps(metrics.to_dict())
@@ -0,0 +1,35 @@
+import os
+
+from quote_table import QuoteTable, QuoteTableReader
+from tick_buffer import TICK_FIELDS
+
+
+def tick(price):
+    values = dict.fromkeys(TICK_FIELDS, 0)
+    values['last_price'] = price
+    return tuple(values[name] for name in TICK_FIELDS)
+
+
+def test_unregistered_symbols_are_skipped_and_removed_rows_reused():
+    table = QuoteTable(f"test_quotes_{os.getpid()}", capacity=2)
+    reader = QuoteTableReader(table.name)
+    try:
+        table.add('AAA')
+        table.add('BBB')
+        table.update('UNKNOWN', tick(1.0), 0)      # full table: counted, not raised
+        assert table.stats()['skipped'] == 1
+
+        table.update('AAA', tick(100.0), 0)
+        assert reader.read('AAA')['last_price'] == 100.0
+        table.remove('AAA')
+        assert reader.read('AAA') is None
+        assert reader.snapshot()['Symbol'].tolist() == [b'BBB']
+
+        table.add('CCC')                            # takes AAA's row
+        table.update('CCC', tick(300.0), 0)
+        assert reader.read('CCC')['last_price'] == 300.0
+        assert reader.read('AAA') is None
+        assert reader.snapshot()['Symbol'].tolist() == [b'CCC', b'BBB']
+    finally:
+        reader.close()
+        table.close()
@@ -0,0 +1,41 @@
+import threading
+
+from subscription_manager import SubscriptionManager
+
+
+class FakeFeed:
+
+    def subscribe_feeds(self, stock_token):
+        pass
+
+    def unsubscribe_feeds(self, stock_token):
+        pass
+
+
+def test_stats_while_tokens_are_subscribed_and_confirmed():
+    manager = SubscriptionManager(FakeFeed(), rate=0, concurrency=1, verbose=False)
+    tokens = [(f"4.1!{50000 + i}", f"SYM{i}") for i in range(2000)]
+    done = threading.Event()
+    errors = []
+
+    def read_stats():
+        while not done.is_set():
+            try:
+                manager.stats()
+            except RuntimeError as e:            # dict/set changed size during iteration
+                errors.append(e)
+
+    reader = threading.Thread(target=read_stats)
+    reader.start()
+    try:
+        manager.subscribe(tokens)
+        for token, _ in tokens:
+            manager.confirm(token)
+    finally:
+        done.set()
+        reader.join()
+        manager.stop()
+
+    assert not errors
+    stats = manager.stats()
+    assert (stats['tokens'], stats['acked'], stats['confirmed'], stats['pending']) == (2000, 2000, 2000, [])
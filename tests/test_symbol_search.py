@@ -0,0 +1,43 @@
+from symbol_search import SymbolSearchIndex, normalize
+
+NAMES = {
+    'RELIND': ['Reliance Industries Ltd'],
+    'TATSTE': ['Tata Steel Ltd.'],
+    'TATMOT': ['Tata Motors Limited'],
+    'SUNPHA': ['Sun Pharmaceutical Industries Ltd'],
+    'INFTEC': ['Infosys Ltd'],
+}
+
+
+def test_prefix_matches_symbols_names_and_words():
+    index = SymbolSearchIndex(NAMES)
+    assert index.prefix('tat') == ['TATMOT', 'TATSTE']
+    assert index.prefix('Tata St') == ['TATSTE']
+    assert index.prefix('Indus') == ['RELIND', 'SUNPHA']          # a word of the company name
+    assert index.search('REL')[0] == ('RELIND', 'prefix', 'RELIND')
+
+
+def test_transposed_letters_still_find_the_symbol():
+    index = SymbolSearchIndex(NAMES)
+    assert index.best('Relaince') == 'RELIND'
+    assert index.search('Relaince')[0] == ('RELIND', 'fuzzy', 'RELIANCE')
+    assert index.best('Relaince', max_typos=0) is None
+
+
+def test_multi_word_company_names():
+    index = SymbolSearchIndex(NAMES)
+    assert normalize('Tata Steel Ltd.') == 'TATASTEEL'
+    assert index.search('Tata Steel')[0] == ('TATSTE', 'exact', 'TATASTEEL')
+    assert index.best('tata steel') == 'TATSTE'
+    assert index.name_symbol('TATA STEEL LIMITED') == 'TATSTE'
+    assert index.name_symbol('Steel') is None                      # a single word is not a name
+
+
+def test_empty_and_unmatched_queries():
+    index = SymbolSearchIndex(NAMES)
+    assert index.search('') == []
+    assert index.search(' .- ') == []
+    assert index.search('Zomato') == []
+    assert index.best('Zomato') is None
+    assert index.prefix('XYZ') == []
+    assert index.substring('XYZ') == []
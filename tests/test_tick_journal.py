@@ -0,0 +1,18 @@
+from tick_buffer import TICK_FIELDS
+from tick_journal import JournalReader, TickJournal
+
+
+def test_recv_ns_survives_the_journal(tmp_path):
+    path = str(tmp_path / "ticks.journal")
+    values = dict.fromkeys(TICK_FIELDS, 0)
+    values.update(exchange_timestamp=1_763_353_800_000_000_000, last_price=100.0,
+                  recv_ns=1_763_353_800_123_456_789)
+    journal = TickJournal(path, initial_records=16)
+    journal.append('AAA', tuple(values[name] for name in TICK_FIELDS))
+    journal.close()
+
+    reader = JournalReader(path)
+    df = reader.to_frame()
+    reader.close()
+    assert df['recv_ns'].tolist() == [1_763_353_800_123_456_789]
+    assert df['last_price'].tolist() == [100.0]
@@ -0,0 +1,16 @@
+from bench_tick_normalizer import make_ticks
+from tick_normalizer import BATCH_NORMALIZE_MIN, build_tick_row, normalize_batch
+
+
+def test_batch_path_gives_the_same_rows_as_the_per_field_path():
+    ticks = make_ticks(500)                          # blank CHNGOI and missing 'ltt' included
+    ticks[3]['bPrice'] = ticks[3]['bPrice'][:2]      # short depth
+    ticks[5]['last'] = 'junk'
+    ts_ns = 1_763_361_477_123_456_789
+    assert normalize_batch(ticks, ts_ns).tolist() == [build_tick_row(t, ts_ns) for t in ticks]
+
+
+def test_recv_ns_per_tick_in_a_batch():
+    ticks = make_ticks(BATCH_NORMALIZE_MIN)
+    recv_ns = [1_763_361_477_000_000_000 + i for i in range(len(ticks))]
+    assert normalize_batch(ticks, recv_ns).tolist() == [build_tick_row(t, r) for t, r in zip(ticks, recv_ns)]
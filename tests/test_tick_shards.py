@@ -0,0 +1,19 @@
+import os
+
+from tick_shards import ShardCoordinator
+
+TOKENS = [('4.1!1001', 'AAA'), ('4.1!1002', 'BBB')]
+
+
+def crashing_feed(shard_id, tokens):
+    os._exit(3)                    # dies without reaching the worker's 'done' message
+
+
+def test_merge_finishes_when_a_worker_dies():
+    coordinator = ShardCoordinator(TOKENS, 2, feed_factory=crashing_feed)
+    coordinator.on_batch = lambda batch: None
+    coordinator.ws_connect()
+
+    assert coordinator.all_done.wait(30)
+    assert set(coordinator.errors) == {0, 1}
+    coordinator.ws_disconnect(timeout=1)
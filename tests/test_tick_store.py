@@ -0,0 +1,57 @@
+import os
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import tick_store
+from tick_buffer import TICK_FIELDS, LOCAL_TZ
+
+
+def row(second, price, recv_ns=0):
+    ts_ns = int(datetime(2025, 11, 17, 10, 0, second, tzinfo=LOCAL_TZ).timestamp()) * 1_000_000_000
+    values = dict.fromkeys(TICK_FIELDS, 0)
+    values.update(exchange_timestamp=ts_ns, last_price=price, recv_ns=recv_ns or ts_ns)
+    return tuple(values[name] for name in TICK_FIELDS)
+
+
+def test_open_parts_stay_tmp_until_rolled(tmp_path):
+    root = str(tmp_path)
+    sink = tick_store.ParquetTickSink(root, row_group_size=1, roll_interval=3600)
+    sink.open()
+    sink.write_batch([('AAA', row(1, 100.0))])
+
+    directory = tick_store.partition_path(root, '2025-11-17', 'AAA')
+    assert all(name.endswith(tick_store.TMP_SUFFIX) for name in os.listdir(directory))
+    assert len(tick_store.load_ticks('AAA', '2025-11-17', root=root)) == 0   # footerless part is skipped
+
+    sink.write_batch([('AAA', row(2, 101.0))])
+    sink.close()
+    assert not any(name.endswith(tick_store.TMP_SUFFIX) for name in os.listdir(directory))
+    assert tick_store.load_ticks('AAA', '2025-11-17', root=root)['last_price'].tolist() == [100.0, 101.0]
+
+
+def test_one_symbol_day_is_a_handful_of_parts(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    clock = [0.0]
+    monkeypatch.setattr(tick_store.time, 'monotonic', lambda: clock[0])
+    sink = tick_store.ParquetTickSink(root)
+    sink.open()
+    for second in range(6 * 3600):             # a session of one-second batches
+        clock[0] = float(second)
+        sink.write_batch([('AAA', row(second % 60, 100.0))])
+    sink.close()
+
+    directory = tick_store.partition_path(root, '2025-11-17', 'AAA')
+    assert len(os.listdir(directory)) <= 6 * 3600 // 300 + 1
+
+
+def test_recv_ns_is_stored_next_to_exchange_timestamp(tmp_path):
+    root = str(tmp_path)
+    recv_ns = [row(1, 0)[0] + 250_000_000, row(1, 0)[0] + 750_000_000]    # same ltt second
+    sink = tick_store.ParquetTickSink(root)
+    sink.open()
+    sink.write_batch([('AAA', row(1, 100.0, recv_ns[0])), ('AAA', row(1, 100.5, recv_ns[1]))])
+    sink.close()
+    assert tick_store.load_ticks('AAA', '2025-11-17', root=root)['recv_ns'].tolist() == recv_ns
@@ -0,0 +1,53 @@
+import threading
+
+import pandas as pd
+
+from test_tick_store import row
+from tick_buffer import CSV_COLUMNS
+from tick_writer import BackgroundTickWriter, CSVTickSink
+
+
+class SlowSink:
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.writing = threading.Event()
+        self.closed = False
+
+    def open(self):
+        pass
+
+    def write_batch(self, records):
+        self.writing.set()
+        self.release.wait(5)
+
+    def close(self):
+        self.closed = True
+
+
+def test_stop_leaves_sink_open_while_a_write_is_running():
+    sink = SlowSink()
+    writer = BackgroundTickWriter(sink, batch_size=1, flush_interval=0.01)
+    writer.start()
+    writer.put(('AAA', (0,)))
+    assert sink.writing.wait(5)
+
+    writer.stop(timeout=0.05)
+    assert not sink.closed
+
+    sink.release.set()
+    writer.stop()
+    assert sink.closed
+
+
+def test_csv_sink_keeps_recv_ns_and_sets_old_layouts_aside(tmp_path):
+    csv_file = tmp_path / "all_ticks.csv"
+    csv_file.write_text(','.join(CSV_COLUMNS[:-1]) + '\n')          # written before recv_ns existed
+    sink = CSVTickSink(str(csv_file))
+    sink.open()
+    sink.write_batch([('AAA', row(1, 100.0, recv_ns=1_763_353_801_123_456_789))])
+
+    assert len(list(tmp_path.glob("all_ticks_*.csv"))) == 1
+    df = pd.read_csv(csv_file)
+    assert list(df.columns) == CSV_COLUMNS
+    assert df['recv_ns'].tolist() == [1_763_353_801_123_456_789]
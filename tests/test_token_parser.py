@@ -0,0 +1,73 @@
+import os
+from datetime import date, datetime
+
+import token_parser
+from token_parser import ExpiryCalendar, FuturesTokenParser
+
+# Header and a row as they appear in the Breeze futures master (future_tokens.txt)
+MASTER_HEADER = (
+    "Token\tInstrumentName\tShortName\tSeries\tExpiryDate\tStrikePrice\tOptionType\tCALevel\tPermittedToTrade\t"
+    "IssueCapital\tWarningQty\tFreezeQty\tCreditRating\tNormalMarketStatus\tOddLotMarketStatus\tSpotMarketStatus\t"
+    "AuctionMarketStatus\tNormalMarketEligibility\tOddLotMarketEligibility\tSpotMarketEligibility\t"
+    "AuctionMarketEligibility\tIssueRate\tIssueStartDate\tInterestPaymentDate\tIssueMaturityDate\tMarginPercentage\t"
+    "MinimumLotQty\tLotSize\tTickSize\tCompanyName\tListingDate\tExpulsionDate\tReAdmissionDate\tRecordDate\t"
+    "LowPriceRange\tHighPriceRange\tSecurityExpiryDate\tNoDeliveryStartDate\tNoDeliveryEndDate\tMF\tAON\t"
+    "ParticipantInMarketIndex\tBookClsStartDate\tBookClsEndDate\tExcerciseStartDate\tExcerciseEndDate\tOldToken\t"
+    "AssetInstrument\tAssetName\tAssetToken\tIntrinsicValue\tExtrinsicValue\tExcerciseStyle\tEGM\tAGM\tInterest\t"
+    "Bonus\tRights\tDividends\tExAllowed\tExRejectionAllowed\tPlAllowed\tIsThisAsset\tIsCorpAdjusted\t"
+    "LocalUpdateDatetime\tDeleteFlag\tRemarks\tBasePrice\tExchangeCode"
+)
+SRF_ROW = (
+    "50079\tFUTSTK\tSRF\tFUTURE\t12/30/25\t0\tXX\t0\t0\t0\t0\t0\t\t0\t0\t0\t0\t\t\t\t\t0\t\t\t\t44800\t0\t200\t10\t"
+    "SRF LIMITED\t\t\t\t\t2716.8\t3320.4\t\t\t\t2-Mon\t\t\t\t\t\t\t0\t\t\t0\t0\t0\t\t\t\t\t\t\t\tNFO\t\t\t\t\t\t\t\t"
+    "301860\tSRF"
+)
+
+
+def write_master(path, rows=(SRF_ROW,)):
+    path.write_text('\n'.join((MASTER_HEADER,) + tuple(rows)) + '\n')
+    return path
+
+
+def test_tick_size_is_in_rupees(tmp_path):
+    parser = FuturesTokenParser(write_master(tmp_path / "future_tokens.txt"))
+    contract = parser.get_contract_by_token('50079')
+    assert contract['lot_size'] == 200
+    assert contract['tick_size'] == 0.10                 # master says 10 (paise)
+
+
+def test_expiry_rolls_over_before_the_expiry_day():
+    calendar = ExpiryCalendar({'12/30/25': datetime(2025, 12, 30), '01/27/26': datetime(2026, 1, 27),
+                               'bad': None})
+
+    on_dec_25 = calendar.resolve(date(2025, 12, 25), rollover_days=4)
+    assert (on_dec_25['expiry'], on_dec_25['days_left'], on_dec_25['rolled']) == ('12/30/25', 4, False)
+    on_dec_26 = calendar.resolve(date(2025, 12, 26), rollover_days=4)
+    assert (on_dec_26['expiry'], on_dec_26['nearest'], on_dec_26['days_left'], on_dec_26['rolled']) == (
+        '01/27/26', '12/30/25', 3, True)
+    on_expiry_day = calendar.resolve(date(2025, 12, 30), rollover_days=4)
+    assert (on_expiry_day['expiry'], on_expiry_day['nearest'], on_expiry_day['days_left']) == (
+        '01/27/26', '01/27/26', 27)
+
+    last_day = calendar.resolve(date(2026, 1, 26), rollover_days=4)
+    assert (last_day['expiry'], last_day['next_expiry'], last_day['rolled']) == ('01/27/26', None, False)
+    assert calendar.resolve(date(2026, 1, 27))['expiry'] is None
+
+
+def test_index_is_rebuilt_when_the_master_or_the_format_changes(tmp_path, monkeypatch):
+    token_file = write_master(tmp_path / "future_tokens.txt")
+    assert FuturesTokenParser(token_file).load_source == 'csv'
+    assert FuturesTokenParser(token_file).load_source == 'index'
+
+    stat = token_file.stat()
+    os.utime(token_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))   # touched, same content
+    assert FuturesTokenParser(token_file).load_source == 'index'
+
+    write_master(token_file, [SRF_ROW.replace('\t200\t10\t', '\t250\t10\t', 1)])     # same size, new lot
+    os.utime(token_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    parser = FuturesTokenParser(token_file)
+    assert (parser.load_source, parser.get_contract_by_token('50079')['lot_size']) == ('csv', 250)
+
+    monkeypatch.setattr(token_parser, 'INDEX_VERSION', token_parser.INDEX_VERSION + 1)
+    assert FuturesTokenParser(token_file).load_source == 'csv'
+    assert FuturesTokenParser(token_file).load_source == 'index'
@@ -0,0 +1,223 @@
+"""
+Columnar Tick Ring Buffer
+Preallocated per-symbol NumPy ring buffers for live ticks
+- One structured array per symbol, allocated once
+- Ticks are written in place, oldest ticks overwritten
+- Readers get chronological views (no copies)
+- Local receive time (recv_ns) is a field of each tick (exchange_timestamp
+  is the exchange's own time)
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+DEPTH_LEVELS = 5
+
+# CSV schema (30 fields) - Symbol + 29 per-tick values. exchange_timestamp
+# comes from 'ltt' (1-second resolution); recv_ns is the local receive time
+# in epoch ns, kept for ordering within a second and feed latency
+CSV_COLUMNS = (
+    ['Symbol', 'exchange_timestamp', 'last_price', 'volume_traded', 'last_traded_quantity',
+     'open_interest', 'change_in_oi']
+    + [f'bid_{kind}_{i}' for i in range(1, DEPTH_LEVELS + 1) for kind in ('price', 'qty')]
+    + [f'ask_{kind}_{i}' for i in range(1, DEPTH_LEVELS + 1) for kind in ('price', 'qty')]
+    + ['total_buy_qty', 'total_sell_qty', 'recv_ns']
+)
+
+DEPTH_COLUMNS = CSV_COLUMNS[7:7 + 4 * DEPTH_LEVELS]
+
+# Older CSVs carry the same header but wrote depth level by level
+# (bid price, bid qty, ask price, ask qty for level 1, then level 2, ...)
+LEGACY_DEPTH_COLUMNS = [f'{side}_{kind}_{i}' for i in range(1, DEPTH_LEVELS + 1)
+                        for side in ('bid', 'ask') for kind in ('price', 'qty')]
+
+# Per-symbol buffer fields (Symbol is implied by the buffer it lives in)
+TICK_FIELDS = CSV_COLUMNS[1:]
+
+RECV_INDEX = TICK_FIELDS.index('recv_ns')
+
+PRICE_FIELDS = ['last_price'] + [f'{side}_price_{i}' for side in ('bid', 'ask')
+                                 for i in range(1, DEPTH_LEVELS + 1)]
+
+# exchange_timestamp is epoch nanoseconds, prices float64, quantities int64
+TICK_DTYPE = np.dtype([(name, 'f8' if name in PRICE_FIELDS else 'i8') for name in TICK_FIELDS])
+
+LOCAL_TZ = datetime.now().astimezone().tzinfo
+
+
+def ns_to_local(ns_values):
+    """
+    Convert epoch-ns timestamps to naive local datetimes (CSV format)
+
+    Args:
+        ns_values: Scalar or array of epoch nanoseconds
+
+    Returns:
+        pd.DatetimeIndex (or Timestamp for scalars)
+    """
+    converted = pd.to_datetime(ns_values, unit='ns', utc=True)
+    if isinstance(converted, pd.Timestamp):
+        return converted.tz_convert(LOCAL_TZ).tz_localize(None)
+    return pd.DatetimeIndex(converted).tz_convert(LOCAL_TZ).tz_localize(None)
+
+
+def fix_legacy_depth(df):
+    """
+    Move depth written in the legacy order back under its own columns
+
+    A row is legacy when the value under bid_price_2 is above the one under
+    bid_price_1 (it is really ask_price_1; real bids only go down). Rows
+    without both prices can't tell, so they follow the majority of the frame
+    - new rows appended to an old file are handled row by row.
+
+    Args:
+        df: Ticks in CSV column layout, as read
+
+    Returns:
+        pd.DataFrame: df, or a remapped copy
+    """
+    first, second = df['bid_price_1'], df['bid_price_2']
+    decided = (first > 0) & (second > 0)
+    legacy = decided & (second > first)
+    if not legacy.any():
+        return df
+    if legacy.sum() * 2 > decided.sum():
+        legacy |= ~decided
+    legacy = legacy.to_numpy()
+    df = df.copy()
+    source = {column: df[src].to_numpy() for src, column in zip(DEPTH_COLUMNS, LEGACY_DEPTH_COLUMNS)}
+    for column, values in source.items():
+        df[column] = np.where(legacy, values, df[column].to_numpy()).astype(df[column].dtype)
+    return df
+
+
+def fill_missing_recv(df):
+    """
+    Give ticks recorded before recv_ns was stored a recv_ns of 0 (unknown)
+
+    Args:
+        df: Ticks in CSV column layout, as read (older CSVs lack the column,
+            older store parts read it back as nulls)
+
+    Returns:
+        pd.DataFrame: df with an int64 recv_ns column
+    """
+    if 'recv_ns' not in df.columns:
+        return df.assign(recv_ns=0)
+    if df['recv_ns'].isna().any():
+        df = df.copy()
+        df['recv_ns'] = df['recv_ns'].fillna(0).astype('int64')
+    return df
+
+
+class TickRingBuffer:
+
+    def __init__(self, capacity=600, symbols=()):
+        """
+        Initialize ring buffer
+
+        Args:
+            capacity: Ticks kept per symbol
+            symbols: Symbols to preallocate up front
+        """
+        self.capacity = capacity
+        self._arrays = {}
+        self._counts = {}
+
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    def add_symbol(self, symbol):
+        """Preallocate storage for a symbol (no-op if already present)"""
+        if symbol not in self._arrays:
+            self._arrays[symbol] = np.zeros(self.capacity, dtype=TICK_DTYPE)
+            self._counts[symbol] = 0
+        return self._arrays[symbol]
+
+    def remove_symbol(self, symbol):
+        """Free a symbol's storage (no-op if absent)"""
+        self._arrays.pop(symbol, None)
+        self._counts.pop(symbol, None)
+
+    def append(self, symbol, row):
+        """
+        Write one tick in place
+
+        Args:
+            symbol: Symbol name
+            row: Tuple of values in TICK_FIELDS order
+        """
+        array = self._arrays.get(symbol)
+        if array is None:
+            array = self.add_symbol(symbol)
+        count = self._counts[symbol]
+        slot = count % self.capacity
+        array[slot] = row
+        self._counts[symbol] = count + 1
+
+    def views(self, symbol):
+        """
+        Get buffered ticks for a symbol in chronological order
+
+        Returns:
+            list: One or two array views (older part first)
+        """
+        array = self._arrays.get(symbol)
+        if array is None:
+            return []
+        count = self._counts[symbol]
+        if count <= self.capacity:
+            return [array[:count]]
+        head = count % self.capacity
+        return [array[head:], array[:head]]
+
+    def latest(self, symbol):
+        """Get the most recent tick for a symbol (view) or None"""
+        array = self._arrays.get(symbol)
+        count = self._counts.get(symbol, 0)
+        if array is None or count == 0:
+            return None
+        return array[(count - 1) % self.capacity]
+
+    def latest_recv(self, symbol):
+        """Receive time (epoch ns) of the most recent tick for a symbol, or None"""
+        latest = self.latest(symbol)
+        return None if latest is None else int(latest['recv_ns'])
+
+    def total_ticks(self, symbol):
+        """Ticks ever written for a symbol (including overwritten ones)"""
+        return self._counts.get(symbol, 0)
+
+    def symbols(self):
+        """Symbols with allocated buffers"""
+        return list(self._arrays.keys())
+
+    def to_records(self, symbol):
+        """
+        Buffered ticks for a symbol as JSON-ready dicts
+
+        Returns:
+            list: Tick dicts in CSV column layout
+        """
+        records = []
+        for view in self.views(symbol):
+            if len(view) == 0:
+                continue
+            timestamps = ns_to_local(view['exchange_timestamp'])
+            for ts, values in zip(timestamps, view.tolist()):
+                record = {'Symbol': symbol}
+                record.update(zip(TICK_FIELDS, values))
+                record['exchange_timestamp'] = ts
+                records.append(record)
+        return records
+
+    def copy(self):
+        """Independent copy of every buffer (session checkpoints)"""
+        clone = TickRingBuffer(self.capacity)
+        clone._arrays = {symbol: array.copy() for symbol, array in self._arrays.items()}
+        clone._counts = dict(self._counts)
+        return clone
+
+    def __len__(self):
+        return sum(min(count, self.capacity) for count in self._counts.values())
@@ -0,0 +1,115 @@
+"""
+Tick Conflation
+Emits at most one update per symbol per interval for downstream consumers
+- Ingest only records state (O(1) per tick); a flusher thread emits every
+  symbol that ticked during the interval
+- Emitted row is the latest tick, so cumulative fields (volume, OI,
+  total buy/sell) are exact
+- In-interval high/low of last_price, tick count and traded volume ride
+  along as extras
+- The raw tick path (buffer, bars, journal, tick store) is not conflated
+"""
+
+import threading
+import time
+from tick_buffer import TICK_FIELDS
+
+_LAST = TICK_FIELDS.index('last_price')
+_VOLUME = TICK_FIELDS.index('volume_traded')
+
+
+class TickConflator:
+
+    def __init__(self, interval_ms, emit):
+        """
+        Initialize conflator
+
+        Args:
+            interval_ms: Minimum milliseconds between updates for one symbol
+            emit: Callable (symbol, row, recv_ns, extras) run on the flusher thread;
+                  extras = {'interval_high', 'interval_low', 'interval_ticks', 'interval_volume'}
+        """
+        self.interval = interval_ms / 1000.0
+        self.emit = emit
+        self._pending = {}             # symbol -> [row, recv_ns, high, low, ticks, volume_start]
+        self._last_volume = {}         # symbol -> cumulative volume at the last emit
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.ticks_in = 0
+        self.updates_out = 0
+        self.emit_errors = 0
+
+    def update(self, symbol, row, recv_ns):
+        """Record a tick (ingest thread)"""
+        price = row[_LAST]
+        with self._lock:
+            self.ticks_in += 1
+            state = self._pending.get(symbol)
+            if state is None:
+                self._pending[symbol] = [row, recv_ns, price, price, 1,
+                                         self._last_volume.get(symbol, row[_VOLUME])]
+                return
+            state[0] = row
+            state[1] = recv_ns
+            if price:
+                if price > state[2] or not state[2]:
+                    state[2] = price
+                if price < state[3] or not state[3]:
+                    state[3] = price
+            state[4] += 1
+
+    def remove_symbol(self, symbol):
+        """Discard a symbol's pending update (symbol left the watchlist)"""
+        with self._lock:
+            self._pending.pop(symbol, None)
+            self._last_volume.pop(symbol, None)
+
+    def flush(self):
+        """Emit one update for every symbol that ticked since the last flush"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for symbol, (row, recv_ns, high, low, ticks, volume_start) in pending.items():
+            self._last_volume[symbol] = row[_VOLUME]
+            extras = {
+                'interval_high': high,
+                'interval_low': low,
+                'interval_ticks': ticks,
+                'interval_volume': max(0, row[_VOLUME] - volume_start),
+            }
+            try:
+                self.emit(symbol, row, recv_ns, extras)
+            except Exception as e:
+                self.emit_errors += 1
+                print(f"   ⚠️ Conflated emit failed for {symbol}: {e}")
+        self.updates_out += len(pending)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="tick-conflator", daemon=True)
+        self._thread.start()
+        print(f"✓ Conflation on: at most one update per symbol every {self.interval * 1000:.0f}ms")
+
+    def _run(self):
+        next_flush = time.monotonic() + self.interval
+        while not self._stop_event.wait(max(0.0, next_flush - time.monotonic())):
+            self.flush()
+            next_flush += self.interval
+            if next_flush < time.monotonic():     # fell behind, don't burst to catch up
+                next_flush = time.monotonic() + self.interval
+
+    def stop(self):
+        """Stop the flusher and emit what is left"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+    def stats(self):
+        return {
+            'interval_ms': round(self.interval * 1000, 1),
+            'ticks_in': self.ticks_in,
+            'updates_out': self.updates_out,
+            'ratio': round(self.ticks_in / self.updates_out, 2) if self.updates_out else None,
+            'emit_errors': self.emit_errors,
+        }
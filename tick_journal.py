@@ -0,0 +1,230 @@
+"""
+Memory-Mapped Tick Journal
+Fixed-width binary journal of every normalized tick
+- One 248-byte record per tick (same 30 fields as the CSV schema)
+- Prices stored as int64 scaled by PRICE_SCALE (paise)
+- File pre-sized per session and grown in chunks
+- Header record count is bumped only after a record is fully written,
+  so a crash never exposes a half-written tick
+- Readers map the file read-only and get a zero-copy NumPy view
+"""
+
+import mmap
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from tick_buffer import CSV_COLUMNS, TICK_FIELDS, PRICE_FIELDS, ns_to_local
+
+JOURNAL_DIR = "journal"
+JOURNAL_MAGIC = b'TICKJRN1'
+JOURNAL_VERSION = 2             # 2: recv_ns field
+PRICE_SCALE = 100
+SYMBOL_WIDTH = 16
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('record_size', '<u4'),
+    ('price_scale', '<u8'),
+    ('capacity', '<u8'),
+    ('count', '<u8'),
+    ('created_ns', '<i8'),
+    ('reserved', 'V16'),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize  # 64 bytes
+
+RECORD_DTYPE = np.dtype([('Symbol', f'S{SYMBOL_WIDTH}')] + [(name, '<i8') for name in TICK_FIELDS])
+
+_PRICE_INDEXES = frozenset(TICK_FIELDS.index(name) for name in PRICE_FIELDS)
+
+
+def journal_path(session_date=None, journal_dir=JOURNAL_DIR):
+    """Default journal file for a session date"""
+    session_date = session_date or datetime.now()
+    return os.path.join(journal_dir, f"ticks_{session_date.strftime('%Y%m%d')}.jrn")
+
+
+# ============================================================
+# WRITER
+# ============================================================
+
+class TickJournal:
+
+    def __init__(self, path, initial_records=1_000_000, grow_records=1_000_000):
+        """
+        Open (or create) a journal for appending
+
+        Args:
+            path: Journal file path
+            initial_records: Records pre-allocated for a new journal
+            grow_records: Records added each time the journal fills up
+        """
+        self.path = path
+        self.grow_records = grow_records
+        self._symbol_bytes = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        is_new = not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE
+        self._file = open(path, 'w+b' if is_new else 'r+b')
+        if is_new:
+            self._file.truncate(HEADER_SIZE + initial_records * RECORD_DTYPE.itemsize)
+        self._map()
+
+        if is_new:
+            self._header['magic'] = JOURNAL_MAGIC
+            self._header['version'] = JOURNAL_VERSION
+            self._header['record_size'] = RECORD_DTYPE.itemsize
+            self._header['price_scale'] = PRICE_SCALE
+            self._header['capacity'] = initial_records
+            self._header['count'] = 0
+            self._header['created_ns'] = int(datetime.now().timestamp() * 1e9)
+            print(f"✓ Created tick journal: {path} ({initial_records:,} records)")
+        else:
+            _check_header(self._header, path)
+            print(f"✓ Resuming tick journal: {path} ({self.count:,} records)")
+
+    def _map(self):
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self._mmap)
+        capacity = (len(self._mmap) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        self._records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=self._mmap, offset=HEADER_SIZE)
+        self._capacity = capacity
+
+    def _grow(self):
+        new_capacity = self._capacity + self.grow_records
+        self._mmap.flush()
+        del self._header, self._records
+        self._mmap.close()
+        self._file.truncate(HEADER_SIZE + new_capacity * RECORD_DTYPE.itemsize)
+        self._map()
+        self._header['capacity'] = new_capacity
+
+    @property
+    def count(self):
+        return int(self._header['count'])
+
+    def append(self, symbol, row):
+        """
+        Append one tick
+
+        Args:
+            symbol: Symbol name
+            row: Tuple of values in TICK_FIELDS order (float prices)
+        """
+        count = int(self._header['count'])
+        if count >= self._capacity:
+            self._grow()
+
+        symbol_bytes = self._symbol_bytes.get(symbol)
+        if symbol_bytes is None:
+            symbol_bytes = self._symbol_bytes[symbol] = symbol.encode()[:SYMBOL_WIDTH]
+
+        self._records[count] = (symbol_bytes,) + tuple(
+            round(value * PRICE_SCALE) if i in _PRICE_INDEXES else value
+            for i, value in enumerate(row)
+        )
+        # Publish only after the record is complete
+        self._header['count'] = count + 1
+
+    def flush(self):
+        """Sync written pages to disk"""
+        self._mmap.flush()
+
+    def close(self):
+        self.flush()
+        count = self.count
+        del self._header, self._records
+        self._mmap.close()
+        self._file.close()
+        print(f"✓ Tick journal closed: {self.path} ({count:,} records)")
+
+
+# ============================================================
+# READER
+# ============================================================
+
+def _check_header(header, path):
+    if bytes(header['magic']) != JOURNAL_MAGIC:
+        raise ValueError(f"Not a tick journal: {path}")
+    if int(header['record_size']) != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported journal record size {int(header['record_size'])} in {path}")
+
+
+class JournalReader:
+    """Read-only, zero-copy view of a journal (safe while it is being written)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = None
+        self._remap()
+
+    def _remap(self):
+        # Old map stays alive until views handed out from it are released
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self._mmap)
+        _check_header(self._header, self.path)
+        self.price_scale = int(self._header['price_scale'])
+
+    def records(self):
+        """
+        View of all records written so far
+
+        Returns:
+            np.ndarray: Read-only RECORD_DTYPE view (no copy)
+        """
+        count = int(self._header['count'])
+        available = (len(self._mmap) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count > available:
+            # Writer grew the file since we mapped it
+            self._remap()
+            count = int(self._header['count'])
+            available = (len(self._mmap) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        return np.ndarray((min(count, available),), dtype=RECORD_DTYPE,
+                          buffer=self._mmap, offset=HEADER_SIZE)
+
+    def to_frame(self, start=0, stop=None):
+        """Records [start:stop] as a DataFrame in CSV layout (prices descaled)"""
+        return records_to_frame(self.records()[start:stop], self.price_scale)
+
+    def close(self):
+        self._header = None
+        self._mmap.close()
+        self._file.close()
+
+
+def open_journal(path):
+    """
+    Map a journal read-only
+
+    Returns:
+        np.ndarray: Zero-copy view of the ticks written so far
+    """
+    return JournalReader(path).records()
+
+
+def records_to_rows(records, price_scale=PRICE_SCALE):
+    """
+    Convert journal records back to normalized ticks
+
+    Returns:
+        tuple: (symbols list, rows list of tuples in TICK_FIELDS order, float prices)
+    """
+    columns = [records[name] / price_scale if name in PRICE_FIELDS else records[name]
+               for name in TICK_FIELDS]
+    symbols = [symbol.decode('utf-8') for symbol in records['Symbol'].tolist()]
+    return symbols, list(zip(*(column.tolist() for column in columns)))
+
+
+def records_to_frame(records, price_scale=PRICE_SCALE):
+    """Convert journal records to a DataFrame in CSV column layout"""
+    df = pd.DataFrame({name: records[name] for name in RECORD_DTYPE.names})
+    df['Symbol'] = df['Symbol'].str.decode('utf-8')
+    for name in PRICE_FIELDS:
+        df[name] = df[name] / price_scale
+    df['exchange_timestamp'] = ns_to_local(records['exchange_timestamp'])
+    return df[CSV_COLUMNS]
@@ -0,0 +1,196 @@
+"""
+Tick Normalization
+Converts Breeze websocket tick dicts into TICK_FIELDS rows
+- exchange_timestamp comes from the payload's 'ltt' (exchange time),
+  falling back to local receive time when it is missing or unparseable
+- Per-field path: build_tick_row() (one tick, ~30 safe_* calls)
+- Batch path: normalize_batch() (whole list in one pass, key lookups
+  resolved once per column, bulk NumPy coercion with a per-value
+  fallback only for columns that contain junk)
+
+Benchmark: python bench_tick_normalizer.py
+"""
+
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from tick_buffer import TICK_DTYPE, DEPTH_LEVELS
+
+# Batches smaller than this are cheaper through the per-field path
+# (bench_tick_normalizer.py: batch path ~0.2x at 1 tick, ~0.8x at 8, ~1.1x at 16)
+BATCH_NORMALIZE_MIN = 16
+
+# Breeze 'ltt' is exchange (IST) wall time, e.g. 'Mon Nov 17 12:07:57 2025'
+EXCHANGE_TZ = timezone(timedelta(hours=5, minutes=30))
+EXCHANGE_TIME_FORMATS = ('%a %b %d %H:%M:%S %Y', '%d-%b-%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S')
+
+_exchange_time_cache = {}      # ltt string -> epoch ns (one new string per second per symbol)
+_EXCHANGE_TIME_CACHE_MAX = 4096
+
+
+# ============================================================
+# EXCHANGE TIME
+# ============================================================
+
+def parse_exchange_time(value):
+    """
+    Parse a Breeze exchange time string to epoch ns
+
+    Returns:
+        int: Epoch nanoseconds, or None if missing/unparseable
+    """
+    if not value:
+        return None
+    ns = _exchange_time_cache.get(value)
+    if ns is not None:
+        return ns
+    for fmt in EXCHANGE_TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt)
+            break
+        except (ValueError, TypeError):
+            continue
+    else:
+        return None
+    ns = int(parsed.replace(tzinfo=EXCHANGE_TZ).timestamp()) * 1_000_000_000
+    if len(_exchange_time_cache) >= _EXCHANGE_TIME_CACHE_MAX:
+        _exchange_time_cache.clear()
+    _exchange_time_cache[value] = ns
+    return ns
+
+
+# ============================================================
+# PER-FIELD PATH
+# ============================================================
+
+def safe_int(value, default=0):
+    if value is None or value == '' or value == "": return default
+    try: return int(float(value))
+    except (ValueError, TypeError): return default
+
+def safe_float(value, default=0.0):
+    if value is None or value == '' or value == "": return default
+    try: return float(value)
+    except (ValueError, TypeError): return default
+
+def safe_get_depth(data, key, index=0, default=0):
+    value = data.get(key, default)
+    if isinstance(value, list): return value[index] if len(value) > index else default
+    if isinstance(value, (int, float)): return value if index==0 else default
+    return default
+
+def build_tick_row(tick, ts_ns):
+    """Normalize one Breeze tick into a row tuple in TICK_FIELDS order (ts_ns = receive time)"""
+    row = [
+        parse_exchange_time(tick.get('ltt')) or ts_ns,
+        safe_float(tick.get('last', tick.get('ltp', 0))),
+        safe_int(tick.get('ttq', tick.get('volume', 0))),
+        safe_int(tick.get('ltq', 0)),
+        safe_int(tick.get('OI', 0)),
+        safe_int(tick.get('CHNGOI', 0)),
+    ]
+    for i in range(5):
+        row.append(safe_float(safe_get_depth(tick, 'bPrice', i, 0)))
+        row.append(safe_int(safe_get_depth(tick, 'bQty', i, 0)))
+    for i in range(5):
+        row.append(safe_float(safe_get_depth(tick, 'sPrice', i, 0)))
+        row.append(safe_int(safe_get_depth(tick, 'sQty', i, 0)))
+    row.append(safe_int(tick.get('totalBuyQt', 0)))
+    row.append(safe_int(tick.get('totalSellQ', 0)))
+    row.append(ts_ns)
+    return tuple(row)
+
+
+# ============================================================
+# BATCH PATH
+# ============================================================
+
+# (output field, payload key, fallback key, is_price)
+_SCALAR_COLUMNS = [
+    ('last_price', 'last', 'ltp', True),
+    ('volume_traded', 'ttq', 'volume', False),
+    ('last_traded_quantity', 'ltq', None, False),
+    ('open_interest', 'OI', None, False),
+    ('change_in_oi', 'CHNGOI', None, False),
+    ('total_buy_qty', 'totalBuyQt', None, False),
+    ('total_sell_qty', 'totalSellQ', None, False),
+]
+
+# (payload key, output field prefix, is_price)
+_DEPTH_COLUMNS = [
+    ('bPrice', 'bid_price_', True),
+    ('bQty', 'bid_qty_', False),
+    ('sPrice', 'ask_price_', True),
+    ('sQty', 'ask_qty_', False),
+]
+
+_EMPTY_DEPTH = [0] * DEPTH_LEVELS
+
+
+def _coerce(raw, is_price):
+    """Bulk-convert a column; falls back to safe_* per value on junk"""
+    try:
+        values = np.asarray(raw, dtype=np.float64)
+        if np.isnan(values).any():
+            values = np.nan_to_num(values, nan=0.0)
+    except (ValueError, TypeError):
+        convert = safe_float if is_price else safe_int
+        if _is_nested(raw):
+            values = np.array([[convert(v) for v in row] for row in raw], dtype=np.float64)
+        else:
+            values = np.array([convert(v) for v in raw], dtype=np.float64)
+    return values if is_price else values.astype(np.int64)
+
+
+def _is_nested(raw):
+    return bool(raw) and isinstance(raw[0], list)
+
+
+def _depth_rows(ticks, key):
+    rows = []
+    for tick in ticks:
+        value = tick.get(key, 0)
+        if isinstance(value, list):
+            if len(value) >= DEPTH_LEVELS:
+                rows.append(value[:DEPTH_LEVELS])
+            else:
+                rows.append(value + _EMPTY_DEPTH[len(value):])
+        elif isinstance(value, (int, float)):
+            rows.append([value, 0, 0, 0, 0])
+        else:
+            rows.append(_EMPTY_DEPTH)
+    return rows
+
+
+def normalize_batch(ticks, ts_ns):
+    """
+    Normalize a list of Breeze ticks in one pass
+
+    Args:
+        ticks: List of tick dicts
+        ts_ns: Receive time in epoch ns (scalar or one per tick)
+
+    Returns:
+        np.ndarray: TICK_DTYPE structured array, one row per tick
+                    (.tolist() gives the same tuples as build_tick_row)
+    """
+    out = np.empty(len(ticks), dtype=TICK_DTYPE)
+    if not ticks:
+        return out
+    recv_ns = ts_ns if isinstance(ts_ns, (list, tuple, np.ndarray)) else [ts_ns] * len(ticks)
+    out['exchange_timestamp'] = [parse_exchange_time(tick.get('ltt')) or recv
+                                 for tick, recv in zip(ticks, recv_ns)]
+    out['recv_ns'] = recv_ns
+
+    for field, key, alt, is_price in _SCALAR_COLUMNS:
+        if alt is None:
+            raw = [tick.get(key, 0) for tick in ticks]
+        else:
+            raw = [tick[key] if key in tick else tick.get(alt, 0) for tick in ticks]
+        out[field] = _coerce(raw, is_price)
+
+    for key, prefix, is_price in _DEPTH_COLUMNS:
+        matrix = _coerce(_depth_rows(ticks, key), is_price)
+        for level in range(DEPTH_LEVELS):
+            out[f'{prefix}{level + 1}'] = matrix[:, level]
+
+    return out
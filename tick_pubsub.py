@@ -0,0 +1,290 @@
+"""
+Local Tick Pub/Sub
+Fans normalized ticks and closed bars out to local consumers
+- Unix domain socket (TCP on localhost where AF_UNIX is unavailable)
+- NDJSON messages, one per line (same fields as the CSV + recv_ns)
+- Per-subscriber symbol filter, bars optional
+- Slow consumers never block ingest: each subscriber has its own sender
+  thread and either conflates (latest tick per symbol) or drops oldest
+- Client: TickSubscriber / subscribe() below
+
+Consumer:
+    from tick_pubsub import TickSubscriber
+    for msg in TickSubscriber(symbols=['RELIND', 'TCS']):
+        print(msg['Symbol'], msg['last_price'])
+
+Wire protocol:
+    client -> server: {"symbols": ["RELIND"] | null, "bars": true, "mode": "conflate"|"drop"}
+    server -> client: {"type": "tick", "Symbol": ..., "recv_ns": ..., ...CSV fields (timestamps epoch ns),
+                       lot_size/tick_size (rupees)/expiry_date when the token is in the token master,
+                       ...interval_* fields when the monitor conflates (tick_conflator.py)}
+                      {"type": "bar", "Symbol": ..., ...bar fields}
+"""
+
+import json
+import os
+import socket
+import threading
+from collections import deque
+from tick_buffer import TICK_FIELDS
+from bar_aggregator import bars_for_json
+
+PUBSUB_ADDRESS = "/tmp/nse_ticks.sock" if hasattr(socket, 'AF_UNIX') else ("127.0.0.1", 8765)
+MODE_CONFLATE = 'conflate'
+MODE_DROP = 'drop'
+SUBSCRIBER_QUEUE = 5000        # messages held per drop-mode subscriber
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+
+def _socket_family(address):
+    return socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+
+
+# ============================================================
+# SERVER
+# ============================================================
+
+class _Subscriber:
+    """One connected consumer (its own queue and sender thread)"""
+
+    def __init__(self, publisher, conn, symbols, bars, mode, max_pending):
+        self.publisher = publisher
+        self.conn = conn
+        self.symbols = set(symbols) if symbols else None
+        self.bars = bars
+        self.mode = mode
+        self.sent = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.alive = True
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._latest = {}                        # conflate: symbol -> tick
+        self._queue = deque(maxlen=max_pending)  # drop: ticks; both: bars
+        self._thread = threading.Thread(target=self._send_loop, name="pubsub-sender", daemon=True)
+
+    def wants(self, symbol):
+        return self.symbols is None or symbol in self.symbols
+
+    def push_tick(self, symbol, row, recv_ns, extras=None):
+        with self._lock:
+            if self.mode == MODE_CONFLATE:
+                if symbol in self._latest:
+                    self.conflated += 1
+                self._latest[symbol] = (symbol, row, recv_ns, extras)
+            else:
+                if len(self._queue) == self._queue.maxlen:
+                    self.dropped += 1
+                self._queue.append(('tick', (symbol, row, recv_ns, extras)))
+        self._ready.set()
+
+    def push_bars(self, bars):
+        with self._lock:
+            for bar in bars:
+                if len(self._queue) == self._queue.maxlen:
+                    self.dropped += 1
+                self._queue.append(('bar', bar))
+        self._ready.set()
+
+    def _send_loop(self):
+        try:
+            while self.alive:
+                self._ready.wait(1.0)
+                self._ready.clear()
+                with self._lock:
+                    queued = list(self._queue)
+                    self._queue.clear()
+                    latest = list(self._latest.values())
+                    self._latest = {}
+                if not queued and not latest:
+                    continue
+                lines = []
+                for kind, item in queued:
+                    lines.append(self._encode_tick(*item) if kind == 'tick' else self._encode_bar(item))
+                lines.extend(self._encode_tick(*item) for item in latest)
+                self.conn.sendall(('\n'.join(lines) + '\n').encode())
+                self.sent += len(lines)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    @staticmethod
+    def _encode_tick(symbol, row, recv_ns, extras):
+        msg = {'type': 'tick', 'Symbol': symbol, 'recv_ns': recv_ns}
+        msg.update(zip(TICK_FIELDS, row))
+        if extras:
+            msg.update(extras)
+        return _dumps(msg)
+
+    @staticmethod
+    def _encode_bar(bar):
+        msg = bars_for_json([bar])[0]
+        msg['type'] = 'bar'
+        return _dumps(msg)
+
+    def close(self):
+        if not self.alive:
+            return
+        self.alive = False
+        self._ready.set()
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self.publisher._remove(self)
+
+
+class TickPublisher:
+
+    def __init__(self, address=PUBSUB_ADDRESS, max_pending=SUBSCRIBER_QUEUE):
+        """
+        Initialize publisher
+
+        Args:
+            address: Unix socket path, or (host, port) for TCP
+            max_pending: Queued messages per drop-mode subscriber (bars in both modes)
+        """
+        self.address = address
+        self.max_pending = max_pending
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.total_clients = 0
+
+    def start(self):
+        family = _socket_family(self.address)
+        if family == socket.AF_UNIX and os.path.exists(self.address):
+            os.remove(self.address)
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(self.address)
+        self._server.listen(16)
+        self._thread = threading.Thread(target=self._accept_loop, name="pubsub-accept", daemon=True)
+        self._thread.start()
+        print(f"✓ Tick pub/sub listening on {self.address}")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handshake, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        try:
+            conn.settimeout(10)
+            request = json.loads(conn.makefile('r').readline() or '{}')
+            conn.settimeout(None)
+        except (OSError, ValueError):
+            conn.close()
+            return
+        mode = request.get('mode', MODE_CONFLATE)
+        subscriber = _Subscriber(self, conn, request.get('symbols'), request.get('bars', True),
+                                 MODE_DROP if mode == MODE_DROP else MODE_CONFLATE, self.max_pending)
+        with self._lock:
+            self._subscribers = self._subscribers + [subscriber]
+            self.total_clients += 1
+        subscriber._thread.start()
+
+    def _remove(self, subscriber):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
+
+    # ==================== INGEST SIDE (never blocks) ====================
+
+    def publish_tick(self, symbol, row, recv_ns, extras=None):
+        for subscriber in self._subscribers:
+            if subscriber.wants(symbol):
+                subscriber.push_tick(symbol, row, recv_ns, extras)
+
+    def publish_bars(self, bars):
+        for subscriber in self._subscribers:
+            if subscriber.bars:
+                wanted = [bar for bar in bars if subscriber.wants(bar['Symbol'])]
+                if wanted:
+                    subscriber.push_bars(wanted)
+
+    def stop(self):
+        if self._server:
+            self._server.close()
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        if _socket_family(self.address) == socket.AF_UNIX and os.path.exists(self.address):
+            os.remove(self.address)
+
+    def stats(self):
+        """Subscriber counters as a dict"""
+        return {
+            'clients': len(self._subscribers),
+            'total_clients': self.total_clients,
+            'subscribers': [
+                {'symbols': sorted(s.symbols) if s.symbols else None, 'mode': s.mode,
+                 'sent': s.sent, 'dropped': s.dropped, 'conflated': s.conflated}
+                for s in self._subscribers
+            ],
+        }
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+class TickSubscriber:
+    """Iterate over ticks/bars published by a running live_tick_monitor"""
+
+    def __init__(self, address=PUBSUB_ADDRESS, symbols=None, bars=True, mode=MODE_CONFLATE, timeout=None):
+        """
+        Connect and subscribe
+
+        Args:
+            address: Publisher address (see PUBSUB_ADDRESS)
+            symbols: Symbols to receive (None = all)
+            bars: Also receive closed bars
+            mode: 'conflate' (latest tick per symbol when behind) or 'drop' (oldest dropped)
+            timeout: Socket read timeout in seconds (None = block)
+        """
+        self.sock = socket.socket(_socket_family(address), socket.SOCK_STREAM)
+        self.sock.connect(address)
+        self.sock.sendall((_dumps({'symbols': symbols, 'bars': bars, 'mode': mode}) + '\n').encode())
+        self.sock.settimeout(timeout)
+        self._reader = self.sock.makefile('r')
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self._reader.readline()
+        if not line:
+            raise StopIteration
+        return json.loads(line)
+
+    def close(self):
+        self._reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def subscribe(callback, symbols=None, address=PUBSUB_ADDRESS, **kwargs):
+    """Call callback(msg) for every message until the publisher goes away"""
+    with TickSubscriber(address, symbols, **kwargs) as subscriber:
+        for msg in subscriber:
+            callback(msg)
+
+
+if __name__ == "__main__":
+    import sys
+    watch = sys.argv[1].split(',') if len(sys.argv) > 1 else None
+    subscribe(lambda msg: print(_dumps(msg)), symbols=watch)
@@ -0,0 +1,302 @@
+"""
+Tick Replay Engine
+Feeds recorded ticks through a live_tick_monitor.TickMonitor's normalization and on_ticks
+- Sources: all-ticks CSV, Parquet tick store, binary tick journal
+- Speed: 1x (recorded pace), Nx, or max (no pacing)
+- ReplayFeed stands in for BreezeConnect (same callback/subscribe surface)
+- Output goes to a separate folder, git publishing is disabled
+
+Usage:
+    python tick_replay.py --source csv --path all_ticks_FUTURES.csv --speed 0
+    python tick_replay.py --source store --date 2025-11-17 --symbols RELIND,TCS --speed 10
+    python tick_replay.py --source journal --path journal/ticks_20251117.jrn --speed 1
+"""
+
+import argparse
+import os
+import threading
+import time
+import pandas as pd
+import live_tick_monitor as monitor
+import tick_store
+from tick_buffer import CSV_COLUMNS, LOCAL_TZ, fix_legacy_depth, fill_missing_recv
+from tick_journal import JournalReader
+from tick_normalizer import EXCHANGE_TZ, EXCHANGE_TIME_FORMATS
+
+BREEZE_TIME_FORMAT = EXCHANGE_TIME_FORMATS[0]
+REPLAY_OUTPUT_DIR = "replay_output"
+
+
+# ============================================================
+# SOURCES (all return DataFrames in CSV column layout)
+# ============================================================
+
+def _filter_symbols(df, symbols):
+    if symbols:
+        df = df[df['Symbol'].isin(symbols)]
+    return df
+
+
+def load_csv_ticks(csv_file, symbols=None):
+    """Load ticks from an all-ticks CSV (legacy depth order is remapped)"""
+    df = fill_missing_recv(fix_legacy_depth(pd.read_csv(csv_file)))
+    df['exchange_timestamp'] = pd.to_datetime(df['exchange_timestamp'], format='mixed', errors='coerce')
+    df = df[df['exchange_timestamp'].notna()]
+    return _filter_symbols(df, symbols)
+
+
+def load_store_ticks(date, symbols=None, start=None, end=None, root=tick_store.TICK_STORE_DIR):
+    """Load ticks for one day from the Parquet tick store"""
+    symbols = symbols or tick_store.list_symbols(date, root)
+    frames = [tick_store.load_ticks(symbol, date, start, end, root=root) for symbol in symbols]
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=CSV_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_journal_ticks(path, symbols=None):
+    """Load ticks from a binary tick journal"""
+    reader = JournalReader(path)
+    df = reader.to_frame()
+    reader.close()
+    return _filter_symbols(df, symbols)
+
+
+def frame_to_breeze_ticks(df, symbol_to_token):
+    """
+    Rebuild Breeze-shaped tick dicts from recorded rows
+
+    Args:
+        df: Ticks in CSV column layout
+        symbol_to_token: {symbol: breeze token}
+
+    Returns:
+        tuple: (list of epoch-ns timestamps, list of tick dicts), time ordered
+    """
+    df = df.sort_values('exchange_timestamp', kind='stable')
+    timestamps = pd.DatetimeIndex(df['exchange_timestamp'])
+    local = timestamps.tz_localize(LOCAL_TZ)
+    ts_ns = local.as_unit('ns').asi8.tolist()
+    ltt = local.tz_convert(EXCHANGE_TZ).strftime(BREEZE_TIME_FORMAT)
+
+    levels = range(1, 6)
+    bid_px = df[[f'bid_price_{i}' for i in levels]].to_numpy().tolist()
+    bid_qty = df[[f'bid_qty_{i}' for i in levels]].to_numpy().tolist()
+    ask_px = df[[f'ask_price_{i}' for i in levels]].to_numpy().tolist()
+    ask_qty = df[[f'ask_qty_{i}' for i in levels]].to_numpy().tolist()
+
+    ticks = []
+    for i, (symbol, last, ttq, ltq, oi, chng_oi, tbq, tsq) in enumerate(zip(
+            df['Symbol'], df['last_price'], df['volume_traded'], df['last_traded_quantity'],
+            df['open_interest'], df['change_in_oi'], df['total_buy_qty'], df['total_sell_qty'])):
+        ticks.append({
+            'symbol': symbol_to_token[symbol],
+            'last': last,
+            'ttq': ttq,
+            'ltq': ltq,
+            'OI': oi,
+            'CHNGOI': chng_oi,
+            'bPrice': bid_px[i],
+            'bQty': bid_qty[i],
+            'sPrice': ask_px[i],
+            'sQty': ask_qty[i],
+            'totalBuyQt': tbq,
+            'totalSellQ': tsq,
+            'ltt': ltt[i],
+        })
+    return ts_ns, ticks
+
+
+# ============================================================
+# BREEZE STAND-IN
+# ============================================================
+
+class ReplayFeed:
+    """
+    Stand-in for BreezeConnect that plays recorded ticks into on_ticks
+
+    Playback starts once every token in the recording is subscribed
+    (or after start_timeout seconds) and only subscribed tokens are sent.
+    """
+
+    def __init__(self, ts_ns, ticks, speed=1.0, start_timeout=5.0):
+        """
+        Args:
+            ts_ns: Recorded epoch-ns timestamps (time ordered)
+            ticks: Breeze-shaped tick dicts matching ts_ns
+            speed: Playback speed multiplier (0 or None = as fast as possible)
+            start_timeout: Max seconds to wait for subscriptions before playing
+        """
+        self.ts_ns = ts_ns
+        self.ticks = ticks
+        self.speed = speed or 0
+        self.start_timeout = start_timeout
+
+        self.on_ticks = None
+        self.on_error = None
+        self.finished = threading.Event()
+        self.emitted = 0
+        self.elapsed = 0.0
+
+        self._tokens = {tick['symbol'] for tick in ticks}
+        self._subscribed = set()
+        self._all_subscribed = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # ==================== BreezeConnect surface ====================
+
+    def generate_session(self, *args, **kwargs):
+        pass
+
+    def ws_connect(self):
+        self._thread = threading.Thread(target=self._play, name="tick-replay", daemon=True)
+        self._thread.start()
+
+    def subscribe_feeds(self, stock_token=None, **kwargs):
+        tokens = stock_token if isinstance(stock_token, list) else [stock_token]
+        self._subscribed.update(tokens)
+        if self._tokens <= self._subscribed:
+            self._all_subscribed.set()
+        return {'message': f'Stock {stock_token} subscribed successfully'}
+
+    def unsubscribe_feeds(self, stock_token=None, **kwargs):
+        self._subscribed.discard(stock_token)
+        return {'message': f'Stock {stock_token} unsubscribed successfully'}
+
+    def ws_disconnect(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    # ==================== PLAYBACK ====================
+
+    def _play(self):
+        self._all_subscribed.wait(self.start_timeout)
+        if not self.ticks:
+            self.finished.set()
+            return
+
+        first_ts = self.ts_ns[0]
+        wall_start = time.perf_counter()
+        for ts, tick in zip(self.ts_ns, self.ticks):
+            if self._stop_event.is_set():
+                break
+            if self.speed:
+                delay = (ts - first_ts) / 1e9 / self.speed - (time.perf_counter() - wall_start)
+                if delay > 0.001:
+                    time.sleep(delay)
+            if tick['symbol'] not in self._subscribed:
+                continue
+            try:
+                self.on_ticks(tick)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            self.emitted += 1
+
+        self.elapsed = time.perf_counter() - wall_start
+        self.finished.set()
+
+    def ticks_per_second(self):
+        return self.emitted / self.elapsed if self.elapsed else 0.0
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def build_token_map(symbols, watchlist_file=monitor.WATCHLIST_FILE):
+    """Map recorded symbols to watchlist tokens (synthetic tokens for the rest)"""
+    known = {}
+    if os.path.exists(watchlist_file):
+        known = {symbol: token for token, symbol in monitor.load_watchlist(watchlist_file)}
+    return {symbol: known.get(symbol, f"REPLAY!{symbol}") for symbol in symbols}
+
+
+def replay(df, speed=0, sink='none', output_dir=REPLAY_OUTPUT_DIR, print_every=1000, **settings):
+    """
+    Replay recorded ticks through a TickMonitor
+
+    Args:
+        df: Ticks in CSV column layout
+        speed: Playback speed multiplier (0 = max)
+        sink: Tick store for replayed ticks ('none', 'csv' or 'parquet')
+        output_dir: Folder for replayed ticks and snapshots
+        print_every: Status line frequency in ticks
+        **settings: Further MonitorConfig overrides (e.g. conflate_interval_ms=100)
+
+    Returns:
+        ReplayFeed: Finished feed (emitted count, elapsed, ticks_per_second())
+    """
+    symbols = sorted(df['Symbol'].unique())
+    symbol_to_token = build_token_map(symbols)
+
+    print(f"⏳ Preparing {len(df):,} ticks for {len(symbols)} symbols...")
+    prep_start = time.perf_counter()
+    ts_ns, ticks = frame_to_breeze_ticks(df, symbol_to_token)
+    print(f"✓ Prepared in {time.perf_counter() - prep_start:.2f}s")
+
+    overrides = {
+        'tick_store': sink,
+        'csv_file': os.path.join(output_dir, "replay_ticks.csv"),
+        'bar_csv_file': os.path.join(output_dir, "replay_bars.csv"),
+        'tick_store_dir': os.path.join(output_dir, "tick_store"),
+        'snapshot_dir': os.path.join(output_dir, "snapshots"),
+        'metrics_file': os.path.join(output_dir, "monitor_metrics.json"),
+        'metrics_http': False,
+        'write_policy': 'block',
+        'journal_enabled': False,
+        'checkpoint_enabled': False,
+        'checkpoint_restore': False,
+        'contract_enrich': False,
+        'git_publish': False,
+        'print_frequency': print_every,
+    }
+    overrides.update(settings)
+    os.makedirs(output_dir, exist_ok=True)
+
+    feed = ReplayFeed(ts_ns, ticks, speed=speed)
+    session = monitor.TickMonitor(monitor.MonitorConfig(**overrides), feed=feed,
+                                  watchlist=[(symbol_to_token[s], s) for s in symbols])
+    session.run_session(stop_condition=feed.finished.is_set, subscribe_rate=0)
+
+    print(f"\n🎬 Replayed {feed.emitted:,} ticks in {feed.elapsed:.2f}s "
+          f"({feed.ticks_per_second():,.0f} ticks/sec, speed={'max' if not speed else f'{speed}x'})")
+    return feed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ticks through the live monitor")
+    parser.add_argument('--source', choices=['csv', 'store', 'journal'], default='csv')
+    parser.add_argument('--path', default=monitor.CSV_FILE, help="CSV file, journal file or store root")
+    parser.add_argument('--date', help="Session date for --source store (YYYY-MM-DD)")
+    parser.add_argument('--symbols', help="Comma-separated symbols (default: all)")
+    parser.add_argument('--start', help="Start time HH:MM[:SS] (store only)")
+    parser.add_argument('--end', help="End time HH:MM[:SS] (store only)")
+    parser.add_argument('--speed', type=float, default=1.0, help="Playback multiplier, 0 = max speed")
+    parser.add_argument('--sink', choices=['none', 'csv', 'parquet'], default='none')
+    parser.add_argument('--output-dir', default=REPLAY_OUTPUT_DIR)
+    parser.add_argument('--print-every', type=int, default=1000)
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(',') if args.symbols else None
+    if args.source == 'csv':
+        df = load_csv_ticks(args.path, symbols)
+    elif args.source == 'journal':
+        df = load_journal_ticks(args.path, symbols)
+    else:
+        if not args.date:
+            parser.error("--date is required for --source store")
+        root = args.path if args.path != monitor.CSV_FILE else tick_store.TICK_STORE_DIR
+        df = load_store_ticks(args.date, symbols, args.start, args.end, root)
+
+    if df.empty:
+        print("⚠️ No ticks to replay")
+        return
+    replay(df, args.speed, args.sink, args.output_dir, args.print_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Sharded Multi-Process Tick Ingestion
+Splits the watchlist across N worker processes for full-universe sessions
+- Each shard worker has its own feed connection, rate-limited
+  subscriptions (subscription_manager.py) and normalizes its ticks
+  locally (tick_normalizer.py)
+- Normalized rows are shipped in batches over one multiprocessing queue
+- The coordinator merges them into live_tick_monitor's single buffer /
+  bar / store / snapshot / git pipeline
+- Per-shard throughput (ticks/sec, batches, queue lag) in the status
+  output and the metrics file
+- The watchlist is fixed for the session: workers subscribe their shard
+  once at start, so WATCHLIST_RELOAD does not apply (restart to change it)
+
+Usage:
+    set SHARD_COUNT = 4 in live_tick_monitor.py, or
+    python tick_shards.py 4
+"""
+
+import multiprocessing as mp
+import queue
+import signal
+import sys
+import threading
+import time
+
+from tick_normalizer import build_tick_row, normalize_batch, BATCH_NORMALIZE_MIN
+from subscription_manager import SubscriptionManager
+
+SHARD_BATCH_SIZE = 200         # rows per message sent to the coordinator
+SHARD_FLUSH_INTERVAL = 0.05    # seconds before a partial batch is sent
+SHARD_STATUS_INTERVAL = 30     # seconds between per-shard throughput lines
+SHARD_START_METHOD = 'spawn'   # workers must not inherit the coordinator's threads
+
+
+def split_watchlist(token_symbol_list, shard_count):
+    """
+    Split (token, symbol) pairs into shard_count round-robin shards
+
+    Returns:
+        list: One (token, symbol) list per non-empty shard
+    """
+    shards = [token_symbol_list[i::shard_count] for i in range(shard_count)]
+    return [shard for shard in shards if shard]
+
+
+def breeze_feed(shard_id, tokens):
+    """Default feed factory: one BreezeConnect session per shard"""
+    import live_tick_monitor as monitor
+    return monitor.connect_breeze()
+
+
+# ============================================================
+# WORKER (runs in the shard process)
+# ============================================================
+
+def _shard_worker(shard_id, tokens, feed_factory, out_queue, stop_event,
+                  batch_size, flush_interval, subscribe_options):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the coordinator owns shutdown
+    token_to_symbol = dict(tokens)
+    pending = []
+    lock = threading.Lock()
+    counters = {'ticks': 0, 'batches': 0, 'errors': 0}
+    started = time.monotonic()
+    subscriptions = None
+
+    def flush():
+        with lock:
+            if not pending:
+                return
+            batch = pending[:]
+            pending.clear()
+        out_queue.put(('ticks', shard_id, time.time_ns(), batch))
+        counters['batches'] += 1
+
+    def on_ticks(ticks):
+        ts_ns = time.time_ns()
+        tick_list = ticks if isinstance(ticks, list) else [ticks]
+        if len(tick_list) >= BATCH_NORMALIZE_MIN:
+            rows = normalize_batch(tick_list, ts_ns).tolist()
+        else:
+            rows = [build_tick_row(tick, ts_ns) for tick in tick_list]
+        awaiting = subscriptions.pending if subscriptions else ()
+        with lock:
+            for tick, row in zip(tick_list, rows):
+                token = tick.get('symbol')
+                if token in awaiting:
+                    subscriptions.confirm(token)
+                pending.append((token_to_symbol.get(token, "UNKNOWN"), ts_ns, row))
+            counters['ticks'] += len(rows)
+            full = len(pending) >= batch_size
+        if full:
+            flush()
+
+    def on_error(error):
+        counters['errors'] += 1
+        print(f"❌ [shard {shard_id}] WebSocket Error: {error}")
+
+    def worker_stats():
+        elapsed = time.monotonic() - started
+        return dict(counters, elapsed=elapsed,
+                    ticks_per_sec=counters['ticks'] / elapsed if elapsed else 0.0)
+
+    try:
+        feed = feed_factory(shard_id, tokens)
+        feed.on_ticks = on_ticks
+        feed.on_error = on_error
+        feed.ws_connect()
+        subscriptions = SubscriptionManager(feed, verbose=False, **subscribe_options)
+        subscriptions.subscribe(tokens)
+        out_queue.put(('ready', shard_id, time.time_ns(), subscriptions.stats()))
+
+        finished = getattr(feed, 'finished', None)    # recorded feeds end on their own
+        while not stop_event.wait(flush_interval):
+            flush()
+            if finished is not None and finished.is_set():
+                break
+        subscriptions.stop()
+        feed.ws_disconnect()
+        flush()
+    except Exception as e:
+        out_queue.put(('error', shard_id, time.time_ns(), str(e)))
+    finally:
+        out_queue.put(('done', shard_id, time.time_ns(), worker_stats()))
+
+
+# ============================================================
+# COORDINATOR (runs in the monitor process)
+# ============================================================
+
+class ShardCoordinator:
+    """
+    Runs shard workers and merges their rows into live_tick_monitor
+
+    Exposes the feed surface TickMonitor expects, so a sharded session is
+    TickMonitor(feed=ShardCoordinator(...)). Subscriptions are owned by the
+    workers; subscribe_feeds() only reports which shard handles a token.
+    """
+
+    manages_subscriptions = True
+
+    def __init__(self, token_symbol_list, shard_count, feed_factory=breeze_feed,
+                 batch_size=SHARD_BATCH_SIZE, flush_interval=SHARD_FLUSH_INTERVAL,
+                 subscribe_options=None, status_interval=SHARD_STATUS_INTERVAL):
+        """
+        Initialize coordinator
+
+        Args:
+            token_symbol_list: Full watchlist as (token, symbol) pairs
+            shard_count: Number of worker processes
+            feed_factory: Picklable callable (shard_id, tokens) -> feed object
+            batch_size: Rows per worker message
+            flush_interval: Seconds before a worker sends a partial batch
+            subscribe_options: SubscriptionManager keyword arguments for each
+                               worker (rate, burst, max_retries, ...; None = its defaults)
+            status_interval: Seconds between per-shard throughput lines
+        """
+        self.shards = split_watchlist(list(token_symbol_list), max(1, shard_count))
+        self.feed_factory = feed_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.subscribe_options = dict(subscribe_options or {})
+        self.status_interval = status_interval
+
+        self.on_ticks = None           # set by TickMonitor, unused (workers normalize)
+        self.on_error = None
+        self.on_batch = None           # set by TickMonitor: receives merged (symbol, recv_ns, row) batches
+        self.shard_of = {token: i for i, shard in enumerate(self.shards) for token, _ in shard}
+
+        self._ctx = mp.get_context(SHARD_START_METHOD)
+        self._queue = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        self._processes = []
+        self._merge_thread = None
+        self._started = None
+        self._done = set()
+        self.all_done = threading.Event()
+
+        shard_ids = range(len(self.shards))
+        self.received = {i: 0 for i in shard_ids}
+        self.batches = {i: 0 for i in shard_ids}
+        self.last_batch_lag_ms = {i: 0.0 for i in shard_ids}
+        self.ready = {}                # shard_id -> worker SubscriptionManager.stats()
+        self.errors = {}
+        self.worker_stats = {}
+
+    # ==================== Feed surface ====================
+
+    def generate_session(self, *args, **kwargs):
+        pass
+
+    def ws_connect(self):
+        self._started = time.monotonic()
+        for shard_id, tokens in enumerate(self.shards):
+            process = self._ctx.Process(
+                target=_shard_worker, name=f"tick-shard-{shard_id}", daemon=True,
+                args=(shard_id, tokens, self.feed_factory, self._queue, self._stop_event,
+                      self.batch_size, self.flush_interval, self.subscribe_options))
+            process.start()
+            self._processes.append(process)
+        self._merge_thread = threading.Thread(target=self._merge, name="shard-merge", daemon=True)
+        self._merge_thread.start()
+        print(f"✓ Started {len(self.shards)} shard workers "
+              f"({', '.join(str(len(s)) for s in self.shards)} tokens)")
+
+    def subscribe_feeds(self, stock_token=None, **kwargs):
+        return {'message': f'Stock {stock_token} handled by shard {self.shard_of.get(stock_token)}'}
+
+    def unsubscribe_feeds(self, stock_token=None, **kwargs):
+        return {'message': f'Stock {stock_token} handled by shard {self.shard_of.get(stock_token)}'}
+
+    def ws_disconnect(self, timeout=30):
+        """Stop workers, drain their last batches, then stop merging"""
+        self._stop_event.set()
+        self.all_done.wait(timeout)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        if self._merge_thread:
+            self._merge_thread.join(timeout=5)
+        self.print_status()
+
+    # ==================== MERGE ====================
+
+    def _merge(self):
+        last_status = time.monotonic()
+        while len(self._done) < len(self.shards):
+            try:
+                kind, shard_id, sent_ns, payload = self._queue.get(timeout=0.25)
+            except queue.Empty:
+                kind = None
+                self._reap_dead_workers()
+            if kind == 'ticks':
+                self.on_batch(payload)
+                self.received[shard_id] += len(payload)
+                self.batches[shard_id] += 1
+                self.last_batch_lag_ms[shard_id] = (time.time_ns() - sent_ns) / 1e6
+            elif kind == 'ready':
+                self.ready[shard_id] = payload
+                print(f"✓ Shard {shard_id}: {payload['acked']}/{payload['tokens']} tokens subscribed "
+                      f"in {payload['subscribe_seconds']:.2f}s")
+            elif kind == 'error':
+                self.errors[shard_id] = payload
+                print(f"❌ Shard {shard_id} failed: {payload}")
+            elif kind == 'done':
+                self._done.add(shard_id)
+                self.worker_stats[shard_id] = payload
+
+            if time.monotonic() - last_status >= self.status_interval:
+                self.print_status()
+                last_status = time.monotonic()
+        self.all_done.set()
+
+    def _reap_dead_workers(self):
+        """Count workers that exited without sending 'done' (killed, crashed) as done"""
+        for shard_id, process in enumerate(self._processes):
+            if shard_id not in self._done and process.exitcode not in (None, 0):
+                self._done.add(shard_id)
+                self.errors.setdefault(shard_id, f"worker exited with code {process.exitcode}")
+                print(f"❌ Shard {shard_id} worker died (exit code {process.exitcode})")
+
+    # ==================== STATS ====================
+
+    def stats(self):
+        """Per-shard throughput as a dict (also published in the metrics file)"""
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            str(shard_id): {
+                'tokens': len(self.shards[shard_id]),
+                'ticks': self.received[shard_id],
+                'ticks_per_sec': round(self.received[shard_id] / elapsed, 1) if elapsed else 0.0,
+                'batches': self.batches[shard_id],
+                'last_batch_lag_ms': round(self.last_batch_lag_ms[shard_id], 2),
+                'subscribe_seconds': self.ready.get(shard_id, {}).get('subscribe_seconds'),
+                'error': self.errors.get(shard_id),
+            }
+            for shard_id in range(len(self.shards))
+        }
+
+    def print_status(self):
+        parts = [f"#{shard_id} {s['ticks_per_sec']:,.0f}/s ({s['ticks']:,})"
+                 for shard_id, s in self.stats().items()]
+        print(f"🧩 Shards: {' | '.join(parts)}")
+
+
+def run_sharded(token_symbol_list, shard_count, feed_factory=breeze_feed, stop_condition=None, config=None):
+    """
+    Run a live_tick_monitor session with the watchlist split across workers
+
+    The watchlist is not hot-reloaded: shards are cut and subscribed once,
+    and no WatchlistWatcher runs in this mode.
+
+    Args:
+        token_symbol_list: Full watchlist as (token, symbol) pairs
+        shard_count: Number of worker processes
+        feed_factory: Picklable callable (shard_id, tokens) -> feed object
+        stop_condition: Optional callable ending the session; with
+                        'all_done' the session ends when every worker's
+                        (recorded) feed has finished
+        config: live_tick_monitor.MonitorConfig (None = module defaults)
+
+    Returns:
+        ShardCoordinator: Finished coordinator (stats())
+    """
+    from live_tick_monitor import TickMonitor, MonitorConfig
+    config = config or MonitorConfig()
+    if config.watchlist_reload:
+        print("⚠️ Watchlist hot reload is off in sharded sessions: restart to apply watchlist changes")
+    coordinator = ShardCoordinator(token_symbol_list, shard_count, feed_factory,
+                                   subscribe_options=config.subscription_options())
+    if stop_condition == 'all_done':
+        stop_condition = coordinator.all_done.is_set
+    monitor = TickMonitor(config, feed=coordinator, watchlist=token_symbol_list)
+    monitor.metrics_sources['shards'] = coordinator.stats
+    monitor.run_session(stop_condition=stop_condition)
+    return coordinator
+
+
+if __name__ == "__main__":
+    import live_tick_monitor as monitor
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    run_sharded(monitor.load_watchlist(monitor.WATCHLIST_FILE), count)
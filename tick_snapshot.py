@@ -0,0 +1,161 @@
+"""
+Latest-State / Delta Snapshots
+Compact NDJSON snapshots of the live monitor's state
+- Keyframe: latest tick of every symbol
+- Delta: latest tick of symbols that ticked since the previous snapshot
+- Closed bars since the previous snapshot ride along in both
+- Order book metrics (order_book.py) ride along on each quote
+- A keyframe every KEYFRAME_EVERY snapshots bounds the replay chain
+
+File layout (one JSON object per line):
+    {"type": "keyframe"|"delta", "seq": 12, "base_seq": 0, "snapshot_time": ..., "symbols": 3}
+    {"type": "quote", "Symbol": "RELIND", "ticks": 1524, "new_ticks": 41, ...CSV fields, "recv_timestamp": ...,
+     "book": {"spread": ..., "mid": ..., "microprice": ..., "imbalance": ..., "pressure": ..., "avg_spread": ...}}
+    {"type": "bar", "Symbol": "RELIND", "bar_start": ..., ...bar fields}
+"""
+
+import glob
+import json
+import os
+from datetime import datetime
+from tick_buffer import TICK_FIELDS, ns_to_local
+from bar_aggregator import bars_for_json
+
+KEYFRAME_EVERY = 15
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+
+class DeltaSnapshotter:
+
+    def __init__(self, snapshot_dir="snapshots", keyframe_every=KEYFRAME_EVERY, prefix="fut"):
+        """
+        Initialize snapshotter
+
+        Args:
+            snapshot_dir: Output folder
+            keyframe_every: Write a full keyframe every N snapshots
+            prefix: File name prefix
+        """
+        self.snapshot_dir = snapshot_dir
+        self.keyframe_every = keyframe_every
+        self.prefix = prefix
+        self.seq = 0
+        self.base_seq = 0
+        self._last_counts = {}   # symbol -> total ticks at previous snapshot
+
+    def remove_symbol(self, symbol):
+        """Forget a symbol's tick count (its buffer was dropped)"""
+        self._last_counts.pop(symbol, None)
+
+    def write(self, tick_buffer, bars=(), now=None, books=None):
+        """
+        Write the next keyframe or delta snapshot
+
+        Args:
+            tick_buffer: TickRingBuffer with live ticks
+            bars: Bar dicts closed since the previous snapshot
+            now: Snapshot time (default: now)
+            books: Optional OrderBookSet for per-quote book metrics
+
+        Returns:
+            str: Snapshot file path
+        """
+        now = now or datetime.now()
+        is_keyframe = self.seq % self.keyframe_every == 0
+        if is_keyframe:
+            self.base_seq = self.seq
+
+        lines = []
+        for symbol in tick_buffer.symbols():
+            total = tick_buffer.total_ticks(symbol)
+            previous = self._last_counts.get(symbol, 0)
+            if total == 0 or (not is_keyframe and total == previous):
+                continue
+            self._last_counts[symbol] = total
+            latest = tick_buffer.latest(symbol)
+            quote = {'type': 'quote', 'Symbol': symbol, 'ticks': total, 'new_ticks': total - previous}
+            quote.update(zip(TICK_FIELDS, latest.tolist()))
+            quote['exchange_timestamp'] = ns_to_local(quote['exchange_timestamp']).isoformat()
+            recv_ns = tick_buffer.latest_recv(symbol)
+            if recv_ns:
+                quote['recv_timestamp'] = ns_to_local(recv_ns).isoformat()
+            if books is not None:
+                quote['book'] = books.summary(symbol)
+            lines.append(_dumps(quote))
+
+        quote_count = len(lines)
+        for bar in bars_for_json(list(bars)):
+            bar['type'] = 'bar'
+            lines.append(_dumps(bar))
+
+        header = {
+            'type': 'keyframe' if is_keyframe else 'delta',
+            'seq': self.seq,
+            'base_seq': self.base_seq,
+            'snapshot_time': now.isoformat(),
+            'symbols': quote_count,
+            'bars': len(lines) - quote_count,
+        }
+
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        kind = 'key' if is_keyframe else 'delta'
+        snap_file = os.path.join(self.snapshot_dir,
+                                 f"{self.prefix}_{kind}_{now.strftime('%Y%m%d_%H%M%S')}.ndjson")
+        with open(snap_file, 'w') as f:
+            f.write(_dumps(header) + '\n')
+            if lines:
+                f.write('\n'.join(lines) + '\n')
+
+        self.seq += 1
+        return snap_file
+
+
+# ============================================================
+# READER
+# ============================================================
+
+def read_snapshot(path):
+    """
+    Parse one snapshot file
+
+    Returns:
+        tuple: (header dict, {symbol: quote dict}, [bar dicts])
+    """
+    quotes = {}
+    bars = []
+    with open(path) as f:
+        header = json.loads(f.readline())
+        for line in f:
+            record = json.loads(line)
+            if record['type'] == 'quote':
+                quotes[record['Symbol']] = record
+            else:
+                bars.append(record)
+    return header, quotes, bars
+
+
+def load_latest_state(snapshot_dir="snapshots", prefix="fut"):
+    """
+    Rebuild latest per-symbol state from the newest keyframe plus its deltas
+
+    Returns:
+        dict: {symbol: quote dict} (empty if no keyframe exists)
+    """
+    keyframes = sorted(glob.glob(os.path.join(snapshot_dir, f"{prefix}_key_*.ndjson")))
+    if not keyframes:
+        return {}
+    header, state, _ = read_snapshot(keyframes[-1])
+    base_seq = header['seq']
+
+    key_stamp = os.path.basename(keyframes[-1])[len(f"{prefix}_key_"):]
+    deltas = sorted(p for p in glob.glob(os.path.join(snapshot_dir, f"{prefix}_delta_*.ndjson"))
+                    if os.path.basename(p)[len(f"{prefix}_delta_"):] > key_stamp)
+    for path in deltas:
+        delta_header, quotes, _ = read_snapshot(path)
+        if delta_header['base_seq'] != base_seq:
+            continue
+        state.update(quotes)
+    return state
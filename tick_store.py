@@ -0,0 +1,357 @@
+"""
+Partitioned Parquet Tick Store
+Replaces the single ever-growing all_ticks_FUTURES.csv
+- Layout: tick_store/date=YYYY-MM-DD/symbol=SYMBOL/part-*.parquet
+- Typed columns (timestamp[ns], float64 prices, int64 quantities)
+- Writer sink for BackgroundTickWriter (buffers row groups per symbol)
+- Reader API: one symbol / day / time range with column projection
+- Closed minute bars under tick_store/bars/interval=Ns/date=YYYY-MM-DD/
+
+Requires pyarrow (pip install pyarrow)
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, date as date_cls
+import pandas as pd
+from tick_buffer import (CSV_COLUMNS, TICK_FIELDS, PRICE_FIELDS, LOCAL_TZ, fix_legacy_depth,
+                         fill_missing_recv, ns_to_local)
+from bar_aggregator import BAR_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+TICK_STORE_DIR = "tick_store"
+NS_PER_DAY = 86_400_000_000_000
+TMP_SUFFIX = '.tmp'      # parts still being written; readers skip them
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the Parquet tick store (pip install pyarrow)")
+
+
+def tick_schema():
+    """Arrow schema for stored ticks (Symbol lives in the partition path)"""
+    _require_pyarrow()
+    fields = []
+    for name in TICK_FIELDS:
+        if name == 'exchange_timestamp':
+            fields.append(pa.field(name, pa.timestamp('ns', tz='UTC')))
+        elif name in PRICE_FIELDS:
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.int64()))
+    return pa.schema(fields)
+
+
+def bar_schema():
+    """Arrow schema for closed bars"""
+    _require_pyarrow()
+    types = {
+        'Symbol': pa.string(),
+        'bar_start': pa.timestamp('ns', tz='UTC'),
+        'interval': pa.int32(),
+        'volume': pa.int64(),
+        'open_interest': pa.int64(),
+        'oi_change': pa.int64(),
+        'ticks': pa.int64(),
+    }
+    return pa.schema([pa.field(name, types.get(name, pa.float64())) for name in BAR_COLUMNS])
+
+
+def _part_files(directory):
+    """Finished part files in a partition directory (in-progress *.tmp skipped)"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+
+
+def _date_str(value):
+    if isinstance(value, (datetime, date_cls)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+def partition_path(root, date, symbol):
+    """Directory holding one symbol's ticks for one day"""
+    return os.path.join(root, f"date={_date_str(date)}", f"symbol={symbol}")
+
+
+def bar_partition_path(root, interval, date):
+    """Directory holding all symbols' bars of one interval for one day"""
+    return os.path.join(root, "bars", f"interval={interval}s", f"date={_date_str(date)}")
+
+
+# ============================================================
+# WRITER
+# ============================================================
+
+class ParquetTickSink:
+    """
+    Tick sink writing date/symbol-partitioned Parquet files
+
+    Rows are buffered per symbol and written as one row group once
+    row_group_size rows are pending. Part files are written as
+    *.parquet.tmp and only renamed to *.parquet once closed (footer
+    written), every roll_interval seconds and on close(), so readers never
+    see an unreadable part. Ticks still in memory or in an open part are
+    lost on a crash; the tick journal (JOURNAL_ENABLED) is what covers them.
+    """
+
+    def __init__(self, root=TICK_STORE_DIR, row_group_size=5000, roll_interval=300):
+        _require_pyarrow()
+        self.root = root
+        self.row_group_size = row_group_size
+        self.roll_interval = roll_interval
+        self.schema = tick_schema()
+
+        self._pending = {}       # (date, symbol) -> [row, ...]
+        self._writers = {}       # (date, symbol) -> ParquetWriter (on path + TMP_SUFFIX)
+        self._paths = {}         # (date, symbol) -> final part path
+        self._day_names = {}     # local day number -> 'YYYY-MM-DD'
+        self._part_seq = 0
+        self._opened_at = time.monotonic()
+        self._utc_offset_ns = int(datetime.now(LOCAL_TZ).utcoffset().total_seconds() * 1e9)
+
+    def open(self):
+        os.makedirs(self.root, exist_ok=True)
+        print(f"✓ Parquet tick store: {self.root}/")
+
+    def _day_name(self, ts_ns):
+        day = (ts_ns + self._utc_offset_ns) // NS_PER_DAY
+        name = self._day_names.get(day)
+        if name is None:
+            name = ns_to_local(ts_ns).strftime('%Y-%m-%d')
+            self._day_names[day] = name
+        return name
+
+    def write_batch(self, records):
+        """
+        Buffer a batch of ticks, writing full row groups
+
+        Args:
+            records: List of (symbol, row) with row in TICK_FIELDS order
+        """
+        for symbol, row in records:
+            key = (self._day_name(row[0]), symbol)
+            rows = self._pending.get(key)
+            if rows is None:
+                rows = self._pending[key] = []
+            rows.append(row)
+            if len(rows) >= self.row_group_size:
+                self._flush(key)
+
+        if time.monotonic() - self._opened_at >= self.roll_interval:
+            self.roll()
+
+    def _flush(self, key):
+        rows = self._pending.pop(key, None)
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        table = pa.Table.from_arrays(arrays, schema=self.schema)
+
+        writer = self._writers.get(key)
+        if writer is None:
+            date, symbol = key
+            directory = partition_path(self.root, date, symbol)
+            os.makedirs(directory, exist_ok=True)
+            part_name = f"part-{datetime.now().strftime('%H%M%S')}-{self._part_seq:04d}.parquet"
+            self._part_seq += 1
+            path = os.path.join(directory, part_name)
+            writer = pq.ParquetWriter(path + TMP_SUFFIX, self.schema)
+            self._writers[key] = writer
+            self._paths[key] = path
+        writer.write_table(table)
+
+    def roll(self):
+        """Flush all pending rows and close (publish) current part files"""
+        for key in list(self._pending.keys()):
+            self._flush(key)
+        for key, writer in self._writers.items():
+            writer.close()
+            path = self._paths[key]
+            os.replace(path + TMP_SUFFIX, path)
+        self._writers = {}
+        self._paths = {}
+        self._opened_at = time.monotonic()
+
+    def close(self):
+        self.roll()
+
+
+class ParquetBarSink:
+    """
+    Closed-bar writer (one part file per interval/day, rolled like ticks)
+
+    Bars are small (one row per symbol per interval), so they are held
+    until the roll and written as a single row group.
+    """
+
+    def __init__(self, root=TICK_STORE_DIR, roll_interval=300):
+        _require_pyarrow()
+        self.root = root
+        self.roll_interval = roll_interval
+        self.schema = bar_schema()
+        self._pending = {}       # (interval, date) -> [bar, ...]
+        self._opened_at = time.monotonic()
+
+    def write_bars(self, bars):
+        """Buffer closed bar dicts (BAR_COLUMNS layout, bar_start in epoch ns)"""
+        for bar in bars:
+            key = (bar['interval'], ns_to_local(bar['bar_start']).strftime('%Y-%m-%d'))
+            self._pending.setdefault(key, []).append(bar)
+        if time.monotonic() - self._opened_at >= self.roll_interval:
+            self.roll()
+
+    def roll(self):
+        """Write all pending bars to new part files"""
+        for (interval, date), bars in self._pending.items():
+            directory = bar_partition_path(self.root, interval, date)
+            os.makedirs(directory, exist_ok=True)
+            arrays = [pa.array([bar[field.name] for bar in bars], type=field.type) for field in self.schema]
+            path = os.path.join(directory, f"part-{datetime.now().strftime('%H%M%S%f')}.parquet")
+            pq.write_table(pa.Table.from_arrays(arrays, schema=self.schema), path + TMP_SUFFIX)
+            os.replace(path + TMP_SUFFIX, path)
+        self._pending = {}
+        self._opened_at = time.monotonic()
+
+    def close(self):
+        self.roll()
+
+
+# ============================================================
+# READER
+# ============================================================
+
+def _to_utc_ns(date, value):
+    """Convert datetime / 'HH:MM[:SS]' (local time on `date`) to a UTC pa scalar"""
+    if isinstance(value, str):
+        value = datetime.strptime(f"{_date_str(date)} {value}",
+                                  '%Y-%m-%d %H:%M:%S' if value.count(':') == 2 else '%Y-%m-%d %H:%M')
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(LOCAL_TZ)
+    return pa.scalar(ts.tz_convert('UTC').value, type=pa.timestamp('ns', tz='UTC'))
+
+
+def load_ticks(symbol, date, start=None, end=None, columns=None, root=TICK_STORE_DIR):
+    """
+    Load one symbol's ticks for one day
+
+    Args:
+        symbol: Symbol (e.g., "RELIND")
+        date: 'YYYY-MM-DD' or date/datetime
+        start: Optional start time (datetime or 'HH:MM[:SS]' local), inclusive
+        end: Optional end time (datetime or 'HH:MM[:SS]' local), exclusive
+        columns: Optional list of columns to load (exchange_timestamp always included)
+        root: Tick store root directory
+
+    Returns:
+        pd.DataFrame: Ticks in CSV column layout (local naive timestamps)
+    """
+    _require_pyarrow()
+    path = partition_path(root, date, symbol)
+    parts = _part_files(path) if os.path.isdir(path) else []
+    if not parts:
+        return pd.DataFrame(columns=CSV_COLUMNS if columns is None else ['Symbol'] + list(columns))
+
+    if columns is not None:
+        columns = ['exchange_timestamp'] + [c for c in columns if c not in ('Symbol', 'exchange_timestamp')]
+
+    filters = []
+    if start is not None:
+        filters.append(('exchange_timestamp', '>=', _to_utc_ns(date, start)))
+    if end is not None:
+        filters.append(('exchange_timestamp', '<', _to_utc_ns(date, end)))
+
+    table = pq.read_table(parts, columns=columns, filters=filters or None, schema=tick_schema())
+    df = table.to_pandas()
+    df = df.sort_values('exchange_timestamp', kind='stable').reset_index(drop=True)
+    df['exchange_timestamp'] = df['exchange_timestamp'].dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
+    df.insert(0, 'Symbol', symbol)
+    if 'recv_ns' in df.columns:
+        df = fill_missing_recv(df)
+    return df
+
+
+def load_bars(date, symbols=None, interval=60, columns=None, root=TICK_STORE_DIR):
+    """
+    Load closed bars for one day
+
+    Args:
+        date: 'YYYY-MM-DD' or date/datetime
+        symbols: Optional list of symbols (default: all)
+        interval: Bar interval in seconds
+        columns: Optional list of columns to load
+        root: Tick store root directory
+
+    Returns:
+        pd.DataFrame: Bars sorted by symbol and bar_start (local naive times)
+    """
+    _require_pyarrow()
+    path = bar_partition_path(root, interval, date)
+    parts = _part_files(path) if os.path.isdir(path) else []
+    if not parts:
+        return pd.DataFrame(columns=BAR_COLUMNS if columns is None else list(columns))
+
+    if columns is not None:
+        columns = ['Symbol', 'bar_start'] + [c for c in columns if c not in ('Symbol', 'bar_start')]
+    filters = [('Symbol', 'in', list(symbols))] if symbols else None
+
+    df = pq.read_table(parts, columns=columns, filters=filters, schema=bar_schema()).to_pandas()
+    df = df.sort_values(['Symbol', 'bar_start'], kind='stable').reset_index(drop=True)
+    df['bar_start'] = df['bar_start'].dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
+    return df
+
+
+def list_dates(root=TICK_STORE_DIR):
+    """Dates available in the store"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(d.split('=', 1)[1] for d in os.listdir(root) if d.startswith('date='))
+
+
+def list_symbols(date, root=TICK_STORE_DIR):
+    """Symbols stored for a date"""
+    directory = os.path.join(root, f"date={_date_str(date)}")
+    if not os.path.isdir(directory):
+        return []
+    return sorted(d.split('=', 1)[1] for d in os.listdir(directory) if d.startswith('symbol='))
+
+
+# ============================================================
+# CSV IMPORT
+# ============================================================
+
+def import_csv(csv_file='all_ticks_FUTURES.csv', root=TICK_STORE_DIR, chunk_size=100_000):
+    """
+    Import an all-ticks CSV into the store (legacy depth order is remapped)
+
+    Returns:
+        int: Ticks imported
+    """
+    sink = ParquetTickSink(root)
+    sink.open()
+    total = 0
+    for chunk in pd.read_csv(csv_file, chunksize=chunk_size):
+        timestamps = pd.to_datetime(chunk['exchange_timestamp'], format='mixed', errors='coerce')
+        chunk = fill_missing_recv(fix_legacy_depth(chunk[timestamps.notna()].copy()))
+        timestamps = timestamps[timestamps.notna()]
+        chunk['exchange_timestamp'] = (timestamps.dt.tz_localize(LOCAL_TZ)
+                                       .dt.tz_convert('UTC').dt.as_unit('ns').astype('int64'))
+        rows = chunk[TICK_FIELDS].itertuples(index=False, name=None)
+        sink.write_batch(list(zip(chunk['Symbol'], rows)))
+        total += len(chunk)
+    sink.close()
+    print(f"✓ Imported {total:,} ticks from {csv_file} into {root}/")
+    return total
+
+
+if __name__ == "__main__":
+    import_csv(*sys.argv[1:2])
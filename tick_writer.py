@@ -0,0 +1,297 @@
+"""
+Background Tick Writer
+Moves tick persistence off the websocket callback
+- Bounded queue between on_ticks and a dedicated writer thread
+- Backpressure policy when the queue is full: block, drop_oldest, spill
+  (spilled ticks reach the sink late, after newer ones)
+- Flush on batch size, on interval and on shutdown
+- Counters for queue depth and write latency
+"""
+
+import csv
+import os
+import queue
+import threading
+import time
+import pandas as pd
+from tick_buffer import CSV_COLUMNS, TICK_FIELDS, PRICE_FIELDS, ns_to_local
+from bar_aggregator import BAR_COLUMNS, bars_for_json
+
+POLICY_BLOCK = 'block'
+POLICY_DROP_OLDEST = 'drop_oldest'
+POLICY_SPILL = 'spill'
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_SPILL)
+
+
+# ============================================================
+# SINKS
+# ============================================================
+
+class CSVTickSink:
+    """Appends (symbol, row) records to the all-ticks CSV"""
+
+    def __init__(self, csv_file):
+        self.csv_file = csv_file
+
+    def open(self):
+        if os.path.exists(self.csv_file) and self._header() != CSV_COLUMNS:
+            # Older layout (no recv_ns): appending would misalign every new row
+            base, ext = os.path.splitext(self.csv_file)
+            moved = f"{base}_{time.strftime('%Y%m%d_%H%M%S')}{ext}"
+            os.replace(self.csv_file, moved)
+            print(f"⚠️ {self.csv_file} has an older column layout, moved to {moved}")
+        if not os.path.exists(self.csv_file):
+            pd.DataFrame(columns=CSV_COLUMNS).to_csv(self.csv_file, index=False)
+            print(f"✓ Created new CSV: {self.csv_file}")
+        else:
+            print(f"✓ Using existing CSV: {self.csv_file}")
+
+    def _header(self):
+        with open(self.csv_file, newline='') as f:
+            return next(csv.reader(f), [])
+
+    def write_batch(self, records):
+        """
+        Append a batch of ticks
+
+        Args:
+            records: List of (symbol, row) with row in TICK_FIELDS order
+        """
+        symbols, rows = zip(*records)
+        df = pd.DataFrame.from_records(list(rows), columns=TICK_FIELDS)
+        df.insert(0, 'Symbol', symbols)
+        df['exchange_timestamp'] = ns_to_local(df['exchange_timestamp'].to_numpy())
+        df.to_csv(self.csv_file, mode='a', header=False, index=False)
+
+    def close(self):
+        pass
+
+
+class CSVBarSink:
+    """Appends closed bars to a bars CSV"""
+
+    def __init__(self, csv_file):
+        self.csv_file = csv_file
+
+    def write_bars(self, bars):
+        if not bars:
+            return
+        df = pd.DataFrame(bars_for_json(bars), columns=BAR_COLUMNS)
+        df.to_csv(self.csv_file, mode='a', header=not os.path.exists(self.csv_file), index=False)
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# WRITER THREAD
+# ============================================================
+
+class BackgroundTickWriter:
+
+    def __init__(self, sink, max_queue=20000, policy=POLICY_DROP_OLDEST,
+                 batch_size=60, flush_interval=1.0, spill_file="tick_spill.csv"):
+        """
+        Initialize writer
+
+        Args:
+            sink: Object with open(), write_batch(records), close()
+            max_queue: Queue capacity in records
+            policy: 'block', 'drop_oldest' or 'spill' when the queue is full
+            batch_size: Records per write
+            flush_interval: Max seconds a record waits before being written
+            spill_file: Overflow file used by the 'spill' policy
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy} (use one of {POLICIES})")
+
+        self.sink = sink
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_file = spill_file
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._spill_lock = threading.Lock()
+        self._spill_handle = None
+        self._spill_writer = None
+
+        # Counters
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.write_errors = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.total_write_ms = 0.0
+
+    # ==================== PRODUCER SIDE ====================
+
+    def put(self, record):
+        """Enqueue one (symbol, row) record - called from on_ticks"""
+        if self.policy == POLICY_BLOCK:
+            self._queue.put(record)
+        else:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                if self.policy == POLICY_DROP_OLDEST:
+                    self._drop_oldest_and_put(record)
+                else:
+                    self._spill(record)
+                    return
+        self.enqueued += 1
+
+    def _drop_oldest_and_put(self, record):
+        while True:
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(record)
+                return
+            except queue.Full:
+                continue
+
+    def _spill(self, record):
+        symbol, row = record
+        with self._spill_lock:
+            if self._spill_handle is None:
+                self._spill_handle = open(self.spill_file, 'a', newline='')
+                self._spill_writer = csv.writer(self._spill_handle)
+            self._spill_writer.writerow((symbol,) + tuple(row))
+        self.spilled += 1
+
+    # ==================== WRITER SIDE ====================
+
+    def start(self):
+        self.sink.open()
+        self._thread = threading.Thread(target=self._run, name="tick-writer", daemon=True)
+        self._thread.start()
+        print(f"✓ Background writer started (policy={self.policy}, queue={self._queue.maxsize})")
+
+    def _run(self):
+        batch = []
+        last_flush = time.monotonic()
+        while not self._stop_event.is_set() or not self._queue.empty():
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            interval_due = time.monotonic() - last_flush >= self.flush_interval
+            if len(batch) >= self.batch_size or (batch and interval_due):
+                self._write(batch)
+                batch = []
+            if interval_due:
+                self._drain_spill()
+                last_flush = time.monotonic()
+
+        if batch:
+            self._write(batch)
+        self._drain_spill()
+
+    def _write(self, batch):
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        start = time.perf_counter()
+        try:
+            self.sink.write_batch(batch)
+            self.written += len(batch)
+            if len(batch) >= 50:
+                print(f"   💾 Wrote {len(batch)} ticks")
+        except Exception as e:
+            self.write_errors += 1
+            print(f"   ⚠️ Tick write error: {e}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.batches += 1
+        self.last_write_ms = elapsed_ms
+        self.total_write_ms += elapsed_ms
+        if elapsed_ms > self.max_write_ms:
+            self.max_write_ms = elapsed_ms
+
+    def _drain_spill(self):
+        """
+        Move spilled records back into the sink once the queue has room
+
+        Spilled records are older than ticks written since the spill, so
+        they are appended out of exchange-time order; readers sort
+        (tick_store.load_ticks, tick_replay)
+        """
+        if self._spill_handle is None or self._queue.qsize() > self.batch_size:
+            return
+        with self._spill_lock:
+            self._spill_handle.close()
+            self._spill_handle = None
+            self._spill_writer = None
+            drain_file = self.spill_file + ".draining"
+            os.replace(self.spill_file, drain_file)
+
+        with open(drain_file, newline='') as f:
+            records = [(line[0], tuple(float(v) if name in PRICE_FIELDS else int(v)
+                                       for name, v in zip(TICK_FIELDS, line[1:])))
+                       for line in csv.reader(f)]
+        for i in range(0, len(records), self.batch_size):
+            self._write(records[i:i + self.batch_size])
+        os.remove(drain_file)
+        print(f"   ♻️ Recovered {len(records)} spilled ticks")
+
+    def stop(self, timeout=10):
+        """Stop the writer thread after flushing everything queued"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Closing under a running write would corrupt the sink
+                print(f"⚠️ Writer still busy after {timeout}s, sink left open "
+                      f"({self._queue.qsize():,} ticks queued)")
+                return
+        self.sink.close()
+        print(f"✓ Writer stopped ({self.written:,} written, {self.dropped:,} dropped, "
+              f"{self.spilled:,} spilled)")
+
+    # ==================== COUNTERS ====================
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        """Writer counters as a dict"""
+        return {
+            'policy': self.policy,
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'write_errors': self.write_errors,
+            'batches': self.batches,
+            'last_write_ms': round(self.last_write_ms, 3),
+            'max_write_ms': round(self.max_write_ms, 3),
+            'avg_write_ms': round(self.total_write_ms / self.batches, 3) if self.batches else 0.0,
+        }
+
+
+class NullTickSink:
+    """Discards ticks (replay / throughput runs)"""
+
+    def open(self):
+        pass
+
+    def write_batch(self, records):
+        pass
+
+    def close(self):
+        pass
@@ -1,11 +1,97 @@
 """
 NSE Futures Token Parser
 Parses futures token file and provides active contract tokens based on expiry logic
+- Vectorized load: only the needed columns are read, cleaned column-wise
+- Compiled index next to the token file (<token_file>.idx), keyed by the
+  source file's size, mtime and content hash; warm loads skip CSV parsing
+- ExpiryCalendar: sorted expiries, bisect lookup of the active/next
+  contract, resolved once per trading day and rollover window
+- Symbol search: prefix trie + trigram index over short and company names
+  (symbol_search.py), built on first search
+- Reverse lookups built at load: Breeze token -> contract, asset name ->
+  symbol, NSE trading symbol (ExchangeCode) -> Breeze short name
+- Full instrument store (instrument_store.py): every FUTIDX/FUTSTK/OPTIDX/
+  OPTSTK contract, columnar, with option-chain queries
 """
 
+import bisect
+import hashlib
+import os
+import pickle
+import time
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from pathlib import Path
+from symbol_search import SymbolSearchIndex, normalize
+from instrument_store import InstrumentStore, PAISE_PER_RUPEE
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 6
+TOKEN_COLUMNS = ['Token', 'InstrumentName', 'ShortName', 'ExpiryDate', 'StrikePrice', 'OptionType',
+                 'LotSize', 'TickSize', 'AssetName', 'CompanyName', 'ExchangeCode']
+
+
+def _file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExpiryCalendar:
+    """Sorted expiry dates with O(log n) active-contract lookup, memoized per day"""
+
+    def __init__(self, expiry_dates):
+        """
+        Args:
+            expiry_dates: {expiry code: datetime or None} (unparseable codes are skipped)
+        """
+        pairs = sorted((expiry_date.date(), code) for code, expiry_date in expiry_dates.items() if expiry_date)
+        self.dates = [expiry_day for expiry_day, _ in pairs]
+        self.codes = [code for _, code in pairs]
+        self._resolved = {}            # (day, rollover_days) -> resolution
+
+    def resolve(self, on_date=None, rollover_days=4):
+        """
+        Active contract for a trading day
+
+        An expiry stops counting on its expiry day; days_left is the number
+        of full days before the expiry day.
+
+        Args:
+            on_date: Trading day (date, default today)
+            rollover_days: Roll to the next expiry when fewer days are left
+
+        Returns:
+            dict: {'expiry', 'next_expiry', 'nearest', 'days_left', 'rolled'}
+                  (expiry None when no expiry is left)
+        """
+        on_date = on_date or date.today()
+        key = (on_date, rollover_days)
+        resolution = self._resolved.get(key)
+        if resolution is None:
+            resolution = self._resolve(on_date, rollover_days)
+            self._resolved[key] = resolution
+        return resolution
+
+    def _resolve(self, on_date, rollover_days):
+        nearest = bisect.bisect_right(self.dates, on_date)
+        if nearest == len(self.dates):
+            return {'expiry': None, 'next_expiry': None, 'nearest': None, 'days_left': None, 'rolled': False}
+        days_left = (self.dates[nearest] - on_date).days - 1
+        rolled = days_left < rollover_days and nearest + 1 < len(self.dates)
+        active = nearest + 1 if rolled else nearest
+        return {
+            'expiry': self.codes[active],
+            'next_expiry': self.codes[active + 1] if active + 1 < len(self.codes) else None,
+            'nearest': self.codes[nearest],
+            'days_left': days_left,
+            'rolled': rolled,
+        }
+
+    def __len__(self):
+        return len(self.dates)
 
 
 class FuturesTokenParser:
@@ -20,6 +106,15 @@ class FuturesTokenParser:
         self.token_file = Path(token_file)
         self.token_map = {}
         self.expiry_dates = {}
+        self.load_source = None        # 'index' (warm) or 'csv' (cold)
+        self.load_seconds = None
+        self.calendar = ExpiryCalendar({})
+        self._expiry_reported = set()  # (day, rollover_days) already printed
+        self._search_index = None
+        self.token_index = {}          # Breeze token -> contract info (same dicts as token_map)
+        self.asset_name_index = {}     # normalized asset name -> symbol
+        self.exchange_code_index = {}  # NSE trading symbol -> symbol
+        self.instruments = None        # InstrumentStore (all NFO contracts)
         
         if self.token_file.exists():
             self._load_tokens()
@@ -27,75 +122,148 @@ class FuturesTokenParser:
             print(f"⚠️ Token file not found: {token_file}")
     
     def _load_tokens(self):
-        """Load and parse token file"""
+        """Load the compiled index if it matches the token file, else parse and rebuild it"""
         print(f"📂 Loading tokens from: {self.token_file}")
-        
+        start = time.perf_counter()
+        stat = self.token_file.stat()
+        index = self._read_index(stat)
+        if index is not None:
+            self.token_map = index['token_map']
+            self.expiry_dates = index['expiry_dates']
+            self.instruments = index['instruments']
+            self.load_source = 'index'
+        else:
+            self._parse_token_file()
+            self.load_source = 'csv'
+            self._write_index(stat)
+        self.calendar = ExpiryCalendar(self.expiry_dates)
+        self._build_lookups()
+        self.load_seconds = time.perf_counter() - start
+
+        print(f"✓ Loaded {len(self.token_map)} unique symbols in {self.load_seconds * 1000:.1f}ms "
+              f"({'warm: compiled index' if self.load_source == 'index' else 'cold: parsed token file'})")
+        print(f"✓ Available expiries: {sorted(self.expiry_dates.keys())}")
+
+    def _parse_token_file(self):
+        """Parse the token file into token_map / expiry_dates (column-wise, no per-row conversions)"""
         try:
-            # Read file with tab separator (more reliable)
+            # Read file with tab separator (more reliable), needed columns only
             df = pd.read_csv(
-                self.token_file, 
+                self.token_file,
                 sep='\t',
-                dtype={'Token': str, 'ExpiryDate': str},
+                usecols=lambda column: column in TOKEN_COLUMNS,
+                dtype=str,
                 on_bad_lines='skip'  # Skip malformed lines
             )
-            
-            # Filter only stock futures
-            df = df[df['InstrumentName'] == 'FUTSTK']
-            
-            print(f"✓ Found {len(df)} stock futures contracts")
-            
-            # Build token map: {symbol: {expiry: {token, lot_size, ...}}}
-            for _, row in df.iterrows():
-                try:
-                    symbol = str(row['ShortName']).strip()
-                    expiry = str(row['ExpiryDate']).strip()
-                    
-                    # Skip if essential fields are missing
-                    if not symbol or not expiry or symbol == 'nan':
-                        continue
-                    
-                    if symbol not in self.token_map:
-                        self.token_map[symbol] = {}
-                    
-                    # Safe type conversion with error handling
-                    try:
-                        lot_size = int(float(row['LotSize']))
-                    except (ValueError, TypeError):
-                        lot_size = 1  # Default fallback
-                    
-                    try:
-                        tick_size = float(row['TickSize'])
-                    except (ValueError, TypeError):
-                        tick_size = 0.05  # Default fallback
-                    
-                    try:
-                        asset_name = str(row['AssetName']).strip()
-                    except:
-                        asset_name = symbol
-                    
-                    self.token_map[symbol][expiry] = {
-                        'token': str(row['Token']).strip(),
-                        'lot_size': lot_size,
-                        'tick_size': tick_size,
-                        'asset_name': asset_name,
-                        'expiry_date': expiry
-                    }
-                    
-                    # Track expiry dates
-                    if expiry not in self.expiry_dates:
-                        self.expiry_dates[expiry] = self._parse_expiry_date(expiry)
-                
-                except Exception as e:
-                    # Skip problematic rows
-                    continue
-            
-            print(f"✓ Loaded {len(self.token_map)} unique symbols")
-            print(f"✓ Available expiries: {sorted(self.expiry_dates.keys())}")
-            
         except Exception as e:
             print(f"❌ Error loading tokens: {e}")
             raise
-    
+
+        self.instruments = InstrumentStore.from_frame(df, self._parse_expiry_date)
+        print(f"✓ Instrument store: {len(self.instruments)} contracts "
+              f"({', '.join(f'{name} {count}' for name, count in self.instruments.stats().items() if name.isupper())})")
+
+        # Filter only stock futures
+        df = df[df['InstrumentName'] == 'FUTSTK']
+        print(f"✓ Found {len(df)} stock futures contracts")
+
+        symbols = df['ShortName'].str.strip()
+        expiries = df['ExpiryDate'].str.strip()
+        valid = symbols.notna() & (symbols != '') & expiries.notna() & (expiries != '')
+        df, symbols, expiries = df[valid], symbols[valid], expiries[valid]
+
+        tokens = df['Token'].fillna('').str.strip()
+        lot_sizes = pd.to_numeric(df['LotSize'], errors='coerce').fillna(1).astype('int64')   # fallback 1
+        tick_sizes = (pd.to_numeric(df['TickSize'], errors='coerce').astype(float) / PAISE_PER_RUPEE
+                      ).fillna(0.05)   # rupees, fallback 0.05
+        # AssetName is often blank for futures: fall back to the company name, then the symbol
+        company_names = df['CompanyName'].str.strip() if 'CompanyName' in df else symbols
+        asset_names = df['AssetName'].str.strip().fillna(company_names).fillna(symbols)
+        exchange_codes = (df['ExchangeCode'].str.strip().str.upper().fillna('') if 'ExchangeCode' in df
+                          else pd.Series('', index=df.index))
+
+        # Build token map: {symbol: {expiry: {token, lot_size, ...}}}
+        token_map = {}
+        for symbol, expiry, token, lot_size, tick_size, asset_name, exchange_code in zip(
+                symbols.tolist(), expiries.tolist(), tokens.tolist(),
+                lot_sizes.tolist(), tick_sizes.tolist(), asset_names.tolist(), exchange_codes.tolist()):
+            token_map.setdefault(symbol, {})[expiry] = {
+                'token': token,
+                'lot_size': lot_size,
+                'tick_size': tick_size,
+                'asset_name': asset_name,
+                'expiry_date': expiry,
+                'symbol': symbol,
+                'exchange_code': exchange_code
+            }
+        self.token_map = token_map
+
+        # Track expiry dates (parsed once per distinct code)
+        self.expiry_dates = {expiry: self._parse_expiry_date(expiry) for expiry in expiries.unique()}
+
+    def _build_lookups(self):
+        """Reverse maps over token_map (one pass, O(1) lookups afterwards)"""
+        token_index, asset_name_index, exchange_code_index = {}, {}, {}
+        for symbol, contracts in self.token_map.items():
+            names = set()
+            for contract_info in contracts.values():
+                token_index[contract_info['token']] = contract_info
+                names.add(contract_info['asset_name'])
+                if contract_info['exchange_code']:
+                    exchange_code_index.setdefault(contract_info['exchange_code'], symbol)
+            for asset_name in names:   # normalized once per distinct name
+                asset_name_index.setdefault(normalize(asset_name), symbol)
+        self.token_index = token_index
+        self.asset_name_index = asset_name_index
+        self.exchange_code_index = exchange_code_index
+
+    # ==================== COMPILED INDEX ====================
+
+    @property
+    def index_file(self):
+        return self.token_file.with_name(self.token_file.name + INDEX_SUFFIX)
+
+    def _read_index(self, stat):
+        """Compiled index for the current token file, or None if missing/stale"""
+        if not self.index_file.exists():
+            return None
+        try:
+            with open(self.index_file, 'rb') as f:
+                index = pickle.load(f)
+            if index.get('version') != INDEX_VERSION:
+                return None
+            key = index['key']
+            if key['size'] != stat.st_size:
+                return None
+            if key['mtime_ns'] != stat.st_mtime_ns:
+                # Touched or copied: same content still counts
+                if key['hash'] != _file_hash(self.token_file):
+                    return None
+                key['mtime_ns'] = stat.st_mtime_ns
+                self._dump_index(index)
+            return index
+        except Exception as e:
+            print(f"⚠️ Ignoring token index {self.index_file}: {e}")
+            return None
+
+    def _write_index(self, stat):
+        self._dump_index({
+            'version': INDEX_VERSION,
+            'key': {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': _file_hash(self.token_file)},
+            'token_map': self.token_map,
+            'expiry_dates': self.expiry_dates,
+            'instruments': self.instruments,
+        })
+
+    def _dump_index(self, index):
+        tmp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"⚠️ Token index not saved ({self.index_file}): {e}")
+
     def _parse_expiry_date(self, expiry_str):
         """
         Parse expiry date string to datetime
@@ -125,48 +293,33 @@ class FuturesTokenParser:
         except Exception as e:
             return None
     
-    def get_current_expiry(self, rollover_days=4):
+    def get_current_expiry(self, rollover_days=4, on_date=None):
         """
         Get current active expiry based on rollover logic
+        (ExpiryCalendar lookup, reported once per trading day)
         
         Args:
             rollover_days: Days before expiry to switch to next month
+            on_date: Trading day (date, default today)
         
         Returns:
             str: Expiry code (e.g., "112525")
         """
-        today = datetime.now()
-        
-        # Find nearest expiry
-        valid_expiries = []
-        for expiry_str, expiry_date in self.expiry_dates.items():
-            if expiry_date and expiry_date >= today:
-                days_left = (expiry_date - today).days
-                valid_expiries.append((expiry_str, expiry_date, days_left))
-        
-        # Sort by expiry date
-        valid_expiries.sort(key=lambda x: x[1])
-        
-        if not valid_expiries:
-            print("⚠️ No valid expiries found!")
-            return None
-        
-        # Check if we should rollover
-        current_expiry, current_date, days_left = valid_expiries[0]
-        
-        if days_left < rollover_days:
-            # Switch to next month
-            if len(valid_expiries) > 1:
-                next_expiry = valid_expiries[1][0]
+        resolution = self.calendar.resolve(on_date, rollover_days)
+        key = (on_date or date.today(), rollover_days)
+        if key not in self._expiry_reported:
+            self._expiry_reported.add(key)
+            days_left = resolution['days_left']
+            if resolution['expiry'] is None:
+                print("⚠️ No valid expiries found!")
+            elif resolution['rolled']:
                 print(f"🔄 Rollover: {days_left} days to expiry")
-                print(f"   Switching from {current_expiry} to {next_expiry}")
-                return next_expiry
-            else:
+                print(f"   Switching from {resolution['nearest']} to {resolution['expiry']}")
+            elif days_left < rollover_days:
                 print(f"⚠️ No next month contract available!")
-                return current_expiry
-        else:
-            print(f"✓ Using current month: {current_expiry} ({days_left} days left)")
-            return current_expiry
+            else:
+                print(f"✓ Using current month: {resolution['expiry']} ({days_left} days left)")
+        return resolution['expiry']
     
     def get_token_info(self, symbol, expiry=None):
         """
@@ -212,6 +365,8 @@ class FuturesTokenParser:
             dict: {symbol: token_info}
         """
         result = {}
+        if expiry is None:
+            expiry = self.get_current_expiry()
         
         for symbol in symbols:
             token_info = self.get_token_info(symbol, expiry)
@@ -220,6 +375,17 @@ class FuturesTokenParser:
         
         return result
     
+    @property
+    def search_index(self):
+        """SymbolSearchIndex over short names and asset names (built on first use)"""
+        if self._search_index is None:
+            self._search_index = SymbolSearchIndex({
+                symbol: {name for contract_info in contracts.values()
+                         for name in (contract_info['asset_name'], contract_info['exchange_code']) if name}
+                for symbol, contracts in self.token_map.items()
+            })
+        return self._search_index
+    
     def search_symbol(self, partial_name):
         """
         Search for symbols containing partial name
@@ -230,22 +396,30 @@ class FuturesTokenParser:
         Returns:
             list: Matching symbols
         """
-        partial_upper = partial_name.upper()
-        matches = []
+        return self.search_index.substring(partial_name)
+    
+    def find_symbols(self, query, limit=10, max_typos=None):
+        """
+        Ranked, typo-tolerant symbol lookup for free-form text
         
-        for symbol, contracts in self.token_map.items():
-            # Check symbol
-            if partial_upper in symbol:
-                matches.append(symbol)
-                continue
-            
-            # Check asset name
-            for contract_info in contracts.values():
-                if partial_upper in contract_info['asset_name'].upper():
-                    matches.append(symbol)
-                    break
+        Args:
+            query: Symbol, company name or a fragment ("Tata Steel", "TATSTE", "Relaince")
+            limit: Maximum results
+            max_typos: Edits tolerated (None = by query length, 0 = exact/prefix/substring only)
         
-        return sorted(set(matches))
+        Returns:
+            list: [(symbol, match, term)] best first (see SymbolSearchIndex.search)
+        """
+        return self.search_index.search(query, limit, max_typos)
+    
+    def resolve_symbol(self, text, max_typos=None):
+        """
+        Best symbol for free-form text
+        
+        Returns:
+            str: Symbol or None
+        """
+        return self.search_index.best(text, max_typos)
     
     def get_symbol_from_asset_name(self, asset_name):
         """
@@ -257,14 +431,54 @@ class FuturesTokenParser:
         Returns:
             str: Symbol or None
         """
-        asset_upper = asset_name.upper()
+        return self.asset_name_index.get(normalize(asset_name))
+    
+    def get_symbol_from_exchange_code(self, exchange_code):
+        """
+        Get Breeze short name from the NSE trading symbol
         
-        for symbol, contracts in self.token_map.items():
-            for contract_info in contracts.values():
-                if contract_info['asset_name'].upper() == asset_upper:
-                    return symbol
+        Args:
+            exchange_code: NSE symbol (e.g., "SUNPHARMA", "TATASTEEL")
         
-        return None
+        Returns:
+            str: Symbol (e.g., "SUNPHA") or None
+        """
+        return self.exchange_code_index.get(exchange_code.strip().upper())
+    
+    def get_contract_by_token(self, token):
+        """
+        Get contract info for a Breeze token
+        
+        Args:
+            token: Token with or without the exchange prefix ("49078" or "4.1!49078",
+                   the 'symbol' field of incoming ticks)
+        
+        Returns:
+            dict: Contract info (token_map entry incl. 'symbol') or None
+        """
+        return self.token_index.get(token.rpartition('!')[2])
+    
+    def get_option_chain(self, symbol, price, steps=5, expiry=None, option_types=('CE', 'PE')):
+        """
+        CE/PE contracts around the money
+        
+        Args:
+            symbol: Short name (e.g., "NIFTY", "RELIND")
+            price: Underlying price
+            steps: Listed strikes on each side of the ATM strike
+            expiry: Expiry code (optional, nearest option expiry if not provided)
+            option_types: Sides to include
+        
+        Returns:
+            list: Contract dicts ordered by strike (empty if no options listed)
+        """
+        symbol = symbol.upper()
+        if expiry is None:
+            expiry = self.instruments.next_expiry(symbol, option_type=option_types[0])
+            if expiry is None:
+                print(f"⚠️ No option expiries for {symbol}")
+                return []
+        return self.instruments.option_chain(symbol, expiry, price, steps, option_types)
     
     def list_all_symbols(self):
         """Get list of all available symbols"""
@@ -0,0 +1,94 @@
+"""
+Watchlist Hot Reload
+Notices when the watchlist file is rewritten and works out what changed
+- Polls the file's mtime/size (no extra dependency)
+- A change only counts once the file has stopped changing for one poll,
+  so a half-written file is never applied
+- diff_watchlist: added / removed / renamed tokens between two lists
+"""
+
+import os
+import time
+
+
+def diff_watchlist(old, new):
+    """
+    Compare two (token, symbol) lists
+
+    Returns:
+        tuple: (added pairs, removed pairs, renamed [(token, old symbol, new symbol)])
+    """
+    old_map, new_map = dict(old), dict(new)
+    added = [(token, symbol) for token, symbol in new_map.items() if token not in old_map]
+    removed = [(token, symbol) for token, symbol in old_map.items() if token not in new_map]
+    renamed = [(token, old_map[token], symbol) for token, symbol in new_map.items()
+               if token in old_map and old_map[token] != symbol]
+    return added, removed, renamed
+
+
+class WatchlistWatcher:
+
+    def __init__(self, path, load):
+        """
+        Start watching (the current file contents count as already applied)
+
+        Args:
+            path: Watchlist file
+            load: Callable path -> [(token, symbol)] (live_tick_monitor.load_watchlist)
+        """
+        self.path = path
+        self.load = load
+        self._applied = self._signature()
+        self._seen = self._applied
+        self.checks = 0
+        self.reloads = 0
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """
+        Check the file once
+
+        Returns:
+            list: New (token, symbol) list if the file changed and has settled, else None
+        """
+        self.checks += 1
+        signature = self._signature()
+        if signature is None or signature == self._applied:
+            return None
+        if signature != self._seen:    # still being written (or just written): wait a poll
+            self._seen = signature
+            return None
+        try:
+            token_symbol_list = self.load(self.path)
+        except (OSError, AssertionError, ValueError) as e:
+            print(f"⚠️ Watchlist reload skipped: {e}")
+            return None
+        self._applied = signature
+        if not token_symbol_list:
+            print(f"⚠️ Watchlist reload skipped: {self.path} has no tokens")
+            return None
+        self.reloads += 1
+        return token_symbol_list
+
+
+if __name__ == "__main__":
+    import sys
+    from live_tick_monitor import load_watchlist
+    path = sys.argv[1] if len(sys.argv) > 1 else "watchlist_tokens.txt"
+    current = load_watchlist(path)
+    watcher = WatchlistWatcher(path, load_watchlist)
+    print(f"Watching {path} ({len(current)} tokens), Ctrl+C to stop")
+    while True:
+        time.sleep(2)
+        changed = watcher.poll()
+        if changed is not None:
+            added, removed, renamed = diff_watchlist(current, changed)
+            print(f"+{len(added)} -{len(removed)} ~{len(renamed)}: "
+                  f"{[s for _, s in added]} {[s for _, s in removed]} {renamed}")
+            current = changed